@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Aggregation Module for Audit Wizard
+Single-pass, mergeable aggregation of audit records shared by every report format
+"""
+
+import json
+from datetime import date
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from dates import json_date_ordinal, yaml_date_ordinal, year_of
+
+# A normalized audit: (account ID, day ordinal or None if the date is unknown,
+# visited floors, score is missing). A missing_score of None marks an account
+# without any audits, which only registers the account.
+AuditRecord = Tuple[Any, Optional[int], List[Any], Optional[bool]]
+
+
+class AccountStats:
+    """Constant-size running statistics for one account."""
+
+    __slots__ = ('id', 'audit_count', 'missing_scores', 'dated_count', 'first_day', 'last_day')
+
+    def __init__(self, account_id: Any):
+        """Initialize empty statistics for an account.
+
+        Args:
+            account_id: Account ID
+        """
+        self.id = account_id
+        self.audit_count = 0
+        self.missing_scores = 0
+        self.dated_count = 0
+        self.first_day = None
+        self.last_day = None
+
+    def add(self, day: Optional[int], missing_score: bool):
+        """Add one audit to the statistics.
+
+        Args:
+            day: Audit date as a day ordinal, or None if unknown
+            missing_score: True if the audit has no score
+        """
+        self.audit_count += 1
+        if missing_score:
+            self.missing_scores += 1
+        if day is not None:
+            self.dated_count += 1
+            if self.first_day is None or day < self.first_day:
+                self.first_day = day
+            if self.last_day is None or day > self.last_day:
+                self.last_day = day
+
+    def merge(self, other: "AccountStats"):
+        """Merge the statistics of another part of the same account's audits.
+
+        Args:
+            other: Statistics to merge into these
+        """
+        self.audit_count += other.audit_count
+        self.missing_scores += other.missing_scores
+        self.dated_count += other.dated_count
+        if other.first_day is not None and (self.first_day is None or other.first_day < self.first_day):
+            self.first_day = other.first_day
+        if other.last_day is not None and (self.last_day is None or other.last_day > self.last_day):
+            self.last_day = other.last_day
+
+    @property
+    def total_gap_days(self) -> int:
+        """Sum of the days between consecutive audits.
+
+        The gaps between sorted dates add up to the span between the first
+        and last audit, so no per-audit dates need to be kept.
+        """
+        if self.dated_count < 2:
+            return 0
+        return self.last_day - self.first_day
+
+    @property
+    def avg_days_between(self) -> Any:
+        """Average number of days between audits, or 'N/A' with fewer than two dates."""
+        if self.dated_count < 2:
+            return 'N/A'
+        return self.total_gap_days / (self.dated_count - 1)
+
+    @property
+    def first_audit(self) -> str:
+        return date.fromordinal(self.first_day).strftime("%Y-%m-%d") if self.first_day is not None else 'N/A'
+
+    @property
+    def last_audit(self) -> str:
+        return date.fromordinal(self.last_day).strftime("%Y-%m-%d") if self.last_day is not None else 'N/A'
+
+
+class AuditAggregator:
+    """Aggregates normalized audit records into report statistics in one pass.
+
+    Memory use is constant per account and per distinct year and floor,
+    regardless of the number of audits. Aggregators over separate parts
+    of the data can be merged.
+    """
+
+    def __init__(self):
+        """Initialize an empty aggregate."""
+        self.total_audits = 0
+        self.missing_scores = 0
+        self.audits_by_year: Dict[int, int] = {}
+        self.floor_counts: Dict[Any, int] = {}
+        self.accounts: Dict[Any, AccountStats] = {}
+
+    def add_account(self, account_id: Any) -> AccountStats:
+        """Register an account, even if it has no audits.
+
+        Args:
+            account_id: Account ID
+
+        Returns:
+            AccountStats: The account's statistics
+        """
+        stats = self.accounts.get(account_id)
+        if stats is None:
+            stats = self.accounts[account_id] = AccountStats(account_id)
+        return stats
+
+    def add(self, account_id: Any, day: Optional[int], floors: Iterable[Any], missing_score: bool):
+        """Add one normalized audit.
+
+        Args:
+            account_id: Account ID
+            day: Audit date as a day ordinal, or None if unknown
+            floors: Visited floors
+            missing_score: True if the audit has no score
+        """
+        self.total_audits += 1
+        if missing_score:
+            self.missing_scores += 1
+
+        if day is not None:
+            year = year_of(day)
+            self.audits_by_year[year] = self.audits_by_year.get(year, 0) + 1
+
+        floor_counts = self.floor_counts
+        for floor in floors:
+            floor_counts[floor] = floor_counts.get(floor, 0) + 1
+
+        self.add_account(account_id).add(day, missing_score)
+
+    def add_records(self, records: Iterable[AuditRecord]) -> "AuditAggregator":
+        """Add a stream of normalized audits.
+
+        Args:
+            records: Normalized audit records
+
+        Returns:
+            AuditAggregator: The aggregator itself
+        """
+        for account_id, day, floors, missing_score in records:
+            if missing_score is None:
+                self.add_account(account_id)
+            else:
+                self.add(account_id, day, floors, missing_score)
+        return self
+
+    def merge(self, other: "AuditAggregator"):
+        """Merge another aggregate into this one.
+
+        Args:
+            other: Aggregate over a different part of the data
+        """
+        self.total_audits += other.total_audits
+        self.missing_scores += other.missing_scores
+        for year, count in other.audits_by_year.items():
+            self.audits_by_year[year] = self.audits_by_year.get(year, 0) + count
+        for floor, count in other.floor_counts.items():
+            self.floor_counts[floor] = self.floor_counts.get(floor, 0) + count
+        for account_id, stats in other.accounts.items():
+            self.add_account(account_id).merge(stats)
+
+    def top_floors(self, limit: int = 10) -> List[Tuple[Any, int]]:
+        """Get the most frequently visited floors, ties in first-seen order.
+
+        Args:
+            limit: Maximum number of floors to return
+
+        Returns:
+            List[Tuple[Any, int]]: (floor, visit count) pairs
+        """
+        return sorted(self.floor_counts.items(), key=lambda x: x[1], reverse=True)[:limit]
+
+
+def iter_yaml_records(data: Dict) -> Iterator[AuditRecord]:
+    """Normalize YAML format audit data (dict with 'accounts' key).
+
+    Accounts without audits are yielded as (account ID, None, [], None) so
+    they still count towards the number of accounts.
+
+    Args:
+        data: YAML format audit data
+
+    Yields:
+        AuditRecord: Normalized audits
+    """
+    def pairs():
+        for account in data['accounts']:
+            audits = account['audits']
+            if not audits:
+                yield account['id'], None
+            for audit in audits:
+                yield account['id'], audit
+
+    return iter_yaml_audit_records(pairs())
+
+
+def iter_yaml_audit_records(pairs: Iterable[Tuple[Any, Optional[Dict]]]) -> Iterator[AuditRecord]:
+    """Normalize (account ID, audit) pairs as yielded by readers.iter_yaml_audits.
+
+    Args:
+        pairs: (account ID, YAML audit) pairs; an audit of None registers an
+            account without audits
+
+    Yields:
+        AuditRecord: Normalized audits
+    """
+    for account_id, audit in pairs:
+        if audit is None:
+            yield account_id, None, [], None
+            continue
+        day = yaml_date_ordinal(audit['date'])
+        yield account_id, day, audit.get('visited_floors', []), audit.get('score') is None
+
+
+def iter_json_records(data: Iterable[Dict]) -> Iterator[AuditRecord]:
+    """Normalize JSON format audit data (list of audit records).
+
+    As in the original JSON report, floors of audits whose date cannot be
+    parsed are not counted.
+
+    Args:
+        data: JSON format audit records
+
+    Yields:
+        AuditRecord: Normalized audits
+    """
+    for audit in data:
+        account_id = audit.get('account', 'unknown')
+        day = json_date_ordinal(audit.get('date', ''))
+
+        floors = []
+        if day is not None:
+            try:
+                parsed = json.loads(audit.get('visited_floors', '[]'))
+                if isinstance(parsed, list):
+                    floors = parsed
+            except (json.JSONDecodeError, TypeError):
+                pass  # Skip if visited_floors can't be parsed
+
+        yield account_id, day, floors, audit.get('score') is None
@@ -7,29 +7,60 @@ using YAML and JSON as input sources.
 
 import argparse
 import json
+import logging
 import os
 import sys
+import time
 import yaml
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Any, Tuple
 
 # Import custom modules
 from converter import AuditConverter
 from reporter import AuditReporter  # Make sure the file is named reporter.py, not report.py
-from pocketbase_client import PocketBaseClient
+from report_cache import ReportCache
+from renderers import REPORT_FORMATS, ReportModel, report_output_paths
+from readers import (YamlAccountReader, YamlBlock, expand_audit_paths, is_yaml_path, iter_json_audits,
+                     iter_yaml_accounts, iter_yaml_audits)
+from floor_matrix import MATRIX_ENCODINGS, build_account_matrix, write_floor_matrices
+from journal import ImportJournal
+from metrics import Metrics
+from profiler import Profiler, profile_phase
+from aggregator import AuditAggregator, iter_json_records
+from pipeline import PIPELINE_QUEUE_SIZE, Pipeline, iter_records
+from validator import DEFAULT_SCHEMA_PATH, AuditValidator
+from syncer import AuditSyncer
+from synthetic import SYNTHETIC_SEED, SyntheticDataset
+from retry import RateLimiter, RetryPolicy
+from pocketbase_client import PocketBaseClient, DEFAULT_BATCH_SIZE, DEFAULT_PAGE_SIZE, DEFAULT_POOL_SIZE
 
 # Constants for file paths
 DEFAULT_YAML_PATH = "audits.yml"
 DEFAULT_JSON_PATH = "pocketbase_audits.json"
+DEFAULT_JSONL_PATH = "pocketbase_audits.jsonl"
 DEFAULT_YAML_WITH_IDS_PATH = "audits_with_ids.yml"
 DEFAULT_JSON_WITH_IDS_PATH = "pocketbase_audits_with_ids.json"
 DEFAULT_REPORT_PATH = "audit_report.txt"
+DEFAULT_MATRIX_PATH = "floor_matrix.json"
+DEFAULT_SYNTHETIC_PATH = "synthetic_audits.yml"
 
 # PocketBase API settings
 POCKETBASE_URL = os.environ.get("POCKETBASE_URL", "http://localhost:8090")
 POCKETBASE_EMAIL = os.environ.get("POCKETBASE_EMAIL", "")
 POCKETBASE_PASSWORD = os.environ.get("POCKETBASE_PASSWORD", "")
 POCKETBASE_COLLECTION = os.environ.get("POCKETBASE_COLLECTION", "audits")
+POCKETBASE_ACCOUNTS_COLLECTION = os.environ.get("POCKETBASE_ACCOUNTS_COLLECTION", "accounts")
+POCKETBASE_TOKEN_CACHE = os.environ.get("POCKETBASE_TOKEN_CACHE", "")
+
+# Fields fetched from PocketBase when exporting
+EXPORT_AUDIT_FIELDS = ["id", "account", "date", "status", "note", "visited_floors", "score"]
+EXPORT_ACCOUNT_FIELDS = ["id", "floors_min", "floors_max", "excluded_floors"]
+
+# Number of audits read, written to PocketBase and saved at a time by import and update
+IMPORT_CHUNK_SIZE = 1000
+
+# Per-record messages are logged at INFO and only shown with -v
+logger = logging.getLogger("audit_wizard")
 
 
 class AuditWizard:
@@ -39,21 +70,60 @@ class AuditWizard:
         """Initialize the AuditWizard with command line arguments."""
         self.args = args
         self.pb_client = None
+        self.metrics = Metrics()
+        # Chunked imports and updates fall back to simulation chunk by chunk; say so once per run
+        self._warned_unauthenticated = False
         
         # Initialize PocketBase client if URL is provided
         if hasattr(args, 'pb_url') and args.pb_url:
-            self.pb_client = PocketBaseClient(args.pb_url)
+            self.pb_client = self._create_client(args.pb_url)
             
         # Initialize converter and reporter
         self.converter = AuditConverter()
         self.reporter = AuditReporter()
 
     def run(self):
-        """Run the appropriate command based on arguments."""
+        """Run the appropriate command based on arguments.
+        
+        After a command, the metrics summary is printed and, with --metrics,
+        the metrics are saved to a file. With --profile, the command is
+        profiled phase by phase (see Profiler) and the profile is saved too.
+        """
         if self.args.interactive:
             return self.run_interactive_wizard()
 
         command = self.args.command
+        profile_prefix = getattr(self.args, 'profile', None)
+        profiler = Profiler() if profile_prefix is not None else None
+        if profiler:
+            profiler.start()
+        try:
+            with self.metrics.phase(command), profile_phase(command):
+                result = self._run_command(command)
+        finally:
+            if profiler:
+                profiler.stop()
+        
+        summary = self.metrics.summary()
+        if summary:
+            print()
+            print(summary)
+        metrics_path = getattr(self.args, 'metrics', None)
+        if metrics_path:
+            if not self.metrics.save(metrics_path):
+                return 1
+            print(f"Saved metrics to {metrics_path}")
+        if profiler:
+            print()
+            print(profiler.summary())
+            paths = profiler.save(profile_prefix or f"{command}_profile")
+            if paths is None:
+                return 1
+            print(f"Saved profile to {', '.join(paths)}")
+        return result
+
+    def _run_command(self, command: str):
+        """Run one command and return its exit code."""
         if command == "convert":
             return self.convert()
         elif command == "import":
@@ -62,6 +132,16 @@ class AuditWizard:
             return self.update_audits()
         elif command == "report":
             return self.generate_report()
+        elif command == "export":
+            return self.export_audits()
+        elif command == "sync":
+            return self.sync_audits()
+        elif command == "matrix":
+            return self.export_floor_matrix()
+        elif command == "pipeline":
+            return self.run_pipeline()
+        elif command == "generate":
+            return self.generate_audits()
         else:
             print(f"Unknown command: {command}")
             return 1
@@ -79,9 +159,10 @@ class AuditWizard:
             print("3. Import audits into PocketBase")
             print("4. Update existing audits (e.g. add scores)")
             print("5. Generate report from audit file")
-            print("6. Exit")
+            print("6. Export audits from PocketBase")
+            print("7. Exit")
             
-            choice = input("\nEnter your choice (1-6): ")
+            choice = input("\nEnter your choice (1-7): ")
             
             if choice == "1":
                 self._convert_yaml_to_json_interactive()
@@ -94,6 +175,8 @@ class AuditWizard:
             elif choice == "5":
                 self._generate_report_interactive()
             elif choice == "6":
+                self._export_audits_interactive()
+            elif choice == "7":
                 print("\nExiting PocketBase Audit Wizard. Goodbye!")
                 return 0
             else:
@@ -101,6 +184,37 @@ class AuditWizard:
             
             input("\nPress Enter to continue...")
 
+    def _get_concurrency(self) -> int:
+        """Get the requested number of concurrent PocketBase requests."""
+        return max(1, getattr(self.args, 'concurrency', None) or 1)
+
+    def _get_batch_size(self) -> Optional[int]:
+        """Get the requested /api/batch chunk size, or None for single requests."""
+        return getattr(self.args, 'batch_size', None) or None
+
+    def _create_client(self, url: str) -> PocketBaseClient:
+        """Create a PocketBase client with a pool large enough for all workers."""
+        retry_policy = RetryPolicy()
+        if getattr(self.args, 'max_retries', None) is not None:
+            retry_policy.max_retries = self.args.max_retries
+        
+        rate_limiter = None
+        if getattr(self.args, 'rate_limit', None):
+            rate_limiter = RateLimiter(self.args.rate_limit)
+        
+        return PocketBaseClient(url, pool_size=max(DEFAULT_POOL_SIZE, self._get_concurrency()),
+                                retry_policy=retry_policy, rate_limiter=rate_limiter,
+                                token_cache_path=POCKETBASE_TOKEN_CACHE or None, metrics=self.metrics)
+
+    def _connect_to_pocketbase(self):
+        """Connect to PocketBase using the environment settings, if configured."""
+        if self.pb_client or not POCKETBASE_EMAIL:
+            return
+        
+        self.pb_client = self._create_client(POCKETBASE_URL)
+        if not self.pb_client.authenticate(POCKETBASE_EMAIL, POCKETBASE_PASSWORD):
+            print("Connection failed. Will proceed in simulation mode.")
+
     def _clear_screen(self):
         """Clear the terminal screen."""
         os.system('cls' if os.name == 'nt' else 'clear')
@@ -112,8 +226,11 @@ class AuditWizard:
         json_path = input(f"Enter output JSON file path [{DEFAULT_JSON_PATH}]: ") or DEFAULT_JSON_PATH
         
         try:
-            success = AuditConverter.yaml_file_to_json_file(yaml_path, json_path)
-            if success:
+            validator = self._create_validator()
+            success = AuditConverter.yaml_file_to_json_file(yaml_path, json_path, validator=validator)
+            if self._print_validation_errors(validator) and success:
+                print(f"\nSkipped the invalid audits; converted the rest of {yaml_path} to {json_path}")
+            elif success:
                 print(f"\nSuccessfully converted {yaml_path} to {json_path}")
             else:
                 print(f"\nFailed to convert {yaml_path} to {json_path}")
@@ -143,10 +260,16 @@ class AuditWizard:
         
         try:
             self._connect_to_pocketbase_interactive()
-            audits = self._read_json_file(json_path)
-            audits_with_ids = self._import_to_pocketbase(audits)
-            self._write_json_file(audits_with_ids, output_path)
-            print(f"\nSuccessfully imported audits to PocketBase and saved with IDs to {output_path}")
+            self._ask_resume_interactive(output_path)
+            validator = self._create_validator()
+            audits = self._iter_json_file(json_path)
+            if validator:
+                audits = validator.iter_valid_json(audits, json_path)
+            self._import_with_journal(audits, output_path)
+            if self._print_validation_errors(validator):
+                print(f"\nSkipped the invalid audits; imported the rest and saved them with IDs to {output_path}")
+            else:
+                print(f"\nSuccessfully imported audits to PocketBase and saved with IDs to {output_path}")
         except Exception as e:
             print(f"\nError during import: {str(e)}")
 
@@ -157,13 +280,23 @@ class AuditWizard:
         
         try:
             self._connect_to_pocketbase_interactive()
-            audits = self._read_json_file(json_path)
-            updated_audits = self._update_in_pocketbase(audits)
-            self._write_json_file(updated_audits, json_path)
+            self._ask_resume_interactive(json_path)
+            audits = self._iter_json_file(json_path)
+            self._update_with_journal(audits, json_path)
             print(f"\nSuccessfully updated audits in PocketBase and saved to {json_path}")
         except Exception as e:
             print(f"\nError during update: {str(e)}")
 
+    def _ask_resume_interactive(self, output_path: str):
+        """Ask whether to resume from the journal of an interrupted run, if there is one."""
+        journal = ImportJournal(ImportJournal.path_for(output_path))
+        self.args.resume = False
+        if journal.exists():
+            answer = input(f"Found journal of an interrupted run ({journal.path}). Resume it? (Y/n): ") or "y"
+            self.args.resume = answer.lower().startswith("y")
+            if not self.args.resume:
+                journal.remove()
+
     def _generate_report_interactive(self):
         """Interactive generation of audit report."""
         print("\n== Generate Audit Report ==")
@@ -179,6 +312,21 @@ class AuditWizard:
         except Exception as e:
             print(f"\nError generating report: {str(e)}")
 
+    def _export_audits_interactive(self):
+        """Interactive export of audits from PocketBase."""
+        print("\n== Export Audits from PocketBase ==")
+        to_format = input("Enter output format (yaml/json) [yaml]: ") or "yaml"
+        default_path = DEFAULT_JSON_WITH_IDS_PATH if to_format == "json" else DEFAULT_YAML_WITH_IDS_PATH
+        output_path = input(f"Enter output file path [{default_path}]: ") or default_path
+        with_floors = (input("Include account floor ranges? (y/N): ") or "n").lower().startswith("y")
+        
+        try:
+            self._connect_to_pocketbase_interactive()
+            collection = getattr(self.args, 'collection', POCKETBASE_COLLECTION)
+            self._export_from_pocketbase(collection, output_path, to_format, with_floors=with_floors)
+        except Exception as e:
+            print(f"\nError during export: {str(e)}")
+
     def _connect_to_pocketbase_interactive(self):
         """Interactive connection to PocketBase with credentials."""
         print("\n== PocketBase Connection ==")
@@ -188,7 +336,9 @@ class AuditWizard:
         collection = input(f"Enter collection name [{POCKETBASE_COLLECTION}]: ") or POCKETBASE_COLLECTION
         
         print("\nConnecting to PocketBase...")
-        self.pb_client = PocketBaseClient(url)
+        if self.pb_client:
+            self.pb_client.close()
+        self.pb_client = self._create_client(url)
         
         # Attempt authentication
         if self.pb_client.authenticate(email, password):
@@ -201,7 +351,7 @@ class AuditWizard:
 
     def convert(self):
         """Convert between YAML and JSON formats."""
-        if self.args.to_format == "json":
+        if self.args.to_format in ("json", "jsonl"):
             return self._convert_yaml_to_json()
         elif self.args.to_format == "yaml":
             return self._convert_json_to_yaml()
@@ -210,12 +360,18 @@ class AuditWizard:
             return 1
             
     def _convert_yaml_to_json(self):
-        """Convert from YAML to JSON format."""
+        """Convert from YAML to JSON or JSON Lines format."""
+        json_lines = self.args.to_format == "jsonl"
         input_file = self.args.input or DEFAULT_YAML_PATH
-        output_file = self.args.output or DEFAULT_JSON_PATH
+        output_file = self.args.output or (DEFAULT_JSONL_PATH if json_lines else DEFAULT_JSON_PATH)
         
         try:
-            success = AuditConverter.yaml_file_to_json_file(input_file, output_file)
+            validator = self._create_validator()
+            success = AuditConverter.yaml_file_to_json_file(input_file, output_file, json_lines=json_lines,
+                                                            validator=validator, metrics=self.metrics)
+            if self._print_validation_errors(validator) and success:
+                print(f"Skipped the invalid audits; converted the rest of {input_file} to {output_file}")
+                return 1
             if success:
                 print(f"Successfully converted {input_file} to {output_file}")
                 return 0
@@ -232,7 +388,7 @@ class AuditWizard:
         output_file = self.args.output or DEFAULT_YAML_PATH
         
         try:
-            success = AuditConverter.json_file_to_yaml_file(input_file, output_file)
+            success = AuditConverter.json_file_to_yaml_file(input_file, output_file, metrics=self.metrics)
             if success:
                 print(f"Successfully converted {input_file} to {output_file}")
                 return 0
@@ -243,14 +399,61 @@ class AuditWizard:
             print(f"Error during conversion: {str(e)}")
             return 1
 
+    def _create_validator(self) -> Optional[AuditValidator]:
+        """Compile the audit schema, unless validation was turned off with --no-validate."""
+        if getattr(self.args, 'no_validate', False):
+            return None
+        return AuditValidator.from_file(getattr(self.args, 'schema', None) or DEFAULT_SCHEMA_PATH)
+
+    @staticmethod
+    def _print_validation_errors(validator: Optional[AuditValidator]) -> int:
+        """Print the schema errors found by a validator.
+        
+        Returns:
+            int: Number of errors
+        """
+        if not validator or not validator.errors:
+            return 0
+        for error in validator.errors:
+            print(f"Invalid audit data: {error}")
+        print(f"Found {len(validator.errors)} schema errors")
+        return len(validator.errors)
+
+    def _record_file_metrics(self, phase: str, count: int, input_path: Optional[str], output_path: str):
+        """Add a command's records to its phase and count its input and output file sizes."""
+        self.metrics.add_records(phase, count)
+        if input_path:
+            self.metrics.read_file(input_path)
+        self.metrics.wrote_file(output_path)
+
     def _read_json_file(self, file_path: str) -> List[Dict]:
-        """Read JSON data from a file."""
+        """Read JSON or JSON Lines data from a file."""
+        try:
+            with open(file_path, 'r') as file:
+                return list(iter_json_audits(file))
+        except Exception as e:
+            raise Exception(f"Error reading JSON file {file_path}: {str(e)}")
+
+    def _iter_json_file(self, file_path: str) -> Iterator[Dict]:
+        """Read JSON or JSON Lines data from a file one record at a time."""
         try:
             with open(file_path, 'r') as file:
-                return json.load(file)
+                yield from iter_json_audits(file)
         except Exception as e:
             raise Exception(f"Error reading JSON file {file_path}: {str(e)}")
 
+    @staticmethod
+    def _iter_chunks(audits: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+        """Group a stream of audits into lists of at most size audits."""
+        chunk = []
+        for audit in audits:
+            chunk.append(audit)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
     def _write_json_file(self, data: List[Dict], file_path: str) -> bool:
         """Write JSON data to a file."""
         try:
@@ -260,25 +463,129 @@ class AuditWizard:
         except Exception as e:
             raise Exception(f"Error writing to JSON file {file_path}: {str(e)}")
 
+    def _write_json_stream(self, audits: Iterable[Dict], file_path: str) -> int:
+        """Write a stream of audits to a JSON file.
+        
+        The records are written to a temporary file that replaces file_path
+        once complete, so the output may be the file the stream is read from.
+        
+        Returns:
+            int: Number of records written
+        """
+        temp_path = f"{file_path}.tmp"
+        try:
+            with open(temp_path, 'w') as file:
+                count = AuditConverter.write_json_stream(audits, file)
+            os.replace(temp_path, file_path)
+            return count
+        except Exception as e:
+            raise Exception(f"Error writing to JSON file {file_path}: {str(e)}")
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
     def import_audits(self):
         """Import audit records into PocketBase."""
         input_file = self.args.input or DEFAULT_JSON_PATH
         output_file = self.args.output or DEFAULT_JSON_WITH_IDS_PATH
         
         try:
-            audits = self._read_json_file(input_file)
-            audits_with_ids = self._import_to_pocketbase(audits)
-            self._write_json_file(audits_with_ids, output_file)
+            self._connect_to_pocketbase()
+            validator = self._create_validator()
+            audits = self._iter_json_file(input_file)
+            if validator:
+                audits = validator.iter_valid_json(audits, input_file)
+            count = self._import_with_journal(audits, output_file)
+            self._record_file_metrics('import', count, input_file, output_file)
+            if self._print_validation_errors(validator):
+                print(f"Skipped the invalid audits; imported the rest and saved them with IDs to {output_file}")
+                return 1
             print(f"Successfully imported audits to PocketBase and saved with IDs to {output_file}")
             return 0
         except Exception as e:
             print(f"Error during import: {str(e)}")
             return 1
 
-    def _import_to_pocketbase(self, audits: List[Dict]) -> List[Dict]:
-        """Import audit records to PocketBase and return records with IDs."""
+    def _open_journal(self, output_path: str, op: str) -> Tuple[ImportJournal, Dict[int, Dict[str, Any]]]:
+        """Open the write-ahead journal for an import or update.
+        
+        With --resume, the entries of the previous run's journal are returned
+        so they can be applied to the input as it is read (see ImportJournal.apply).
+        
+        Returns:
+            Tuple[ImportJournal, Dict[int, Dict[str, Any]]]: The open journal
+            and the previous run's entries keyed by input index
+        """
+        journal = ImportJournal(ImportJournal.path_for(output_path))
+        resume = getattr(self.args, 'resume', False)
+        
+        entries = {}
+        if journal.exists():
+            if not resume:
+                raise Exception(f"Found journal of an interrupted run at {journal.path}. "
+                                "Re-run with --resume to continue it, or delete it to start over")
+            entries = {index: entry for index, entry in journal.load().items() if entry.get('op') == op}
+            print(f"Resuming from {journal.path}: {len(entries)} audits already done")
+        
+        return journal.open(resume=resume), entries
+
+    def _import_with_journal(self, audits: Iterable[Dict], output_path: str) -> int:
+        """Import audits, journaling each create so an interrupted run can resume.
+        
+        The input is read, imported and written out IMPORT_CHUNK_SIZE audits
+        at a time.
+        
+        Returns:
+            int: Number of audits written to output_path
+        """
+        journal, entries = self._open_journal(output_path, 'create')
+        
+        def imported() -> Iterator[Dict]:
+            offset = 0
+            for chunk in self._iter_chunks(audits, IMPORT_CHUNK_SIZE):
+                ImportJournal.apply(entries, chunk, 'create', offset)
+                yield from self._import_to_pocketbase(chunk, journal, offset)
+                offset += len(chunk)
+        
+        with journal:
+            count = self._write_json_stream(imported(), output_path)
+        journal.remove()
+        return count
+
+    def _update_with_journal(self, audits: Iterable[Dict], output_path: str) -> int:
+        """Update audits, journaling each update so an interrupted run can resume.
+        
+        The input is read, updated and written out IMPORT_CHUNK_SIZE audits
+        at a time.
+        
+        Returns:
+            int: Number of audits written to output_path
+        """
+        journal, entries = self._open_journal(output_path, 'update')
+        
+        def updated() -> Iterator[Dict]:
+            offset = 0
+            for chunk in self._iter_chunks(audits, IMPORT_CHUNK_SIZE):
+                done = set(ImportJournal.apply(entries, chunk, 'update', offset))
+                positions = [offset + i for i in range(len(chunk)) if offset + i not in done]
+                self._update_in_pocketbase([chunk[index - offset] for index in positions], journal, positions)
+                yield from chunk
+                offset += len(chunk)
+        
+        with journal:
+            count = self._write_json_stream(updated(), output_path)
+        journal.remove()
+        return count
+
+    def _import_to_pocketbase(self, audits: List[Dict], journal: Optional[ImportJournal] = None,
+                              offset: int = 0) -> List[Dict]:
+        """Import audit records to PocketBase and return records with IDs.
+        
+        If a journal is given, each successful create is recorded under its
+        position in the input file (offset + i for audits[i]).
+        """
         if not self.pb_client or not self.pb_client.is_authenticated:
-            print("Error: Not authenticated with PocketBase")
+            self._warn_unauthenticated()
             # Fallback to simulation if not connected
             import uuid
             
@@ -294,61 +601,273 @@ class AuditWizard:
                 audit_with_id['id'] = str(uuid.uuid4())[:15]
                 audits_with_ids.append(audit_with_id)
                 
-                print(f"Simulated import audit for {audit['account']} on {audit['date']}")
+                logger.info("Simulated import audit for %s on %s", audit['account'], audit['date'])
             
             return audits_with_ids
         
         # Use the PocketBase client for actual imports
         collection = self.args.collection if hasattr(self.args, 'collection') else POCKETBASE_COLLECTION
-        return self.pb_client.batch_import_audits(collection, audits)
+        on_success = None
+        if journal:
+            on_success = lambda index, audit: journal.record('create', offset + index, audit)
+        with profile_phase('http'):
+            return self.pb_client.batch_import_audits(collection, audits,
+                                                      concurrency=self._get_concurrency(),
+                                                      batch_size=self._get_batch_size(),
+                                                      on_success=on_success)
+
+    def _warn_unauthenticated(self):
+        """Log, once per run, that writes are simulated for lack of a PocketBase session."""
+        if not self._warned_unauthenticated:
+            self._warned_unauthenticated = True
+            logger.error("Not authenticated with PocketBase, simulating the writes")
 
     def update_audits(self):
         """Update existing audit records in PocketBase."""
         input_file = self.args.input or DEFAULT_JSON_WITH_IDS_PATH
         
         try:
-            audits = self._read_json_file(input_file)
-            updated_audits = self._update_in_pocketbase(audits)
-            self._write_json_file(updated_audits, input_file)
+            self._connect_to_pocketbase()
+            audits = self._iter_json_file(input_file)
+            count = self._update_with_journal(audits, input_file)
+            self._record_file_metrics('update', count, input_file, input_file)
             print(f"Successfully updated audits in PocketBase and saved to {input_file}")
             return 0
         except Exception as e:
             print(f"Error during update: {str(e)}")
             return 1
 
-    def _update_in_pocketbase(self, audits: List[Dict]) -> List[Dict]:
-        """Update existing audit records in PocketBase."""
+    def _update_in_pocketbase(self, audits: List[Dict], journal: Optional[ImportJournal] = None,
+                              positions: Optional[List[int]] = None) -> List[Dict]:
+        """Update existing audit records in PocketBase.
+        
+        If a journal is given, each successful update is recorded under its
+        position in the input file (positions[i] for audits[i]).
+        """
         if not self.pb_client or not self.pb_client.is_authenticated:
-            print("Error: Not authenticated with PocketBase")
+            self._warn_unauthenticated()
             # Fallback to simulation if not connected
             updated_audits = []
             
             for audit in audits:
                 # Skip audits without IDs (they can't be updated)
                 if 'id' not in audit:
-                    print(f"Warning: Audit for {audit['account']} on {audit['date']} has no ID, skipping")
+                    logger.warning("Audit for %s on %s has no ID, skipping", audit['account'], audit['date'])
                     updated_audits.append(audit)
                     continue
                 
                 # Simulate updating the record
-                print(f"Simulated update audit {audit['id']} for {audit['account']} on {audit['date']}")
+                logger.info("Simulated update audit %s for %s on %s", audit['id'], audit['account'], audit['date'])
                 updated_audits.append(audit)
             
             return updated_audits
         
         # Use the PocketBase client for actual updates
         collection = self.args.collection if hasattr(self.args, 'collection') else POCKETBASE_COLLECTION
-        return self.pb_client.batch_update_audits(collection, audits)
+        on_success = None
+        if journal:
+            positions = positions if positions is not None else list(range(len(audits)))
+            on_success = lambda index, audit: journal.record('update', positions[index], audit)
+        return self.pb_client.batch_update_audits(collection, audits,
+                                                  concurrency=self._get_concurrency(),
+                                                  batch_size=self._get_batch_size(),
+                                                  on_success=on_success)
 
-    def generate_report(self):
-        """Generate a report from the audit file."""
+    def sync_audits(self):
+        """Sync a local audit file to PocketBase, writing only what changed."""
+        input_file = self.args.input or DEFAULT_JSON_PATH
+        output_file = self.args.output or DEFAULT_JSON_WITH_IDS_PATH
+        
+        try:
+            self._connect_to_pocketbase()
+            if not self.pb_client or not self.pb_client.is_authenticated:
+                print("Error: Not authenticated with PocketBase")
+                return 1
+            
+            audits = self._read_json_file(input_file)
+            syncer = AuditSyncer(self.pb_client, self.args.collection or POCKETBASE_COLLECTION)
+            server_state = syncer.fetch_server_state()
+            plan = syncer.plan(audits, server_state, delete_missing=self.args.delete)
+            print(f"Sync plan: {plan.summary()}")
+            
+            if self.args.dry_run:
+                return 0
+            
+            synced_audits = syncer.apply(plan, concurrency=self._get_concurrency(),
+                                         batch_size=self._get_batch_size())
+            self._write_json_file(synced_audits, output_file)
+            self._record_file_metrics('sync', len(synced_audits), input_file, output_file)
+            if syncer.failed:
+                print(f"Error: {syncer.failed} writes failed; saved the audits with the IDs "
+                      f"known so far to {output_file}")
+                return 1
+            print(f"Successfully synced audits to PocketBase and saved with IDs to {output_file}")
+            return 0
+        except Exception as e:
+            print(f"Error during sync: {str(e)}")
+            return 1
+
+    def export_audits(self):
+        """Export audit records from PocketBase to a YAML or JSON file."""
+        default_path = DEFAULT_JSON_WITH_IDS_PATH if self.args.to_format == "json" else DEFAULT_YAML_WITH_IDS_PATH
+        output_file = self.args.output or default_path
+        
+        try:
+            self._connect_to_pocketbase()
+            collection = self.args.collection or POCKETBASE_COLLECTION
+            count = self._export_from_pocketbase(collection, output_file, self.args.to_format,
+                                                 filter_str=self.args.filter,
+                                                 with_floors=self.args.with_floors,
+                                                 page_size=self.args.page_size)
+            if count is None:
+                return 1
+            self._record_file_metrics('export', count, None, output_file)
+            return 0
+        except Exception as e:
+            print(f"Error during export: {str(e)}")
+            return 1
+
+    def _export_from_pocketbase(self, collection: str, output_file: str, to_format: str,
+                                filter_str: Optional[str] = None, with_floors: bool = False,
+                                page_size: int = DEFAULT_PAGE_SIZE) -> Optional[int]:
+        """Stream audit records from PocketBase into a YAML or JSON file.
+        
+        Records are fetched page by page, sorted by account and date, and
+        written as they arrive so the collection is never held in memory.
+        
+        Returns:
+            Optional[int]: Number of exported audits, or None if not connected
+        """
+        if not self.pb_client or not self.pb_client.is_authenticated:
+            print("Error: Not authenticated with PocketBase")
+            return None
+        
+        start_time = time.perf_counter()
+        
+        account_fields = None
+        if with_floors:
+            if to_format == "json":
+                print("Note: account floor ranges are only included in YAML exports")
+            else:
+                account_fields = {}
+                for account in self.pb_client.iter_records(POCKETBASE_ACCOUNTS_COLLECTION,
+                                                           fields=EXPORT_ACCOUNT_FIELDS,
+                                                           page_size=page_size):
+                    account_id = account.pop('id')
+                    account_fields[account_id] = account
+        
+        records = self.pb_client.iter_records(collection, filter_str=filter_str, sort="account,date",
+                                              fields=EXPORT_AUDIT_FIELDS, page_size=page_size)
+        audits = (AuditConverter.pocketbase_record_to_json(record) for record in records)
+        
+        with open(output_file, 'w') as file:
+            if to_format == "json":
+                count = AuditConverter.write_json_stream(audits, file)
+            else:
+                count = AuditConverter.write_yaml_stream(audits, file, account_fields)
+        
+        elapsed = time.perf_counter() - start_time
+        rate = count / elapsed if elapsed > 0 else 0
+        print(f"Exported {count} audits to {output_file} in {elapsed:.2f}s ({rate:.0f} records/sec)")
+        return count
+
+    def export_floor_matrix(self):
+        """Precompute the floor coverage matrix of every account and save it to a file."""
         input_file = self.args.input
+        output_file = self.args.output or DEFAULT_MATRIX_PATH
+        
+        try:
+            start_time = time.perf_counter()
+            if input_file:
+                if not is_yaml_path(input_file):
+                    print("Error: Floor matrices need a YAML file with account floor ranges "
+                          "(see export --with-floors)")
+                    return 1
+                with open(input_file, 'r') as source, open(output_file, 'w') as file:
+                    matrices = ((account.get('id'), build_account_matrix(account, account.get('audits') or []))
+                                for account in iter_yaml_accounts(source))
+                    count = write_floor_matrices(matrices, file, self.args.encoding)
+            else:
+                self._connect_to_pocketbase()
+                if not self.pb_client or not self.pb_client.is_authenticated:
+                    print("Error: Not authenticated with PocketBase")
+                    return 1
+                collection = self.args.collection or POCKETBASE_COLLECTION
+                with open(output_file, 'w') as file:
+                    count = write_floor_matrices(self._iter_pocketbase_matrices(collection, self.args.page_size),
+                                                 file, self.args.encoding)
+            
+            elapsed = time.perf_counter() - start_time
+            self._record_file_metrics('matrix', count, input_file, output_file)
+            print(f"Saved floor matrices of {count} accounts to {output_file} in {elapsed:.2f}s")
+            return 0
+        except Exception as e:
+            print(f"Error building floor matrices: {str(e)}")
+            return 1
+
+    def _iter_pocketbase_matrices(self, collection: str, page_size: int) -> Iterator[Tuple[str, Any]]:
+        """Build the floor matrix of every PocketBase account from its audits.
+        
+        Audits are fetched sorted by account, so only one account's audits
+        are held at a time. Accounts without audits follow at the end.
+        """
+        accounts = {}
+        for account in self.pb_client.iter_records(POCKETBASE_ACCOUNTS_COLLECTION,
+                                                   fields=EXPORT_ACCOUNT_FIELDS, page_size=page_size):
+            accounts[account['id']] = account
+        
+        records = self.pb_client.iter_records(collection, sort="account,date",
+                                              fields=["account", "date", "visited_floors"], page_size=page_size)
+        account_id = None
+        audits: List[Dict] = []
+        for record in records:
+            if record.get('account') != account_id:
+                if account_id in accounts:
+                    yield account_id, build_account_matrix(accounts.pop(account_id), audits)
+                account_id = record.get('account')
+                audits = []
+            audits.append(record)
+        if account_id in accounts:
+            yield account_id, build_account_matrix(accounts.pop(account_id), audits)
+        
+        for account_id, account in accounts.items():
+            yield account_id, build_account_matrix(account, [])
+
+    def generate_report(self):
+        """Generate a report from one audit file, or from several aggregated in parallel."""
         output_file = self.args.output or DEFAULT_REPORT_PATH
         
         try:
-            success = AuditReporter.generate_report_from_file(input_file, output_file)
+            input_files = expand_audit_paths(self.args.input)
+            cache = None
+            if len(input_files) > 1:
+                if self.args.distribution or self.args.stats_backend:
+                    print("Error: --distribution and --stats-backend need a single input file")
+                    return 1
+                print(f"Aggregating {len(input_files)} audit files")
+                success = AuditReporter.generate_report_from_files(input_files, output_file,
+                                                                   workers=self.args.workers,
+                                                                   use_cache=self.args.cache,
+                                                                   formats=self.args.report_formats,
+                                                                   metrics=self.metrics)
+            else:
+                if self.args.cache:
+                    if self.args.distribution or self.args.stats_backend:
+                        print("Note: --cache is not used with --distribution or --stats-backend")
+                    else:
+                        cache = ReportCache(ReportCache.path_for(input_files[0]))
+                success = AuditReporter.generate_report_from_file(input_files[0], output_file,
+                                                                  distribution=self.args.distribution,
+                                                                  backend=self.args.stats_backend,
+                                                                  cache=cache,
+                                                                  formats=self.args.report_formats,
+                                                                  metrics=self.metrics)
             if success:
-                print(f"Report generated successfully at {output_file}")
+                if cache is not None and cache.hits + cache.misses:
+                    print(f"Reused {cache.hits} of {cache.hits + cache.misses} cached account blocks "
+                          f"({cache.path})")
+                for _, path in report_output_paths(output_file, self.args.report_formats):
+                    print(f"Report generated successfully at {path}")
                 return 0
             else:
                 print(f"Failed to generate report at {output_file}")
@@ -357,6 +876,170 @@ class AuditWizard:
             print(f"Error generating report: {str(e)}")
             return 1
 
+    def run_pipeline(self):
+        """Validate, convert, import and report on a YAML file in one overlapped pass.
+
+        Each stage runs in its own thread on chunks of about
+        IMPORT_CHUNK_SIZE audits, connected by bounded queues, so the report
+        is aggregated while later chunks are still being imported. Invalid
+        audits are reported and left out. Intermediate files are only
+        written when their option is given.
+        """
+        input_file = self.args.input or DEFAULT_YAML_PATH
+        report_file = self.args.report or DEFAULT_REPORT_PATH
+        output_file = self.args.output
+
+        if self.args.resume and not output_file:
+            print("Error: --resume needs the --output file of the interrupted run")
+            return 1
+
+        try:
+            validator = self._create_validator()
+            self._connect_to_pocketbase()
+            start_time = time.perf_counter()
+            journal, entries = self._open_journal(output_file, 'create') if output_file else (None, {})
+
+            def read_blocks() -> Iterator[List[YamlBlock]]:
+                with open(input_file, 'r') as file:
+                    reader = YamlAccountReader(file)
+                    chunk = []
+                    size = 0
+                    for block in reader:
+                        chunk.append(block)
+                        audits = block.account.get('audits') if isinstance(block.account, dict) else None
+                        size += len(audits) if isinstance(audits, list) else 1
+                        if size >= IMPORT_CHUNK_SIZE:
+                            yield chunk
+                            chunk = []
+                            size = 0
+                    validator.check_root(reader, input_file)
+                    if chunk:
+                        yield chunk
+
+            def read_pairs() -> Iterator[List[Tuple[Any, Optional[Dict]]]]:
+                with open(input_file, 'r') as file:
+                    yield from self._iter_chunks(iter_yaml_audits(file), IMPORT_CHUNK_SIZE)
+
+            def validate(chunk: List[YamlBlock]) -> List[Tuple[Any, Optional[Dict]]]:
+                return [pair for block in chunk for pair in validator.check_block(block, input_file)]
+
+            def convert(chunk: List[Tuple[Any, Optional[Dict]]]) -> List[Dict]:
+                return list(AuditConverter.iter_yaml_audits_to_json(chunk))
+
+            offset = [0]
+
+            def import_chunk(chunk: List[Dict]) -> List[Dict]:
+                if entries:
+                    # Copied so the IDs set on resume do not leak into the converted JSON
+                    chunk = [audit.copy() for audit in chunk]
+                    ImportJournal.apply(entries, chunk, 'create', offset[0])
+                imported = self._import_to_pocketbase(chunk, journal, offset[0])
+                offset[0] += len(chunk)
+                return imported
+
+            def aggregate(chunks: Iterator[List[Dict]]) -> AuditAggregator:
+                return AuditAggregator().add_records(iter_json_records(iter_records(chunks)))
+
+            pipeline = Pipeline(self.args.queue_size)
+            if validator:
+                pipeline.source("read", read_blocks())
+                pipeline.stage("validate", validate)
+            else:
+                pipeline.source("read", read_pairs())
+            pipeline.stage("convert", convert)
+            pipeline.stage("import", import_chunk)
+            pipeline.sink("report", "import", aggregate)
+            if self.args.json_output:
+                pipeline.sink("json", "convert",
+                              lambda chunks: self._write_json_stream(iter_records(chunks), self.args.json_output))
+            if output_file:
+                pipeline.sink("output", "import",
+                              lambda chunks: self._write_json_stream(iter_records(chunks), output_file))
+            if self.args.yaml_output:
+                pipeline.sink("yaml", "import",
+                              lambda chunks: self._write_yaml_stream(iter_records(chunks), self.args.yaml_output))
+
+            if journal:
+                with journal:
+                    results = pipeline.run()
+                journal.remove()
+            else:
+                results = pipeline.run()
+
+            # Accounts are listed in input order, as for a YAML report
+            model = ReportModel(results["report"], sort_accounts=False)
+            if not AuditReporter.save_report(model, report_file, self.args.report_formats):
+                print(f"Failed to generate report at {report_file}")
+                return 1
+
+            elapsed = time.perf_counter() - start_time
+            self._record_pipeline_metrics(pipeline, elapsed)
+            self.metrics.read_file(input_file)
+            for path in (self.args.json_output, output_file, self.args.yaml_output):
+                if path:
+                    self.metrics.wrote_file(path)
+                    print(f"Saved {path}")
+            for _, path in report_output_paths(report_file, self.args.report_formats):
+                print(f"Report generated successfully at {path}")
+            if self._print_validation_errors(validator):
+                print("Skipped the invalid audits")
+                return 1
+            return 0
+        except Exception as e:
+            print(f"Error during pipeline: {str(e)}")
+            return 1
+
+    def generate_audits(self):
+        """Generate a deterministic synthetic audit file for tests and benchmarks."""
+        output_file = self.args.output or DEFAULT_SYNTHETIC_PATH
+        dataset = SyntheticDataset(self.args.accounts, self.args.audits, seed=self.args.seed,
+                                   years=self.args.years, score_rate=self.args.score_rate)
+        
+        try:
+            with open(output_file, 'w') as file:
+                if self.args.to_format == "json":
+                    count = AuditConverter.write_json_stream(dataset.iter_json_audits(), file)
+                elif self.args.to_format == "jsonl":
+                    count = AuditConverter.write_json_lines(dataset.iter_json_audits(), file)
+                else:
+                    count = dataset.write_yaml(file)
+            self._record_file_metrics('generate', count, None, output_file)
+            print(f"Generated {count} audits of {dataset.accounts} accounts in {output_file}")
+            return 0
+        except Exception as e:
+            print(f"Error generating audits: {str(e)}")
+            return 1
+
+    def _write_yaml_stream(self, audits: Iterable[Dict], file_path: str) -> int:
+        """Write a stream of audits to a YAML file through a temporary file.
+
+        Returns:
+            int: Number of records written
+        """
+        temp_path = f"{file_path}.tmp"
+        try:
+            with open(temp_path, 'w') as file:
+                count = AuditConverter.write_yaml_stream(audits, file)
+            os.replace(temp_path, file_path)
+            return count
+        except Exception as e:
+            raise Exception(f"Error writing to YAML file {file_path}: {str(e)}")
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _record_pipeline_metrics(self, pipeline: Pipeline, elapsed: float):
+        """Add each pipeline stage to the metrics as a phase and print the slowest one.
+        
+        A stage's time is its busy time, so the records per second of the
+        stages show which one holds up the others.
+        """
+        for stats in pipeline.stats.values():
+            self.metrics.add_records(stats.name, stats.records, stats.busy_seconds)
+        self.metrics.add_records('pipeline', pipeline.stats['import'].records)
+        slowest = max(pipeline.stats.values(), key=lambda stats: stats.busy_seconds)
+        print(f"Finished in {elapsed:.2f}s (slowest stage: {slowest.name}, {slowest.busy_seconds:.2f}s)")
+
 
 def main():
     """Main entry point for the PocketBase Audit Wizard."""
@@ -371,17 +1054,31 @@ def main():
         help="Run in interactive wizard mode"
     )
     
+    # Options shared by every command
+    common_parser = argparse.ArgumentParser(add_help=False)
+    common_parser.add_argument(
+        "-v", "--verbose",
+        action="count",
+        default=0,
+        help="Log each record (-v), and debug details (-vv)"
+    )
+    common_parser.add_argument(
+        "--metrics",
+        help="Save the run's timings, throughput, HTTP latencies and bytes transferred to a file "
+             "(JSON for a .json path, OpenMetrics text otherwise)"
+    )
+    
     # Create subparsers for commands
     subparsers = parser.add_subparsers(dest="command", help="Command to execute")
     
     # Convert command
-    convert_parser = subparsers.add_parser("convert", help="Convert between YAML and JSON")
+    convert_parser = subparsers.add_parser("convert", help="Convert between YAML and JSON", parents=[common_parser])
     convert_parser.add_argument(
         "-f", "--format",
         dest="to_format",
-        choices=["yaml", "json"],
+        choices=["yaml", "json", "jsonl"],
         required=True,
-        help="Target format to convert to"
+        help="Target format to convert to (jsonl writes JSON Lines)"
     )
     convert_parser.add_argument(
         "-i", "--input",
@@ -391,9 +1088,26 @@ def main():
         "-o", "--output",
         help=f"Output file path (default: {DEFAULT_JSON_PATH} or {DEFAULT_YAML_PATH})"
     )
+    convert_parser.add_argument(
+        "--no-validate",
+        action="store_true",
+        help="Do not check the input against the audit schema"
+    )
+    convert_parser.add_argument(
+        "--schema",
+        help=f"Audit schema to check the input against (default: {DEFAULT_SCHEMA_PATH})"
+    )
+    convert_parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="",
+        metavar="PREFIX",
+        help="Profile each phase with cProfile and tracemalloc, and save <PREFIX>.<phase>.pstats and "
+             "<PREFIX>.collapsed (default prefix: convert_profile)"
+    )
     
     # Import command
-    import_parser = subparsers.add_parser("import", help="Import audits into PocketBase")
+    import_parser = subparsers.add_parser("import", help="Import audits into PocketBase", parents=[common_parser])
     import_parser.add_argument(
         "-i", "--input",
         help=f"Input JSON file path (default: {DEFAULT_JSON_PATH})"
@@ -402,26 +1116,362 @@ def main():
         "-o", "--output",
         help=f"Output JSON file path with IDs (default: {DEFAULT_JSON_WITH_IDS_PATH})"
     )
+    import_parser.add_argument(
+        "--no-validate",
+        action="store_true",
+        help="Do not check the input against the audit schema"
+    )
+    import_parser.add_argument(
+        "--schema",
+        help=f"Audit schema to check the input against (default: {DEFAULT_SCHEMA_PATH})"
+    )
+    import_parser.add_argument(
+        "-c", "--concurrency",
+        type=int,
+        default=1,
+        help="Maximum number of concurrent requests to PocketBase (default: 1)"
+    )
+    import_parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Resume an interrupted run from its journal, skipping audits already written"
+    )
+    import_parser.add_argument(
+        "-b", "--batch-size",
+        type=int,
+        help=f"Send writes through PocketBase's batch API in chunks of this size "
+             f"(PocketBase allows {DEFAULT_BATCH_SIZE} by default)"
+    )
+    import_parser.add_argument(
+        "--rate-limit",
+        type=float,
+        help="Maximum number of requests per second across all workers"
+    )
+    import_parser.add_argument(
+        "--max-retries",
+        type=int,
+        help="Retries for rate-limited or temporarily unavailable requests (default: 5)"
+    )
+    import_parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="",
+        metavar="PREFIX",
+        help="Profile each phase with cProfile and tracemalloc, and save <PREFIX>.<phase>.pstats and "
+             "<PREFIX>.collapsed (default prefix: import_profile)"
+    )
     
     # Update command
-    update_parser = subparsers.add_parser("update", help="Update existing audits in PocketBase")
+    update_parser = subparsers.add_parser("update", help="Update existing audits in PocketBase", parents=[common_parser])
     update_parser.add_argument(
         "-i", "--input",
         help=f"Input JSON file path with IDs (default: {DEFAULT_JSON_WITH_IDS_PATH})"
     )
+    update_parser.add_argument(
+        "-c", "--concurrency",
+        type=int,
+        default=1,
+        help="Maximum number of concurrent requests to PocketBase (default: 1)"
+    )
+    update_parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Resume an interrupted run from its journal, skipping audits already written"
+    )
+    update_parser.add_argument(
+        "-b", "--batch-size",
+        type=int,
+        help=f"Send writes through PocketBase's batch API in chunks of this size "
+             f"(PocketBase allows {DEFAULT_BATCH_SIZE} by default)"
+    )
+    update_parser.add_argument(
+        "--rate-limit",
+        type=float,
+        help="Maximum number of requests per second across all workers"
+    )
+    update_parser.add_argument(
+        "--max-retries",
+        type=int,
+        help="Retries for rate-limited or temporarily unavailable requests (default: 5)"
+    )
     
     # Report command
-    report_parser = subparsers.add_parser("report", help="Generate report from audit file")
+    report_parser = subparsers.add_parser("report", help="Generate report from audit files", parents=[common_parser])
     report_parser.add_argument(
         "-i", "--input",
+        nargs="+",
         required=True,
-        help="Input file path (YAML or JSON)"
+        help="Input file paths, directories or glob patterns (YAML or JSON); several files are reported as one"
+    )
+    report_parser.add_argument(
+        "-o", "--output",
+        help=f"Output report file path (default: {DEFAULT_REPORT_PATH})"
+    )
+    report_parser.add_argument(
+        "-f", "--format",
+        dest="report_formats",
+        nargs="+",
+        choices=REPORT_FORMATS,
+        default=["text"],
+        help="Report formats written from one aggregation; with several, each replaces the output file's "
+             "extension (default: text)"
+    )
+    report_parser.add_argument(
+        "--distribution",
+        action="store_true",
+        help="Include the median/p90 days between audits and score mean/stddev/percentiles"
+    )
+    report_parser.add_argument(
+        "--stats-backend",
+        choices=["auto", "numpy", "python"],
+        help="Compute statistics on an in-memory table, vectorized with NumPy if installed (auto/numpy) "
+             "or in pure Python"
+    )
+    report_parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Keep per-account partial aggregates next to the input file and only recompute changed accounts"
     )
     report_parser.add_argument(
+        "-w", "--workers",
+        type=int,
+        help="Worker processes aggregating multiple input files (default: one per CPU)"
+    )
+    report_parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="",
+        metavar="PREFIX",
+        help="Profile each phase with cProfile and tracemalloc, and save <PREFIX>.<phase>.pstats and "
+             "<PREFIX>.collapsed (default prefix: report_profile)"
+    )
+    
+    # Sync command
+    sync_parser = subparsers.add_parser("sync", help="Create, update or delete only the audits that differ from PocketBase", parents=[common_parser])
+    sync_parser.add_argument(
+        "-i", "--input",
+        help=f"Input JSON file path (default: {DEFAULT_JSON_PATH})"
+    )
+    sync_parser.add_argument(
         "-o", "--output",
+        help=f"Output JSON file path with IDs (default: {DEFAULT_JSON_WITH_IDS_PATH})"
+    )
+    sync_parser.add_argument(
+        "--collection",
+        help=f"Collection to sync (default: {POCKETBASE_COLLECTION})"
+    )
+    sync_parser.add_argument(
+        "--delete",
+        action="store_true",
+        help="Delete server records that are not in the input file"
+    )
+    sync_parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Print the sync plan without writing anything"
+    )
+    sync_parser.add_argument(
+        "-c", "--concurrency",
+        type=int,
+        default=1,
+        help="Maximum number of concurrent requests to PocketBase (default: 1)"
+    )
+    sync_parser.add_argument(
+        "-b", "--batch-size",
+        type=int,
+        help=f"Send writes through PocketBase's batch API in chunks of this size "
+             f"(PocketBase allows {DEFAULT_BATCH_SIZE} by default)"
+    )
+    sync_parser.add_argument(
+        "--rate-limit",
+        type=float,
+        help="Maximum number of requests per second across all workers"
+    )
+    sync_parser.add_argument(
+        "--max-retries",
+        type=int,
+        help="Retries for rate-limited or temporarily unavailable requests (default: 5)"
+    )
+    
+    # Export command
+    export_parser = subparsers.add_parser("export", help="Export audits from PocketBase to YAML or JSON", parents=[common_parser])
+    export_parser.add_argument(
+        "-f", "--format",
+        dest="to_format",
+        choices=["yaml", "json"],
+        default="yaml",
+        help="Output format (default: yaml)"
+    )
+    export_parser.add_argument(
+        "-o", "--output",
+        help=f"Output file path (default: {DEFAULT_YAML_WITH_IDS_PATH} or {DEFAULT_JSON_WITH_IDS_PATH})"
+    )
+    export_parser.add_argument(
+        "--collection",
+        help=f"Collection to export (default: {POCKETBASE_COLLECTION})"
+    )
+    export_parser.add_argument(
+        "--filter",
+        help="PocketBase filter expression, e.g. \"date >= '2024-01-01'\""
+    )
+    export_parser.add_argument(
+        "--with-floors",
+        action="store_true",
+        help="Include each account's floors_min, floors_max and excluded_floors (YAML only)"
+    )
+    export_parser.add_argument(
+        "--page-size",
+        type=int,
+        default=DEFAULT_PAGE_SIZE,
+        help=f"Number of records fetched per request (default: {DEFAULT_PAGE_SIZE})"
+    )
+    
+    # Matrix command
+    matrix_parser = subparsers.add_parser("matrix", help="Precompute the floor coverage matrix of every account", parents=[common_parser])
+    matrix_parser.add_argument(
+        "-i", "--input",
+        help="YAML audit file with account floor ranges (default: read from PocketBase)"
+    )
+    matrix_parser.add_argument(
+        "-o", "--output",
+        help=f"Output file path (default: {DEFAULT_MATRIX_PATH})"
+    )
+    matrix_parser.add_argument(
+        "--encoding",
+        choices=MATRIX_ENCODINGS,
+        default="json",
+        help="Matrix encoding: the dashboard's floor matrix, or hex bitsets per month (default: json)"
+    )
+    matrix_parser.add_argument(
+        "--collection",
+        help=f"Audit collection to read from PocketBase (default: {POCKETBASE_COLLECTION})"
+    )
+    matrix_parser.add_argument(
+        "--page-size",
+        type=int,
+        default=DEFAULT_PAGE_SIZE,
+        help=f"Number of records fetched per request (default: {DEFAULT_PAGE_SIZE})"
+    )
+    
+    # Pipeline command
+    pipeline_parser = subparsers.add_parser("pipeline", help="Validate, convert, import and report on a YAML file "
+                                                             "in one pass with overlapping stages", parents=[common_parser])
+    pipeline_parser.add_argument(
+        "-i", "--input",
+        help=f"Input YAML file path (default: {DEFAULT_YAML_PATH})"
+    )
+    pipeline_parser.add_argument(
+        "-r", "--report",
         help=f"Output report file path (default: {DEFAULT_REPORT_PATH})"
     )
+    pipeline_parser.add_argument(
+        "-f", "--format",
+        dest="report_formats",
+        nargs="+",
+        choices=REPORT_FORMATS,
+        default=["text"],
+        help="Report formats; with several, each replaces the report file's extension (default: text)"
+    )
+    pipeline_parser.add_argument(
+        "--json-output",
+        help="Also save the converted audits to this JSON file before import"
+    )
+    pipeline_parser.add_argument(
+        "-o", "--output",
+        help="Also save the imported audits with IDs to this JSON file; enables --resume"
+    )
+    pipeline_parser.add_argument(
+        "--yaml-output",
+        help="Also save the imported audits with IDs to this YAML file"
+    )
+    pipeline_parser.add_argument(
+        "--no-validate",
+        action="store_true",
+        help="Do not check the input against the audit schema"
+    )
+    pipeline_parser.add_argument(
+        "--schema",
+        help=f"Audit schema to check the input against (default: {DEFAULT_SCHEMA_PATH})"
+    )
+    pipeline_parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=PIPELINE_QUEUE_SIZE,
+        help=f"Chunks of {IMPORT_CHUNK_SIZE} audits buffered between stages (default: {PIPELINE_QUEUE_SIZE})"
+    )
+    pipeline_parser.add_argument(
+        "-c", "--concurrency",
+        type=int,
+        default=1,
+        help="Maximum number of concurrent requests to PocketBase (default: 1)"
+    )
+    pipeline_parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Resume an interrupted run from its journal, skipping audits already imported"
+    )
+    pipeline_parser.add_argument(
+        "-b", "--batch-size",
+        type=int,
+        help=f"Send writes through PocketBase's batch API in chunks of this size "
+             f"(PocketBase allows {DEFAULT_BATCH_SIZE} by default)"
+    )
+    pipeline_parser.add_argument(
+        "--rate-limit",
+        type=float,
+        help="Maximum number of requests per second across all workers"
+    )
+    pipeline_parser.add_argument(
+        "--max-retries",
+        type=int,
+        help="Retries for rate-limited or temporarily unavailable requests (default: 5)"
+    )
     
+    # Generate command
+    generate_parser = subparsers.add_parser("generate", help="Generate a synthetic audit file for tests and benchmarks",
+                                            parents=[common_parser])
+    generate_parser.add_argument(
+        "-o", "--output",
+        help=f"Output file path (default: {DEFAULT_SYNTHETIC_PATH})"
+    )
+    generate_parser.add_argument(
+        "-f", "--format",
+        dest="to_format",
+        choices=["yaml", "json", "jsonl"],
+        default="yaml",
+        help="Output format; YAML includes the account floor ranges (default: yaml)"
+    )
+    generate_parser.add_argument(
+        "--accounts",
+        type=int,
+        default=100,
+        help="Number of accounts (default: 100)"
+    )
+    generate_parser.add_argument(
+        "--audits",
+        type=int,
+        default=100,
+        help="Number of audits per account (default: 100)"
+    )
+    generate_parser.add_argument(
+        "--seed",
+        type=int,
+        default=SYNTHETIC_SEED,
+        help=f"Random seed; the same seed and options give the same file (default: {SYNTHETIC_SEED})"
+    )
+    generate_parser.add_argument(
+        "--years",
+        type=int,
+        default=5,
+        help="Years the audit dates are spread over, up to the end of 2025 (default: 5)"
+    )
+    generate_parser.add_argument(
+        "--score-rate",
+        type=float,
+        default=0.3,
+        help="Fraction of completed audits with a score (default: 0.3)"
+    )
+
     # Parse arguments
     args = parser.parse_args()
     
@@ -430,9 +1480,17 @@ def main():
         parser.print_help()
         return 1
     
+    verbosity = getattr(args, 'verbose', 0)
+    level = logging.DEBUG if verbosity > 1 else logging.INFO if verbosity == 1 else logging.WARNING
+    logging.basicConfig(format="%(message)s", level=level, stream=sys.stdout)
+    
     # Run the wizard
     wizard = AuditWizard(args)
-    return wizard.run()
+    try:
+        return wizard.run()
+    finally:
+        if wizard.pb_client:
+            wizard.pb_client.close()
 
 
 if __name__ == "__main__":
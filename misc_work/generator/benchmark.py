@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Benchmark Module for Audit Wizard
+Times convert, report and import on synthetic datasets and compares the
+results with earlier runs
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from converter import AuditConverter
+from local_server import LocalPocketBase
+from pocketbase_client import PocketBaseClient
+from readers import iter_json_audits
+from reporter import AuditReporter
+from synthetic import SYNTHETIC_SEED, SyntheticDataset
+from validator import DEFAULT_SCHEMA_PATH, AuditValidator
+
+# Dataset sizes (total audits) benchmarked by default; up to 10**7 can be given with --sizes
+DEFAULT_BENCHMARK_SIZES = (1000, 10000, 100000)
+
+# Operations that can be benchmarked, in the order they run
+BENCHMARK_OPERATIONS = ("generate", "convert", "report-yaml", "report-json", "import")
+
+# File the results of every run are added to
+DEFAULT_RESULTS_PATH = "benchmark_results.json"
+
+# Larger datasets are not imported: over HTTP that takes far longer than everything else
+DEFAULT_IMPORT_LIMIT = 100000
+
+# Relative slowdown against the baseline that counts as a regression
+REGRESSION_THRESHOLD = 0.10
+
+# Slowdowns of fewer seconds than this are timer noise, not regressions
+REGRESSION_MIN_SECONDS = 0.05
+
+# Version of what the import timings measure; imports timed by another version are
+# not compared (2: the stand-in no longer stalls keep-alive responses on Nagle)
+IMPORT_TIMING_VERSION = 2
+
+# Credentials of the in-process PocketBase stand-in
+_BENCHMARK_EMAIL = "admin@example.com"
+_BENCHMARK_PASSWORD = "password"
+
+
+def time_best(run: Callable[[], Any], repeat: int) -> float:
+    """Time a function, keeping the fastest of several runs.
+
+    Args:
+        run: Function to time; it raises on failure
+        repeat: Number of runs
+
+    Returns:
+        float: Seconds of the fastest run
+    """
+    best = None
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+class BenchmarkRunner:
+    """Run the benchmark operations on synthetic datasets of several sizes."""
+
+    def __init__(self, data_dir: str, repeat: int = 3, seed: int = SYNTHETIC_SEED,
+                 audits_per_account: int = 100, import_limit: int = DEFAULT_IMPORT_LIMIT,
+                 concurrency: int = 8, batch_size: Optional[int] = 50, pb_url: Optional[str] = None):
+        """Initialize the runner.
+
+        Args:
+            data_dir: Directory for the datasets and outputs; existing
+                datasets of the same size and seed are reused
+            repeat: Runs per operation; the fastest one counts
+            seed: Seed of the synthetic datasets
+            audits_per_account: Audits per account of the datasets
+            import_limit: Largest dataset that is imported
+            concurrency: Concurrent requests of the import
+            batch_size: Batch API chunk size of the import, or None for single requests
+            pb_url: PocketBase to import into (default: a fresh in-process
+                stand-in for every run)
+        """
+        self.data_dir = data_dir
+        self.repeat = repeat
+        self.seed = seed
+        self.audits_per_account = audits_per_account
+        self.import_limit = import_limit
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.pb_url = pb_url
+
+    def dataset_path(self, records: int, extension: str) -> str:
+        """Get the path of a dataset file of the given size."""
+        name = f"synthetic_{records}_{self.audits_per_account}_{self.seed}.{extension}"
+        return os.path.join(self.data_dir, name)
+
+    def run(self, sizes: Sequence[int], operations: Sequence[str]) -> List[Dict[str, Any]]:
+        """Benchmark the operations on a dataset of each size.
+
+        Args:
+            sizes: Total numbers of audits
+            operations: Operations to time (see BENCHMARK_OPERATIONS)
+
+        Returns:
+            List[Dict[str, Any]]: One result per operation and size, with
+            operation, records, seconds and records_per_second
+        """
+        results = []
+        print(f"{'Operation':<12} {'Records':>10} {'Seconds':>10} {'Records/s':>12}")
+        for records in sizes:
+            for operation, seconds in self._run_size(records, operations):
+                result = {'operation': operation, 'records': records, 'seconds': round(seconds, 6),
+                          'records_per_second': round(records / seconds, 3) if seconds > 0 else 0.0}
+                results.append(result)
+                print(f"{operation:<12} {records:>10} {seconds:>10.3f} {result['records_per_second']:>12.0f}")
+        return results
+
+    def _run_size(self, records: int, operations: Sequence[str]) -> List[Tuple[str, float]]:
+        dataset = SyntheticDataset.of_size(records, self.audits_per_account, seed=self.seed)
+        yaml_path = self.dataset_path(records, "yml")
+        json_path = self.dataset_path(records, "json")
+        report_path = os.path.join(self.data_dir, "benchmark_report.txt")
+        timings = []
+
+        def generate():
+            with open(yaml_path, 'w') as file:
+                dataset.write_yaml(file)
+
+        if "generate" in operations:
+            timings.append(("generate", time_best(generate, self.repeat)))
+        elif not os.path.exists(yaml_path):
+            generate()
+
+        def convert():
+            validator = AuditValidator.from_file(DEFAULT_SCHEMA_PATH)
+            if not AuditConverter.yaml_file_to_json_file(yaml_path, json_path, validator=validator):
+                raise RuntimeError(f"Failed to convert {yaml_path}")
+
+        if "convert" in operations:
+            timings.append(("convert", time_best(convert, self.repeat)))
+        elif not os.path.exists(json_path) and ("report-json" in operations or "import" in operations):
+            convert()
+
+        for operation, input_path in (("report-yaml", yaml_path), ("report-json", json_path)):
+            if operation in operations:
+                def report(input_path=input_path):
+                    if not AuditReporter.generate_report_from_file(input_path, report_path):
+                        raise RuntimeError(f"Failed to report on {input_path}")
+                timings.append((operation, time_best(report, self.repeat)))
+
+        if "import" in operations:
+            if records > self.import_limit:
+                print(f"Skipping import of {records} audits (above --import-limit {self.import_limit})")
+            else:
+                with open(json_path, 'r') as file:
+                    audits = list(iter_json_audits(file))
+                timings.append(("import", time_best(lambda: self._import(audits), self.repeat)))
+        return timings
+
+    def _import(self, audits: List[Dict]):
+        """Import audits into a fresh stand-in, or into the server at pb_url."""
+        server = None
+        email, password = _BENCHMARK_EMAIL, _BENCHMARK_PASSWORD
+        if self.pb_url:
+            email = os.environ.get("POCKETBASE_EMAIL", email)
+            password = os.environ.get("POCKETBASE_PASSWORD", password)
+        else:
+            server = LocalPocketBase(users={email: password}).start()
+        client = PocketBaseClient(self.pb_url or server.url, pool_size=self.concurrency)
+        try:
+            if not client.authenticate(email, password):
+                raise RuntimeError("Failed to authenticate with PocketBase")
+            imported = client.batch_import_audits(os.environ.get("POCKETBASE_COLLECTION", "audits"), audits,
+                                                  concurrency=self.concurrency, batch_size=self.batch_size)
+            if sum(1 for audit in imported if 'id' in audit) < len(audits):
+                raise RuntimeError("Some audits were not imported")
+        finally:
+            client.close()
+            if server:
+                server.stop()
+
+
+def load_runs(path: str) -> List[Dict[str, Any]]:
+    """Load the runs saved in a results file.
+
+    Args:
+        path: Results file path
+
+    Returns:
+        List[Dict[str, Any]]: Runs, oldest first, or an empty list if there is no file
+    """
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r') as file:
+        return json.load(file).get('runs', [])
+
+
+def save_runs(path: str, runs: List[Dict[str, Any]]):
+    """Save runs to a results file through a temporary file."""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w') as file:
+        json.dump({'runs': runs}, file, indent=2)
+        file.write("\n")
+    os.replace(temp_path, path)
+
+
+def compare_runs(run: Dict[str, Any], baseline: Dict[str, Any],
+                 threshold: float = REGRESSION_THRESHOLD) -> Tuple[List[str], int]:
+    """Compare the results of a run with those of a baseline run.
+
+    Args:
+        run: Current run
+        baseline: Earlier run
+        threshold: Relative slowdown that counts as a regression, if it
+            is also at least REGRESSION_MIN_SECONDS
+
+    Returns:
+        Tuple[List[str], int]: Comparison table lines and number of regressions
+    """
+    previous = {(result['operation'], result['records']): result for result in baseline['results']}
+    lines = [f"{'Operation':<12} {'Records':>10} {'Baseline s':>11} {'Current s':>10} {'Change':>8}"]
+    regressions = 0
+    compare_imports = (baseline.get('import_timing_version', 1) == run.get('import_timing_version', 1)
+                       and baseline.get('import_options') == run.get('import_options'))
+    for result in run['results']:
+        if result['operation'] == 'import' and not compare_imports:
+            continue
+        before = previous.get((result['operation'], result['records']))
+        if before is None or not before['seconds']:
+            continue
+        change = result['seconds'] / before['seconds'] - 1
+        flag = ""
+        if change > threshold and result['seconds'] - before['seconds'] >= REGRESSION_MIN_SECONDS:
+            flag = "  REGRESSION"
+            regressions += 1
+        lines.append(f"{result['operation']:<12} {result['records']:>10} {before['seconds']:>11.3f} "
+                     f"{result['seconds']:>10.3f} {change:>+8.1%}{flag}")
+    if not compare_imports and any(result['operation'] == 'import' for result in run['results']):
+        lines.append("import: not compared, the baseline was timed with another stand-in or import options; "
+                     "record a new baseline")
+    return lines, regressions
+
+
+def _git_label() -> str:
+    """Describe the checked out version, e.g. 'd199ebb-dirty'."""
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    """Run the benchmarks from the command line."""
+    parser = argparse.ArgumentParser(description="Benchmark convert, report and import on synthetic audits")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_BENCHMARK_SIZES),
+                        help="Dataset sizes in audits, e.g. 1000 10000 ... 10000000 "
+                             f"(default: {' '.join(map(str, DEFAULT_BENCHMARK_SIZES))})")
+    parser.add_argument("--operations", nargs="+", choices=BENCHMARK_OPERATIONS,
+                        default=list(BENCHMARK_OPERATIONS), help="Operations to time (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per operation; the fastest counts (default: 3)")
+    parser.add_argument("--seed", type=int, default=SYNTHETIC_SEED, help="Seed of the synthetic datasets")
+    parser.add_argument("--audits-per-account", type=int, default=100,
+                        help="Audits per account of the datasets (default: 100)")
+    parser.add_argument("--data-dir", help="Keep datasets here and reuse them (default: a temporary directory)")
+    parser.add_argument("--import-limit", type=int, default=DEFAULT_IMPORT_LIMIT,
+                        help=f"Largest dataset to import (default: {DEFAULT_IMPORT_LIMIT})")
+    parser.add_argument("-c", "--concurrency", type=int, default=8,
+                        help="Concurrent requests of the import (default: 8)")
+    parser.add_argument("-b", "--batch-size", type=int, default=50,
+                        help="Batch API chunk size of the import, 0 for single requests (default: 50)")
+    parser.add_argument("--pb-url", help="Import into this PocketBase (e.g. a local_server.py process) instead "
+                                         "of an in-process stand-in; uses POCKETBASE_EMAIL/PASSWORD")
+    parser.add_argument("--label", help="Name of this run in the results (default: git describe)")
+    parser.add_argument("--results", default=DEFAULT_RESULTS_PATH,
+                        help=f"File the run is added to (default: {DEFAULT_RESULTS_PATH})")
+    parser.add_argument("--compare", metavar="LABEL",
+                        help="Compare with the latest run of this label (default: the previous run)")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help=f"Slowdown that counts as a regression (default: {REGRESSION_THRESHOLD})")
+    parser.add_argument("--no-save", action="store_true", help="Do not add this run to the results file")
+    args = parser.parse_args()
+
+    runs = load_runs(args.results)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        data_dir = args.data_dir or temp_dir
+        os.makedirs(data_dir, exist_ok=True)
+        runner = BenchmarkRunner(data_dir, repeat=args.repeat, seed=args.seed,
+                                 audits_per_account=args.audits_per_account, import_limit=args.import_limit,
+                                 concurrency=args.concurrency, batch_size=args.batch_size or None,
+                                 pb_url=args.pb_url)
+        try:
+            results = runner.run(args.sizes, args.operations)
+        except Exception as e:
+            print(f"Error during benchmark: {str(e)}")
+            return 1
+
+    run = {
+        'label': args.label or _git_label(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'audits_per_account': args.audits_per_account,
+        'repeat': args.repeat,
+        'import_timing_version': IMPORT_TIMING_VERSION,
+        'import_options': {'concurrency': args.concurrency, 'batch_size': args.batch_size or None,
+                           'server': 'external' if args.pb_url else 'in-process'},
+        'results': results
+    }
+
+    result = 0
+    if args.compare:
+        baseline = next((previous for previous in reversed(runs) if previous.get('label') == args.compare), None)
+        if baseline is None:
+            print(f"Error: No run labelled {args.compare} in {args.results}")
+            result = 1
+    else:
+        baseline = runs[-1] if runs else None
+    if baseline is not None:
+        lines, regressions = compare_runs(run, baseline, args.threshold)
+        print(f"\nCompared with {baseline.get('label')} ({baseline.get('timestamp')}):")
+        print("\n".join(lines))
+        if regressions:
+            print(f"{regressions} results are more than {args.threshold:.0%} slower")
+            result = 1
+
+    if not args.no_save:
+        save_runs(args.results, runs + [run])
+        print(f"Saved results to {args.results}")
+    return result
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,8 +6,17 @@ Handles conversion between YAML and JSON formats
 
 import json
 import yaml
-from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Any
+
+from dates import day_to_json, json_date_to_yaml, yaml_date_to_json
+from readers import iter_json_audits, iter_yaml_audits
+from metrics import Metrics
+from table import AuditTable
+from validator import AuditValidator
+
+
+class UngroupedAccountsError(ValueError):
+    """Raised when audit records are not grouped by account."""
 
 
 class AuditConverter:
@@ -23,35 +32,155 @@ class AuditConverter:
         Returns:
             List[Dict]: List of audit records in JSON format
         """
-        json_audits = []
-        
-        for account in yaml_data.get('accounts', []):
-            account_id = account.get('id')
-            for audit in account.get('audits', []):
-                # Create a JSON audit record
-                json_audit = {
-                    "account": account_id,
-                    "date": datetime.strptime(audit.get('date'), "%Y-%m-%d").isoformat() + ".000Z",
-                    "status": audit.get('status', 'completed'),
-                    "note": audit.get('note', ''),
-                    "visited_floors": json.dumps(audit.get('visited_floors', [])),
-                    "score": audit.get('score')
-                }
+        pairs = ((account.get('id'), audit)
+                 for account in yaml_data.get('accounts', [])
+                 for audit in account.get('audits', []))
+        return list(AuditConverter.iter_yaml_audits_to_json(pairs))
+
+    @staticmethod
+    def iter_yaml_audits_to_json(pairs: Iterable[Tuple[Any, Optional[Dict]]]) -> Iterator[Dict]:
+        """Convert (account ID, YAML audit) pairs to JSON audit records one at a time.
+        
+        Args:
+            pairs: Pairs as yielded by readers.iter_yaml_audits; pairs without
+                an audit (accounts with no audits) are skipped
+            
+        Yields:
+            Dict: Audit records in JSON format
+        """
+        for account_id, audit in pairs:
+            if audit is None:
+                continue
+            
+            # Create a JSON audit record
+            json_audit = {
+                "account": account_id,
+                "date": yaml_date_to_json(audit.get('date')),
+                "status": audit.get('status', 'completed'),
+                "note": audit.get('note', ''),
+                "visited_floors": json.dumps(audit.get('visited_floors', [])),
+                "score": audit.get('score')
+            }
+            
+            # Add record_id if it exists
+            if 'id' in audit:
+                json_audit['id'] = audit['id']
                 
-                # Add record_id if it exists
-                if 'id' in audit:
-                    json_audit['id'] = audit['id']
-                    
-                json_audits.append(json_audit)
+            yield json_audit
+
+    @staticmethod
+    def json_audit_to_yaml(audit: Dict) -> Dict:
+        """Convert a single JSON audit record to its YAML audit entry.
+        
+        Args:
+            audit: Audit record in JSON format
+            
+        Returns:
+            Dict: YAML audit entry (without the account ID)
+        """
+        # Extract date as YYYY-MM-DD format
+        date = json_date_to_yaml(audit.get('date', ''))
+        
+        # Parse visited_floors from JSON string
+        try:
+            visited_floors = json.loads(audit.get('visited_floors', '[]'))
+        except (json.JSONDecodeError, TypeError):
+            # Handle case where visited_floors might not be a JSON string
+            if isinstance(audit.get('visited_floors'), list):
+                visited_floors = audit.get('visited_floors')
+            else:
+                visited_floors = []
+        
+        # Create YAML audit entry
+        yaml_audit = {
+            'date': date,
+            'visited_floors': visited_floors,
+            'status': audit.get('status', 'completed'),
+            'note': audit.get('note', ''),
+            'score': audit.get('score')
+        }
+        
+        # Add record_id if it exists
+        if 'id' in audit:
+            yaml_audit['id'] = audit['id']
+        
+        return yaml_audit
+
+    @staticmethod
+    def table_to_json(table: AuditTable) -> List[Dict]:
+        """Convert an audit table to JSON format.
         
-        return json_audits
+        Args:
+            table: Audit table
+            
+        Returns:
+            List[Dict]: List of audit records in JSON format
+        """
+        return table.to_json_audits()
 
     @staticmethod
-    def json_to_yaml(json_audits: List[Dict]) -> Dict:
+    def table_to_yaml(table: AuditTable) -> Dict:
+        """Convert an audit table to YAML format, grouping audits by account.
+        
+        Accounts are listed in order of first appearance, including accounts
+        without audits from tables read from YAML.
+        
+        Args:
+            table: Audit table
+            
+        Returns:
+            Dict: YAML data structure with 'accounts' key
+        """
+        accounts = [{'id': account_id, 'audits': []} for account_id in table.account_ids]
+        
+        for row in table.rows_by_account():
+            if table.overrides(row):
+                yaml_audit = AuditConverter.json_audit_to_yaml(table.json_audit(row))
+            else:
+                yaml_audit = {
+                    'date': json_date_to_yaml(day_to_json(table.days[row])),
+                    'visited_floors': table.floors(row),
+                    'status': table.status(row),
+                    'note': table.notes[row],
+                    'score': table.score(row)
+                }
+                if table.ids[row] is not None:
+                    yaml_audit['id'] = table.ids[row]
+            accounts[table.accounts[row]]['audits'].append(yaml_audit)
+        
+        return {'accounts': accounts}
+
+    @staticmethod
+    def pocketbase_record_to_json(record: Dict) -> Dict:
+        """Convert an audit record fetched from PocketBase to the JSON working format.
+        
+        Args:
+            record: Audit record as returned by the PocketBase API
+            
+        Returns:
+            Dict: Audit record in JSON format (as produced by yaml_to_json)
+        """
+        visited_floors = record.get('visited_floors')
+        if not isinstance(visited_floors, str):
+            visited_floors = json.dumps(visited_floors or [])
+        
+        return {
+            "account": record.get('account'),
+            # PocketBase returns "YYYY-MM-DD HH:MM:SS.sssZ"
+            "date": (record.get('date') or '').replace(' ', 'T', 1),
+            "status": record.get('status') or 'completed',
+            "note": record.get('note') or '',
+            "visited_floors": visited_floors,
+            "score": record.get('score'),
+            "id": record.get('id')
+        }
+
+    @staticmethod
+    def json_to_yaml(json_audits: Iterable[Dict]) -> Dict:
         """Convert JSON audit records to YAML format.
         
         Args:
-            json_audits: List of audit records in JSON format
+            json_audits: Audit records in JSON format
             
         Returns:
             Dict: YAML data structure with 'accounts' key
@@ -68,38 +197,7 @@ class AuditConverter:
                     'audits': []
                 }
             
-            # Extract date as YYYY-MM-DD format
-            date_str = audit.get('date', '')
-            if date_str.endswith('Z'):
-                # Handle ISO format dates
-                date_obj = datetime.fromisoformat(date_str[:-1])
-                date = date_obj.strftime("%Y-%m-%d")
-            else:
-                date = date_str
-            
-            # Parse visited_floors from JSON string
-            try:
-                visited_floors = json.loads(audit.get('visited_floors', '[]'))
-            except (json.JSONDecodeError, TypeError):
-                # Handle case where visited_floors might not be a JSON string
-                if isinstance(audit.get('visited_floors'), list):
-                    visited_floors = audit.get('visited_floors')
-                else:
-                    visited_floors = []
-            
-            # Create YAML audit entry
-            yaml_audit = {
-                'date': date,
-                'visited_floors': visited_floors,
-                'status': audit.get('status', 'completed'),
-                'note': audit.get('note', ''),
-                'score': audit.get('score')
-            }
-            
-            # Add record_id if it exists
-            if 'id' in audit:
-                yaml_audit['id'] = audit['id']
-            
+            yaml_audit = AuditConverter.json_audit_to_yaml(audit)
             accounts[account_id]['audits'].append(yaml_audit)
         
         # Convert to list format for YAML
@@ -107,57 +205,198 @@ class AuditConverter:
         return {'accounts': accounts_list}
 
     @staticmethod
-    def yaml_file_to_json_file(yaml_path: str, json_path: str) -> bool:
+    def write_json_stream(json_audits: Iterable[Dict], file: TextIO) -> int:
+        """Write JSON audit records to a file as a JSON array, one record at a time.
+        
+        The output matches json.dump(json_audits, file, indent=2) without
+        holding the full list in memory.
+        
+        Args:
+            json_audits: Audit records in JSON format
+            file: Open text file to write to
+            
+        Returns:
+            int: Number of records written
+        """
+        count = 0
+        file.write("[")
+        for audit in json_audits:
+            file.write(",\n  " if count else "\n  ")
+            file.write(json.dumps(audit, indent=2).replace("\n", "\n  "))
+            count += 1
+        file.write("\n]" if count else "]")
+        return count
+
+    @staticmethod
+    def write_json_lines(json_audits: Iterable[Dict], file: TextIO) -> int:
+        """Write JSON audit records to a file as JSON Lines, one record per line.
+        
+        Args:
+            json_audits: Audit records in JSON format
+            file: Open text file to write to
+            
+        Returns:
+            int: Number of records written
+        """
+        count = 0
+        for audit in json_audits:
+            file.write(json.dumps(audit))
+            file.write("\n")
+            count += 1
+        return count
+
+    @staticmethod
+    def iter_grouped_by_account(json_audits: Iterable[Dict]) -> Iterator[Dict]:
+        """Pass audit records through, checking that they are grouped by account.
+        
+        Args:
+            json_audits: Audit records in JSON format
+            
+        Yields:
+            Dict: The same audit records
+            
+        Raises:
+            UngroupedAccountsError: When an account shows up again after
+                another account's audits
+        """
+        seen = set()
+        current = None
+        for audit in json_audits:
+            account_id = audit.get('account')
+            if not seen or account_id != current:
+                if account_id in seen:
+                    raise UngroupedAccountsError(f"Audits of account {account_id} are not grouped together")
+                seen.add(account_id)
+                current = account_id
+            yield audit
+
+    @staticmethod
+    def write_yaml_stream(json_audits: Iterable[Dict], file: TextIO,
+                          account_fields: Optional[Dict[str, Dict]] = None) -> int:
+        """Write JSON audit records to a file in YAML format, one account block at a time.
+        
+        Audits must arrive grouped by account (e.g. sorted by account); only
+        the current account's audits are held in memory. If an account shows
+        up again later, it is written as a separate block.
+        
+        Args:
+            json_audits: Audit records in JSON format, grouped by account
+            file: Open text file to write to
+            account_fields: Optional extra fields per account ID (e.g. floor
+                ranges) to include in each account block
+            
+        Returns:
+            int: Number of records written
+        """
+        count = 0
+        account_block = None
+        
+        for audit in json_audits:
+            account_id = audit.get('account')
+            if account_block is None or account_block['id'] != account_id:
+                if account_block is None:
+                    file.write("accounts:\n")
+                else:
+                    yaml.dump([account_block], file, default_flow_style=False, sort_keys=False)
+                account_block = {'id': account_id}
+                if account_fields and account_id in account_fields:
+                    account_block.update(account_fields[account_id])
+                account_block['audits'] = []
+            account_block['audits'].append(AuditConverter.json_audit_to_yaml(audit))
+            count += 1
+        
+        if account_block is not None:
+            yaml.dump([account_block], file, default_flow_style=False, sort_keys=False)
+        else:
+            # Match yaml.dump({'accounts': []})
+            file.write("accounts: []\n")
+        return count
+
+    @staticmethod
+    def yaml_file_to_json_file(yaml_path: str, json_path: str, json_lines: Optional[bool] = None,
+                               validator: Optional[AuditValidator] = None,
+                               metrics: Optional[Metrics] = None) -> bool:
         """Convert a YAML file to a JSON file.
         
+        Each audit is written as soon as it has been read and converted.
+        With a validator, the file is checked against the schema as it is
+        read, and invalid audits are left out of the output, as an import
+        leaves them out; the errors are left in validator.errors.
+        
         Args:
             yaml_path: Path to the input YAML file
             json_path: Path to the output JSON file
+            json_lines: Write JSON Lines instead of a JSON array (default:
+                if json_path ends with .jsonl)
+            validator: Optional schema validator
+            metrics: Optional metrics receiving the number of converted
+                audits (phase 'convert') and the file sizes
             
         Returns:
             bool: True if conversion was successful
         """
+        if json_lines is None:
+            json_lines = json_path.endswith('.jsonl')
+        
         try:
-            # Read YAML file
-            with open(yaml_path, 'r') as file:
-                yaml_data = yaml.safe_load(file)
-            
-            # Convert to JSON format
-            json_audits = AuditConverter.yaml_to_json(yaml_data)
+            with open(yaml_path, 'r') as yaml_file, open(json_path, 'w') as json_file:
+                if validator is None:
+                    pairs = iter_yaml_audits(yaml_file)
+                else:
+                    pairs = validator.iter_yaml_pairs(yaml_file, yaml_path)
+                json_audits = AuditConverter.iter_yaml_audits_to_json(pairs)
+                if json_lines:
+                    count = AuditConverter.write_json_lines(json_audits, json_file)
+                else:
+                    count = AuditConverter.write_json_stream(json_audits, json_file)
             
-            # Write JSON file
-            with open(json_path, 'w') as file:
-                json.dump(json_audits, file, indent=2)
-                
+            if metrics:
+                metrics.add_records('convert', count)
+                metrics.read_file(yaml_path)
+                metrics.wrote_file(json_path)
             return True
         except Exception as e:
             print(f"Error converting YAML to JSON: {str(e)}")
             return False
 
     @staticmethod
-    def json_file_to_yaml_file(json_path: str, yaml_path: str) -> bool:
+    def json_file_to_yaml_file(json_path: str, yaml_path: str, metrics: Optional[Metrics] = None) -> bool:
         """Convert a JSON file to a YAML file.
         
+        When the audits are grouped by account, as in files written by
+        yaml_file_to_json_file or exported from PocketBase, each account block
+        is written as soon as it is complete. Otherwise the audits are
+        collected per account in memory first.
+        
         Args:
-            json_path: Path to the input JSON file
+            json_path: Path to the input JSON or JSON Lines file
             yaml_path: Path to the output YAML file
+            metrics: Optional metrics receiving the number of converted
+                audits (phase 'convert') and the file sizes
             
         Returns:
             bool: True if conversion was successful
         """
         try:
-            # Read JSON file
-            with open(json_path, 'r') as file:
-                json_audits = json.load(file)
-            
-            # Convert to YAML format
-            yaml_data = AuditConverter.json_to_yaml(json_audits)
-            
-            # Write YAML file
-            with open(yaml_path, 'w') as file:
-                yaml.dump(yaml_data, file, default_flow_style=False, sort_keys=False)
+            try:
+                with open(json_path, 'r') as json_file, open(yaml_path, 'w') as yaml_file:
+                    json_audits = AuditConverter.iter_grouped_by_account(iter_json_audits(json_file))
+                    count = AuditConverter.write_yaml_stream(json_audits, yaml_file)
+            except UngroupedAccountsError:
+                # Read JSON or JSON Lines file and group the audits by account
+                with open(json_path, 'r') as file:
+                    yaml_data = AuditConverter.json_to_yaml(iter_json_audits(file))
                 
+                # Write YAML file
+                with open(yaml_path, 'w') as file:
+                    yaml.dump(yaml_data, file, default_flow_style=False, sort_keys=False)
+                count = sum(len(account['audits']) for account in yaml_data['accounts'])
+            
+            if metrics:
+                metrics.add_records('convert', count)
+                metrics.read_file(json_path)
+                metrics.wrote_file(yaml_path)
             return True
         except Exception as e:
             print(f"Error converting JSON to YAML: {str(e)}")
-            return False
\ No newline at end of file
+            return False
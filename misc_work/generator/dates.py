@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Date Module for Audit Wizard
+Fast, memoized parsing and conversion of the audit date formats
+"""
+
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Optional, Tuple
+
+# Audits cluster on a few hundred distinct days, so a small cache catches nearly all lookups
+DATE_CACHE_SIZE = 4096
+
+# Time part of JSON format dates, as written by the converter
+MIDNIGHT_SUFFIX = "T00:00:00.000Z"
+
+
+def _split_ymd(value: str) -> Optional[Tuple[int, int, int]]:
+    """Split a string starting with 'YYYY-MM-DD' by fixed slicing.
+
+    Args:
+        value: Date string
+
+    Returns:
+        Optional[Tuple[int, int, int]]: (year, month, day), or None if the
+        string has another shape
+    """
+    if (len(value) >= 10 and value[4] == '-' and value[7] == '-' and value[:10].isascii()
+            and value[:4].isdigit() and value[5:7].isdigit() and value[8:10].isdigit()):
+        return int(value[:4]), int(value[5:7]), int(value[8:10])
+    return None
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def yaml_date_ordinal(value: str) -> int:
+    """Parse a YAML format audit date ('YYYY-MM-DD') to a day ordinal.
+
+    Args:
+        value: Audit date
+
+    Returns:
+        int: Day ordinal
+
+    Raises:
+        ValueError: If the date is invalid, as datetime.strptime would
+    """
+    ymd = _split_ymd(value) if len(value) == 10 else None
+    if ymd is not None:
+        return date(*ymd).toordinal()
+    return datetime.strptime(value, "%Y-%m-%d").toordinal()
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def json_date_ordinal(value: str) -> Optional[int]:
+    """Parse a JSON format audit date to a day ordinal.
+
+    Args:
+        value: ISO date, optionally ending with 'Z'
+
+    Returns:
+        Optional[int]: Day ordinal, or None if the date cannot be parsed
+    """
+    ymd = None
+    if len(value) == 10 or (len(value) == 24 and value.endswith(MIDNIGHT_SUFFIX)):
+        ymd = _split_ymd(value)
+    try:
+        if ymd is not None:
+            return date(*ymd).toordinal()
+        return datetime.fromisoformat(value[:-1] if value.endswith('Z') else value).toordinal()
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def is_iso_date(value: str) -> bool:
+    """Check whether a string is a valid calendar date written exactly as 'YYYY-MM-DD'.
+
+    Args:
+        value: Date string
+
+    Returns:
+        bool: True for a JSON Schema 'date' (RFC 3339 full-date)
+    """
+    ymd = _split_ymd(value) if len(value) == 10 else None
+    if ymd is None:
+        return False
+    try:
+        date(*ymd)
+    except ValueError:
+        return False
+    return True
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def yaml_date_to_json(value: str) -> str:
+    """Convert a YAML format audit date to the JSON format.
+
+    Args:
+        value: Audit date ('YYYY-MM-DD')
+
+    Returns:
+        str: Date as 'YYYY-MM-DDT00:00:00.000Z'
+
+    Raises:
+        ValueError: If the date is invalid, as datetime.strptime would
+    """
+    ymd = _split_ymd(value) if len(value) == 10 else None
+    if ymd is not None:
+        date(*ymd)  # Validate
+        return value + MIDNIGHT_SUFFIX
+    return datetime.strptime(value, "%Y-%m-%d").isoformat() + ".000Z"
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def json_date_to_yaml(value: str) -> str:
+    """Convert a JSON format audit date to the YAML format.
+
+    Dates without a trailing 'Z' are returned unchanged.
+
+    Args:
+        value: ISO date
+
+    Returns:
+        str: Date as 'YYYY-MM-DD'
+
+    Raises:
+        ValueError: If a date ending with 'Z' is invalid
+    """
+    if not value.endswith('Z'):
+        return value
+    # strftime does not zero-pad years before 1000, so leave those to it
+    if len(value) == 24 and value.endswith(MIDNIGHT_SUFFIX) and value[0] != '0':
+        ymd = _split_ymd(value)
+        if ymd is not None:
+            date(*ymd)  # Validate
+            return value[:10]
+    return datetime.fromisoformat(value[:-1]).strftime("%Y-%m-%d")
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def year_of(day: int) -> int:
+    """Get the year of a day ordinal.
+
+    Args:
+        day: Day ordinal
+
+    Returns:
+        int: Year
+    """
+    return date.fromordinal(day).year
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def day_to_json(day: int) -> str:
+    """Format a day ordinal as a JSON format audit date.
+
+    Args:
+        day: Day ordinal
+
+    Returns:
+        str: Date as 'YYYY-MM-DDT00:00:00.000Z'
+    """
+    return date.fromordinal(day).isoformat() + MIDNIGHT_SUFFIX
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Floor Matrix Module for Audit Wizard
+Builds the visited/skipped/excluded floor × month matrix of the dashboard
+(crm/src/shared/utils/buildFloorMatrix.ts) from per-month bitsets, and
+exports precomputed matrices for all accounts
+"""
+
+import json
+import logging
+import math
+import re
+from typing import Any, Dict, Iterable, List, Optional, TextIO, Tuple
+
+# Statuses of a floor in a month
+VISITED = "visited"
+SKIPPED = "skipped"
+EXCLUDED = "excluded"
+
+# Export encodings: the dashboard's FloorMatrix shape, or hex bitsets per month
+MATRIX_ENCODINGS = ("json", "bitset")
+
+_LEADING_INT = re.compile(r"\s*([+-]?\d+)")
+
+logger = logging.getLogger(__name__)
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_finite(value: Any) -> bool:
+    return _is_number(value) and math.isfinite(value)
+
+
+def month_key(date_str: str) -> str:
+    """Format an audit date as the matrix's 'MM-YYYY' month key.
+
+    Args:
+        date_str: Date starting with 'YYYY-MM-DD'
+
+    Returns:
+        str: Month key
+
+    Raises:
+        ValueError: If the date does not have three '-' separated parts
+    """
+    parts = date_str.split("-")
+    if len(parts) != 3:
+        raise ValueError(f"Invalid date format: {date_str}. Expected 'YYYY-MM-DD'.")
+    year, month = parts[0], parts[1]
+    return f"{month}-{year}"
+
+
+def _month_sort_key(key: str) -> Tuple[int, int]:
+    month, year = key.split("-")
+    try:
+        return int(year), int(month)
+    except ValueError:
+        return 0, 0
+
+
+def parse_floor_list(value: Any) -> List[Any]:
+    """Read a list of floors stored as a list or a JSON string, as the dashboard does.
+
+    Args:
+        value: Floor list or JSON-encoded floor list
+
+    Returns:
+        List[Any]: Floors, or an empty list if the value cannot be read
+    """
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except json.JSONDecodeError:
+            return []
+    return value if isinstance(value, list) else []
+
+
+def _parse_int(value: Any) -> Optional[int]:
+    """Mirror JavaScript's parseInt(value, 10), returning None for NaN."""
+    match = _LEADING_INT.match(str(value))
+    return int(match.group(1)) if match else None
+
+
+def account_floor_config(account: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Get an account's floor configuration as the dashboard normalizes it.
+
+    Mirrors getAccountFloorConfig and the checks of useAccountAudits.
+
+    Args:
+        account: Account record with floors_min, floors_max and excluded_floors
+
+    Returns:
+        Optional[Dict[str, Any]]: Floor configuration, or None if the account
+        has no usable floor range
+    """
+    if account.get('floors_min') is None or account.get('floors_max') is None:
+        return None
+
+    floors_min = account['floors_min']
+    if not _is_number(floors_min):
+        floors_min = _parse_int(floors_min) or 1
+    floors_max = account['floors_max']
+    if not _is_number(floors_max):
+        floors_max = _parse_int(floors_max) or floors_min
+
+    if floors_min > floors_max:
+        return None
+    return {
+        'floors_min': floors_min,
+        'floors_max': floors_max,
+        'excluded_floors': parse_floor_list(account.get('excluded_floors'))
+    }
+
+
+class FloorMatrix:
+    """Floor × month matrix of visited, skipped and excluded floors.
+
+    Each month is a bitset of the floors visited in it, with bit i standing
+    for floor floors_min + i. Excluded floors are one bitset shared by all
+    months and take precedence over visits.
+    """
+
+    def __init__(self, floors_min: int, floors_max: int, excluded: int,
+                 months: List[str], visited: List[int]):
+        """Initialize the matrix.
+
+        Args:
+            floors_min: Lowest floor
+            floors_max: Highest floor
+            excluded: Bitset of excluded floors
+            months: Month keys ('MM-YYYY') in chronological order
+            visited: Bitset of visited floors per month
+        """
+        self.floors_min = floors_min
+        self.floors_max = floors_max
+        self.excluded = excluded
+        self.months = months
+        self.visited = visited
+
+    @property
+    def floors(self) -> range:
+        """The floors of the matrix, lowest first."""
+        return range(self.floors_min, self.floors_max + 1)
+
+    def _bit(self, floor: Any) -> Optional[int]:
+        """Get the bit of a floor, or None if it is not an integer floor of the matrix.
+
+        Like buildFloorMatrix, which finds no matrix row for them, this
+        ignores non-finite floors.
+        """
+        if not _is_finite(floor) or floor != int(floor):
+            return None
+        floor = int(floor)
+        if floor < self.floors_min or floor > self.floors_max:
+            return None
+        return 1 << (floor - self.floors_min)
+
+    @classmethod
+    def build(cls, account: Dict[str, Any], audits: Iterable[Dict[str, Any]]) -> "FloorMatrix":
+        """Build the matrix of an account, as buildFloorMatrix does.
+
+        Args:
+            account: Floor configuration with floors_min, floors_max and
+                excluded_floors (see account_floor_config)
+            audits: Audits with date and visited_floors
+
+        Returns:
+            FloorMatrix: The matrix
+
+        Raises:
+            ValueError: If the account or audit data is invalid
+        """
+        if (not account or not _is_number(account.get('floors_min'))
+                or not _is_number(account.get('floors_max'))
+                or not isinstance(account.get('excluded_floors'), list)):
+            raise ValueError("Invalid account object provided.")
+        if not _is_finite(account['floors_min']) or not _is_finite(account['floors_max']):
+            # buildFloorMatrix gets no usable floor range from these either
+            raise ValueError("Invalid floor range: floors_min and floors_max must be finite.")
+        if account['floors_min'] > account['floors_max']:
+            raise ValueError("floors_min cannot be greater than floors_max.")
+
+        matrix = cls(int(account['floors_min']), int(account['floors_max']), 0, [], [])
+        for floor in account['excluded_floors']:
+            matrix.excluded |= matrix._bit(floor) or 0
+
+        # Every date is checked before any floors, so errors match buildFloorMatrix
+        audits = list(audits)
+        try:
+            keys = [month_key(str(audit.get('date'))) for audit in audits]
+        except ValueError as e:
+            raise ValueError(f"Failed extracting dates: {str(e)}")
+
+        visited_by_month: Dict[str, int] = dict.fromkeys(keys, 0)
+        for audit, key in zip(audits, keys):
+            date = str(audit.get('date'))
+            floors = audit.get('visited_floors')
+            if not isinstance(floors, list):
+                raise ValueError(f"visited_floors must be an array for audit on {date}")
+
+            bits = visited_by_month[key]
+            for floor in floors:
+                if not _is_number(floor):
+                    raise ValueError(f"Invalid floor number ({floor}) in audit on {date}")
+                bits |= matrix._bit(floor) or 0
+            visited_by_month[key] = bits
+
+        matrix.months = sorted(visited_by_month, key=_month_sort_key)
+        matrix.visited = [visited_by_month[key] & ~matrix.excluded for key in matrix.months]
+        return matrix
+
+    def status(self, floor: int, month: str) -> str:
+        """Get the status of a floor in a month.
+
+        Args:
+            floor: Floor number
+            month: Month key ('MM-YYYY')
+
+        Returns:
+            str: 'visited', 'skipped' or 'excluded'
+        """
+        bit = self._bit(floor)
+        if bit is None:
+            raise KeyError(floor)
+        if self.excluded & bit:
+            return EXCLUDED
+        return VISITED if self.visited[self.months.index(month)] & bit else SKIPPED
+
+    def to_dict(self) -> Dict[str, Dict[str, str]]:
+        """Convert the matrix to the dashboard's FloorMatrix shape.
+
+        Floors are ordered as JSON.stringify orders the keys of
+        buildFloorMatrix's result: non-negative floors first, then negative ones.
+
+        Returns:
+            Dict[str, Dict[str, str]]: Status per month key per floor
+        """
+        floors = [floor for floor in self.floors if floor >= 0] + [floor for floor in self.floors if floor < 0]
+        matrix = {}
+        for floor in floors:
+            bit = 1 << (floor - self.floors_min)
+            if self.excluded & bit:
+                matrix[str(floor)] = {month: EXCLUDED for month in self.months}
+            else:
+                matrix[str(floor)] = {month: VISITED if bits & bit else SKIPPED
+                                      for month, bits in zip(self.months, self.visited)}
+        return matrix
+
+    def to_compact(self) -> Dict[str, Any]:
+        """Encode the matrix as hex bitsets.
+
+        Returns:
+            Dict[str, Any]: floors_min, floors_max, months, the excluded
+            bitset and one visited bitset per month (bit i is floor floors_min + i)
+        """
+        return {
+            'floors_min': self.floors_min,
+            'floors_max': self.floors_max,
+            'months': self.months,
+            'excluded': format(self.excluded, 'x'),
+            'visited': [format(bits, 'x') for bits in self.visited]
+        }
+
+    @classmethod
+    def from_compact(cls, data: Dict[str, Any]) -> "FloorMatrix":
+        """Decode a matrix encoded by to_compact.
+
+        Args:
+            data: Compact encoding
+
+        Returns:
+            FloorMatrix: The matrix
+        """
+        return cls(data['floors_min'], data['floors_max'], int(data['excluded'], 16),
+                   list(data['months']), [int(bits, 16) for bits in data['visited']])
+
+
+def build_account_matrix(account: Dict[str, Any], audits: Iterable[Dict[str, Any]]) -> Optional[FloorMatrix]:
+    """Build an account's matrix as the dashboard would, or None where it shows none.
+
+    Args:
+        account: Account record with its floor fields
+        audits: The account's audits, with visited_floors as lists or JSON strings
+
+    Returns:
+        Optional[FloorMatrix]: The matrix, or None if the account has no
+        usable floor range or invalid audit data
+    """
+    config = account_floor_config(account)
+    if config is None:
+        return None
+    audits = ({'date': audit.get('date'), 'visited_floors': parse_floor_list(audit.get('visited_floors'))}
+              for audit in audits)
+    try:
+        return FloorMatrix.build(config, audits)
+    except ValueError as e:
+        logger.warning("Could not build floor matrix for account %s: %s", account.get('id'), e)
+        return None
+
+
+def write_floor_matrices(matrices: Iterable[Tuple[Any, Optional[FloorMatrix]]], file: TextIO,
+                         encoding: str = "json") -> int:
+    """Write the matrices of many accounts as one JSON object keyed by account ID.
+
+    Matrices are written one at a time as they are produced.
+
+    Args:
+        matrices: (account ID, matrix or None) pairs
+        file: Open text file to write to
+        encoding: 'json' for the dashboard's FloorMatrix shape, 'bitset'
+            for the compact hex bitset encoding
+
+    Returns:
+        int: Number of accounts written
+    """
+    if encoding not in MATRIX_ENCODINGS:
+        raise ValueError(f"Unknown floor matrix encoding: {encoding}")
+
+    count = 0
+    file.write("{")
+    for account_id, matrix in matrices:
+        value = None
+        if matrix is not None:
+            value = matrix.to_dict() if encoding == "json" else matrix.to_compact()
+        file.write(",\n  " if count else "\n  ")
+        file.write(f"{json.dumps(str(account_id))}: {json.dumps(value)}")
+        count += 1
+    file.write("\n}\n" if count else "}\n")
+    return count
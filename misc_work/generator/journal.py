@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Journal Module for Audit Wizard
+Append-only write-ahead journal that lets interrupted imports and updates resume
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Dict, List, Any
+
+logger = logging.getLogger(__name__)
+
+
+class ImportJournal:
+    """Append-only JSON Lines journal of successful PocketBase writes.
+
+    Each line records one created or updated audit by its position in the
+    input file, together with its account, date and record ID, so a re-run
+    can skip work that already reached the server.
+    """
+
+    def __init__(self, path: str):
+        """Initialize the journal.
+
+        Args:
+            path: Path to the journal file
+        """
+        self.path = path
+        self._file = None
+        self._mode = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def path_for(output_path: str) -> str:
+        """Get the journal path used for an output file.
+
+        Args:
+            output_path: Path of the file the import writes its results to
+
+        Returns:
+            str: Path of the journal file
+        """
+        return f"{output_path}.journal"
+
+    def exists(self) -> bool:
+        """Check whether a journal from a previous run exists.
+
+        An empty journal records nothing to resume, so it counts as absent.
+        """
+        try:
+            return os.path.getsize(self.path) > 0
+        except OSError:
+            return False
+
+    def load(self) -> Dict[int, Dict[str, Any]]:
+        """Read the entries written by a previous run.
+
+        A partially written last line (e.g. from a crash mid-write) is ignored.
+
+        Returns:
+            Dict[int, Dict[str, Any]]: Journal entries keyed by input index
+        """
+        entries = {}
+        if not self.exists():
+            return entries
+
+        with open(self.path, 'r') as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                entries[entry['index']] = entry
+        return entries
+
+    def open(self, resume: bool = False) -> "ImportJournal":
+        """Open the journal for writing.
+
+        The file is only created by the first record(), so a run that fails
+        before writing anything to PocketBase leaves no journal behind.
+
+        Args:
+            resume: Append to the existing journal instead of starting a new one
+
+        Returns:
+            ImportJournal: The journal itself
+        """
+        self._mode = 'a' if resume else 'w'
+        return self
+
+    def record(self, op: str, index: int, audit: Dict[str, Any]):
+        """Append a successful write to the journal and flush it to disk.
+
+        Safe to call from several worker threads.
+
+        Args:
+            op: Write operation ('create' or 'update')
+            index: Position of the audit in the input file
+            audit: Audit record including its PocketBase ID
+        """
+        entry = {
+            'op': op,
+            'index': index,
+            'account': audit.get('account'),
+            'date': audit.get('date'),
+            'id': audit.get('id')
+        }
+        line = json.dumps(entry) + "\n"
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, self._mode or 'a')
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        """Close the journal file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def remove(self):
+        """Close and delete the journal once its results are safely written."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __enter__(self) -> "ImportJournal":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @staticmethod
+    def apply(entries: Dict[int, Dict[str, Any]], audits: List[Dict[str, Any]],
+              op: str, offset: int = 0) -> List[int]:
+        """Match journal entries back to the input audits.
+
+        Entries whose account and date no longer match the audit at their
+        index (e.g. because the input file was edited) are ignored.
+
+        Args:
+            entries: Entries returned by load()
+            audits: Input audit records; created IDs are set on them in place
+            op: Operation whose entries to apply ('create' or 'update')
+            offset: Input index of audits[0], when the input is processed in chunks
+
+        Returns:
+            List[int]: Input indexes of audits already completed
+        """
+        completed = []
+        for position, audit in enumerate(audits):
+            index = offset + position
+            entry = entries.get(index)
+            if entry is None or entry.get('op') != op:
+                continue
+            if audit.get('account') != entry.get('account') or audit.get('date') != entry.get('date'):
+                logger.warning("Journal entry %d does not match the input file, ignoring it", index)
+                continue
+            if op == 'create':
+                audit['id'] = entry['id']
+            completed.append(index)
+        return completed
@@ -0,0 +1,544 @@
+#!/usr/bin/env python3
+"""
+Local PocketBase Stand-in for the Audit Wizard
+A lightweight, SQLite-backed server implementing the subset of the PocketBase
+API used by PocketBaseClient, for offline tests and benchmarks
+"""
+
+import argparse
+import base64
+import json
+import random
+import re
+import secrets
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Any, Tuple
+from urllib.parse import parse_qs, urlparse
+
+# Fields stored the way PocketBase stores them for the audit and account collections
+DATE_FIELDS = ("date",)
+JSON_FIELDS = ("visited_floors", "excluded_floors")
+NUMBER_FIELDS = ("score", "floors_min", "floors_max")
+
+RECORDS_PATH = re.compile(r"^/api/collections/([^/]+)/records(?:/([^/]+))?$")
+AUTH_PATH = re.compile(r"^/api/collections/([^/]+)/(auth-with-password|auth-refresh)$")
+FIELD_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+FILTER_TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+      | (?P<number>-?\d+(?:\.\d+)?)
+      | (?P<op>&&|\|\||!=|>=|<=|!~|[=<>~()])
+      | (?P<name>[A-Za-z_@][A-Za-z0-9_.]*)
+    )""", re.VERBOSE)
+
+SQL_OPERATORS = {"=": "=", "!=": "!=", ">": ">", ">=": ">=", "<": "<", "<=": "<="}
+
+
+class ApiError(Exception):
+    """An error response to send back to the client."""
+
+    def __init__(self, status: int, message: str, data: Optional[Dict[str, Any]] = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.data = data or {}
+
+    def body(self) -> Dict[str, Any]:
+        return {"status": self.status, "message": self.message, "data": self.data}
+
+
+class RecordStore:
+    """Thread-safe SQLite storage for PocketBase-style records."""
+
+    def __init__(self, db_path: str = ":memory:"):
+        """Initialize the store.
+
+        Args:
+            db_path: SQLite database path (default: in memory)
+        """
+        self.connection = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS records ("
+            " collection TEXT NOT NULL, id TEXT NOT NULL, data TEXT NOT NULL,"
+            " PRIMARY KEY (collection, id))")
+        self.lock = threading.RLock()
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3] + "Z"
+
+    @staticmethod
+    def _normalize(data: Dict[str, Any]) -> Dict[str, Any]:
+        """Coerce field values the way PocketBase's field types would."""
+        record = {}
+        for key, value in data.items():
+            if key in DATE_FIELDS and isinstance(value, str):
+                value = value.replace("T", " ", 1)
+            elif key in JSON_FIELDS and isinstance(value, str):
+                try:
+                    value = json.loads(value)
+                except json.JSONDecodeError:
+                    pass
+            elif key in NUMBER_FIELDS and value is None:
+                value = 0
+            record[key] = value
+        return record
+
+    def create(self, collection: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        record_id = data.get("id") or "".join(
+            secrets.choice("abcdefghijklmnopqrstuvwxyz0123456789") for _ in range(15))
+        now = self._now()
+        record = {"collectionName": collection, "id": record_id}
+        record.update(self._normalize({k: v for k, v in data.items() if k != "id"}))
+        record.update({"created": now, "updated": now})
+        with self.lock:
+            try:
+                self.connection.execute("INSERT INTO records VALUES (?, ?, ?)",
+                                        (collection, record_id, json.dumps(record)))
+            except sqlite3.IntegrityError:
+                raise ApiError(400, "Failed to create record.", {"id": {"code": "validation_not_unique"}})
+        return record
+
+    def get(self, collection: str, record_id: str) -> Dict[str, Any]:
+        with self.lock:
+            row = self.connection.execute("SELECT data FROM records WHERE collection = ? AND id = ?",
+                                          (collection, record_id)).fetchone()
+        if row is None:
+            raise ApiError(404, "The requested resource wasn't found.")
+        return json.loads(row[0])
+
+    def update(self, collection: str, record_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        with self.lock:
+            record = self.get(collection, record_id)
+            record.update(self._normalize({k: v for k, v in data.items() if k != "id"}))
+            record["updated"] = self._now()
+            self.connection.execute("UPDATE records SET data = ? WHERE collection = ? AND id = ?",
+                                    (json.dumps(record), collection, record_id))
+        return record
+
+    def delete(self, collection: str, record_id: str):
+        with self.lock:
+            cursor = self.connection.execute("DELETE FROM records WHERE collection = ? AND id = ?",
+                                             (collection, record_id))
+        if cursor.rowcount == 0:
+            raise ApiError(404, "The requested resource wasn't found.")
+
+    def list(self, collection: str, page: int, per_page: int, filter_str: Optional[str],
+             sort: Optional[str], skip_total: bool) -> Dict[str, Any]:
+        where, params = ("", [])
+        if filter_str:
+            where, params = FilterTranslator(filter_str).translate()
+            where = f" AND ({where})"
+        order = self._order_by(sort)
+
+        with self.lock:
+            rows = self.connection.execute(
+                f"SELECT data FROM records WHERE collection = ?{where}{order} LIMIT ? OFFSET ?",
+                [collection] + params + [per_page, (page - 1) * per_page]).fetchall()
+            total = -1
+            if not skip_total:
+                total = self.connection.execute(
+                    f"SELECT COUNT(*) FROM records WHERE collection = ?{where}",
+                    [collection] + params).fetchone()[0]
+
+        return {
+            "page": page,
+            "perPage": per_page,
+            "totalItems": total,
+            "totalPages": -1 if skip_total else (total + per_page - 1) // per_page,
+            "items": [json.loads(row[0]) for row in rows]
+        }
+
+    @staticmethod
+    def _order_by(sort: Optional[str]) -> str:
+        terms = []
+        for term in (sort or "").split(","):
+            term = term.strip()
+            if not term or term == "@random":
+                continue
+            direction = "DESC" if term.startswith("-") else "ASC"
+            name = term.lstrip("+-")
+            if not FIELD_NAME.match(name):
+                raise ApiError(400, f"Invalid sort field {name!r}.")
+            terms.append(f"json_extract(data, '$.{name}') {direction}")
+        # Keep pagination stable for equal sort keys
+        terms.append("rowid ASC")
+        return " ORDER BY " + ", ".join(terms)
+
+    def transaction(self):
+        """Run several operations atomically (used by /api/batch)."""
+        return _Transaction(self)
+
+
+class _Transaction:
+    def __init__(self, store: RecordStore):
+        self.store = store
+
+    def __enter__(self):
+        self.store.lock.acquire()
+        self.store.connection.execute("BEGIN")
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            self.store.connection.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.store.lock.release()
+
+
+class FilterTranslator:
+    """Translates the commonly used subset of PocketBase filter syntax to SQL.
+
+    Supports field comparisons (=, !=, >, >=, <, <=, ~, !~) against string,
+    number, boolean and null literals, combined with &&, || and parentheses.
+    """
+
+    def __init__(self, filter_str: str):
+        self.tokens = self._tokenize(filter_str)
+        self.position = 0
+        self.params = []
+
+    @staticmethod
+    def _tokenize(filter_str: str) -> List[Tuple[str, str]]:
+        tokens = []
+        position = 0
+        filter_str = filter_str.rstrip()
+        while position < len(filter_str):
+            match = FILTER_TOKEN.match(filter_str, position)
+            if not match:
+                raise ApiError(400, "Invalid filter expression.")
+            kind = match.lastgroup
+            tokens.append((kind, match.group(kind)))
+            position = match.end()
+        return tokens
+
+    def _next(self) -> Tuple[str, str]:
+        if self.position >= len(self.tokens):
+            raise ApiError(400, "Invalid filter expression.")
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def _peek(self) -> Optional[Tuple[str, str]]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def translate(self) -> Tuple[str, List[Any]]:
+        sql = self._expression()
+        if self._peek() is not None:
+            raise ApiError(400, "Invalid filter expression.")
+        return sql, self.params
+
+    def _expression(self) -> str:
+        parts = [self._term()]
+        while self._peek() == ("op", "||"):
+            self._next()
+            parts.append(self._term())
+        return " OR ".join(parts)
+
+    def _term(self) -> str:
+        parts = [self._factor()]
+        while self._peek() == ("op", "&&"):
+            self._next()
+            parts.append(self._factor())
+        return " AND ".join(parts)
+
+    def _factor(self) -> str:
+        if self._peek() == ("op", "("):
+            self._next()
+            sql = self._expression()
+            if self._next() != ("op", ")"):
+                raise ApiError(400, "Invalid filter expression.")
+            return f"({sql})"
+
+        kind, name = self._next()
+        if kind != "name" or not FIELD_NAME.match(name):
+            raise ApiError(400, "Invalid filter expression.")
+        kind, op = self._next()
+        if kind != "op" or op not in list(SQL_OPERATORS) + ["~", "!~"]:
+            raise ApiError(400, "Invalid filter expression.")
+        value = self._literal()
+
+        column = f"json_extract(data, '$.{name}')"
+        if op in ("~", "!~"):
+            self.params.append(f"%{value}%")
+            return f"{column} {'NOT ' if op == '!~' else ''}LIKE ?"
+        if value is None:
+            return f"{column} IS {'NOT ' if op == '!=' else ''}NULL"
+        self.params.append(value)
+        return f"{column} {SQL_OPERATORS[op]} ?"
+
+    def _literal(self) -> Any:
+        kind, value = self._next()
+        if kind == "string":
+            return re.sub(r"\\(.)", r"\1", value[1:-1])
+        if kind == "number":
+            return float(value) if "." in value else int(value)
+        if kind == "name" and value in ("true", "false"):
+            return 1 if value == "true" else 0
+        if kind == "name" and value == "null":
+            return None
+        raise ApiError(400, "Invalid filter expression.")
+
+
+class LocalPocketBase:
+    """In-process PocketBase stand-in with latency and error injection."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, db_path: str = ":memory:",
+                 users: Optional[Dict[str, str]] = None, latency: float = 0.0,
+                 error_rate: float = 0.0, error_status: int = 503, retry_after: Optional[float] = None,
+                 batch_enabled: bool = True, max_batch_requests: int = 50,
+                 token_ttl: int = 3600, seed: Optional[int] = None):
+        """Initialize the stand-in server.
+
+        Args:
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free port)
+            db_path: SQLite database path (default: in memory)
+            users: Accepted credentials as {identity: password}
+                (default: {"admin@example.com": "password"})
+            latency: Delay in seconds added to every request
+            error_rate: Probability (0-1) of answering a request with error_status
+            error_status: Status code used for injected errors
+            retry_after: Retry-After value in seconds sent with injected errors
+            batch_enabled: Accept /api/batch requests (403 otherwise, like PocketBase)
+            max_batch_requests: Maximum number of sub-requests per batch
+            token_ttl: Lifetime of issued auth tokens in seconds
+            seed: Seed for error injection, for reproducible runs
+        """
+        self.store = RecordStore(db_path)
+        self.users = users if users is not None else {"admin@example.com": "password"}
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.batch_enabled = batch_enabled
+        self.max_batch_requests = max_batch_requests
+        self.token_ttl = token_ttl
+        self.random = random.Random(seed)
+        self.tokens = {}
+        self.request_count = 0
+        self._stats_lock = threading.Lock()
+
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "LocalPocketBase":
+        """Serve requests in a background thread."""
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and release the port."""
+        self.server.shutdown()
+        self.server.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> "LocalPocketBase":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def issue_token(self, identity: str) -> str:
+        """Create a JWT-shaped auth token for an identity."""
+        def encode(data: Dict[str, Any]) -> str:
+            return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+
+        expires_at = int(time.time()) + self.token_ttl
+        token = ".".join([encode({"alg": "HS256", "typ": "JWT"}),
+                          encode({"id": identity, "exp": expires_at, "type": "auth"}),
+                          secrets.token_urlsafe(16)])
+        self.tokens[token] = (identity, expires_at)
+        return token
+
+    def _check_token(self, authorization: Optional[str]) -> str:
+        token = (authorization or "").replace("Bearer ", "", 1)
+        identity, expires_at = self.tokens.get(token, (None, 0))
+        if identity is None or expires_at < time.time():
+            raise ApiError(401, "The request requires valid record authorization token.")
+        return identity
+
+    def handle(self, method: str, path: str, query: Dict[str, List[str]],
+               body: Any, authorization: Optional[str]) -> Tuple[int, Any]:
+        """Handle one API request.
+
+        Returns:
+            Tuple[int, Any]: Response status and JSON body
+        """
+        auth_match = AUTH_PATH.match(path)
+        if auth_match and method == "POST":
+            if auth_match.group(2) == "auth-with-password":
+                identity = (body or {}).get("identity")
+                if identity not in self.users or self.users[identity] != (body or {}).get("password"):
+                    raise ApiError(400, "Failed to authenticate.")
+            else:
+                identity = self._check_token(authorization)
+            return 200, {"token": self.issue_token(identity), "record": {"id": identity, "email": identity}}
+
+        self._check_token(authorization)
+
+        if path == "/api/batch" and method == "POST":
+            return self._handle_batch((body or {}).get("requests", []))
+
+        records_match = RECORDS_PATH.match(path)
+        if not records_match:
+            raise ApiError(404, "The requested resource wasn't found.")
+        return self._handle_records(method, records_match.group(1), records_match.group(2), query, body)
+
+    def _handle_records(self, method: str, collection: str, record_id: Optional[str],
+                        query: Dict[str, List[str]], body: Any) -> Tuple[int, Any]:
+        if record_id is None and method == "GET":
+            def param(name: str, default: str = "") -> str:
+                return query.get(name, [default])[0]
+
+            result = self.store.list(collection, max(1, int(param("page", "1"))),
+                                     min(1000, max(1, int(param("perPage", "30")))),
+                                     param("filter") or None, param("sort") or None,
+                                     param("skipTotal") in ("1", "true"))
+            fields = [field for field in param("fields").split(",") if field]
+            if fields:
+                result["items"] = [{k: v for k, v in item.items() if k in fields}
+                                   for item in result["items"]]
+            return 200, result
+        if record_id is None and method == "POST":
+            return 200, self.store.create(collection, body or {})
+        if record_id is not None and method == "GET":
+            return 200, self.store.get(collection, record_id)
+        if record_id is not None and method == "PATCH":
+            return 200, self.store.update(collection, record_id, body or {})
+        if record_id is not None and method == "DELETE":
+            self.store.delete(collection, record_id)
+            return 204, None
+        raise ApiError(405, "Method not allowed.")
+
+    def _handle_batch(self, batch_requests: List[Dict[str, Any]]) -> Tuple[int, Any]:
+        if not self.batch_enabled:
+            raise ApiError(403, "Batch requests are not allowed.")
+        if len(batch_requests) > self.max_batch_requests:
+            raise ApiError(400, f"The allowed max number of batch requests is {self.max_batch_requests}.")
+
+        responses = []
+        with self.store.transaction():
+            for index, sub_request in enumerate(batch_requests):
+                url = urlparse(sub_request.get("url", ""))
+                try:
+                    collection, record_id = self._records_target(url.path)
+                    status, body = self._handle_records(sub_request.get("method", "GET").upper(),
+                                                        collection, record_id, parse_qs(url.query),
+                                                        sub_request.get("body"))
+                except ApiError as e:
+                    raise ApiError(400, "Batch transaction failed.",
+                                   {"requests": {str(index): {"code": "batch_request_failed",
+                                                              "response": e.body()}}})
+                responses.append({"status": status, "body": body})
+        return 200, responses
+
+    @staticmethod
+    def _records_target(path: str) -> Tuple[str, Optional[str]]:
+        match = RECORDS_PATH.match(path)
+        if not match:
+            raise ApiError(404, "The requested resource wasn't found.")
+        return match.group(1), match.group(2)
+
+    def _handler_class(self):
+        app = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; with Nagle on, each
+            # keep-alive response would wait for the client's delayed ACK
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _respond(self, status: int, body: Any, headers: Optional[Dict[str, str]] = None):
+                payload = b"" if body is None else json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                if self.close_connection:
+                    # Tell the client not to reuse the connection, as PocketBase does
+                    self.send_header("Connection", "close")
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _dispatch(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw_body = self.rfile.read(length) if length else b""
+
+                with app._stats_lock:
+                    app.request_count += 1
+                    inject_error = app.error_rate and app.random.random() < app.error_rate
+                if app.latency:
+                    time.sleep(app.latency)
+                if inject_error:
+                    headers = {}
+                    if app.retry_after is not None:
+                        headers["Retry-After"] = str(app.retry_after)
+                    self._respond(app.error_status, ApiError(app.error_status, "Injected error.").body(), headers)
+                    return
+
+                url = urlparse(self.path)
+                try:
+                    body = json.loads(raw_body) if raw_body else None
+                    status, response = app.handle(self.command, url.path, parse_qs(url.query),
+                                                  body, self.headers.get("Authorization"))
+                except ApiError as e:
+                    status, response = e.status, e.body()
+                except (ValueError, TypeError) as e:
+                    status, response = 400, ApiError(400, f"Invalid request: {str(e)}").body()
+                self._respond(status, response)
+
+            do_GET = do_POST = do_PATCH = do_DELETE = _dispatch
+
+        return Handler
+
+
+def main():
+    """Run the stand-in server from the command line."""
+    parser = argparse.ArgumentParser(description="Local PocketBase stand-in for tests and benchmarks")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8090, help="Port to listen on (default: 8090)")
+    parser.add_argument("--db", default=":memory:", help="SQLite database path (default: in memory)")
+    parser.add_argument("--email", default="admin@example.com", help="Accepted identity")
+    parser.add_argument("--password", default="password", help="Accepted password")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds of delay added to every request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with an error")
+    parser.add_argument("--error-status", type=int, default=503, help="Status of injected errors (default: 503)")
+    parser.add_argument("--retry-after", type=float, help="Retry-After seconds sent with injected errors")
+    parser.add_argument("--no-batch", action="store_true", help="Reject /api/batch requests")
+    parser.add_argument("--seed", type=int, help="Seed for error injection")
+    args = parser.parse_args()
+
+    server = LocalPocketBase(args.host, args.port, args.db, {args.email: args.password},
+                             latency=args.latency, error_rate=args.error_rate,
+                             error_status=args.error_status, retry_after=args.retry_after,
+                             batch_enabled=not args.no_batch, seed=args.seed)
+    print(f"Local PocketBase stand-in listening on {server.url} (identity: {args.email})")
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Metrics Module for Audit Wizard
+Counters, latency histograms and per-phase throughput for a wizard run,
+shown as a summary table or saved as JSON or OpenMetrics
+"""
+
+import bisect
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+from urllib.parse import urlsplit
+
+# Upper bounds in seconds of the HTTP latency histogram buckets
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Prefix of every metric name in the OpenMetrics output
+METRIC_PREFIX = "audit_wizard_"
+
+# Record IDs in request paths are replaced so each endpoint is one series
+_RECORD_ID = re.compile(r"(/records)/[^/]+$")
+
+# A metric's labels as sorted (name, value) pairs
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def endpoint_label(method: str, url: str) -> str:
+    """Name the endpoint of a request, e.g. 'PATCH /api/collections/audits/records/:id'.
+
+    Args:
+        method: HTTP method
+        url: Request URL
+
+    Returns:
+        str: Method and path, without the query string or record ID
+    """
+    path = _RECORD_ID.sub(r"\1/:id", urlsplit(url).path)
+    return f"{method} {path}"
+
+
+class Histogram:
+    """Distribution of observed values over fixed buckets."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        """Initialize an empty histogram.
+
+        Args:
+            buckets: Sorted upper bounds of the buckets; larger values go to +Inf
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        """Add one value."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by interpolating within its bucket, as Prometheus does.
+
+        Args:
+            q: Quantile between 0 and 1
+
+        Returns:
+            float: Estimated value (the largest observed value for the +Inf bucket)
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                if index == len(self.buckets):
+                    return self.max
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index]
+                return min(lower + (upper - lower) * (rank - seen) / count, self.max)
+            seen += count
+        return self.max
+
+
+class Phase:
+    """Records processed by one phase or pipeline stage and the time it took."""
+
+    def __init__(self, name: str):
+        """Initialize an empty phase.
+
+        Args:
+            name: Phase name, e.g. 'convert' or 'import'
+        """
+        self.name = name
+        self.records = 0
+        self.seconds = 0.0
+
+    @property
+    def records_per_second(self) -> float:
+        """Throughput of the phase."""
+        return self.records / self.seconds if self.seconds > 0 else 0.0
+
+
+class Metrics:
+    """Thread-safe collection of the metrics of one wizard run."""
+
+    def __init__(self):
+        """Initialize empty metrics."""
+        self._lock = threading.Lock()
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self.phases: Dict[str, Phase] = {}
+
+    @staticmethod
+    def _key(name: str, labels: Dict[str, Any]) -> Tuple[str, Labels]:
+        return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+    def inc(self, name: str, value: float = 1, **labels: Any):
+        """Add to a counter.
+
+        Args:
+            name: Counter name, e.g. 'http_requests'
+            value: Amount to add
+            **labels: Labels of the series, e.g. endpoint and status
+        """
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: Any):
+        """Add a value to a histogram.
+
+        Args:
+            name: Histogram name, e.g. 'http_request_duration_seconds'
+            value: Observed value
+            **labels: Labels of the series
+        """
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def _phase(self, name: str) -> Phase:
+        phase = self.phases.get(name)
+        if phase is None:
+            phase = self.phases[name] = Phase(name)
+        return phase
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[Phase]:
+        """Time a phase of a command; repeated phases add up.
+
+        Args:
+            name: Phase name
+
+        Yields:
+            Phase: The phase, whose records the caller may add to
+        """
+        with self._lock:
+            phase = self._phase(name)
+        start = time.perf_counter()
+        try:
+            yield phase
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                phase.seconds += elapsed
+
+    def add_records(self, phase: str, count: int, seconds: float = 0.0):
+        """Add processed records (and optionally time) to a phase.
+
+        Args:
+            phase: Phase name
+            count: Number of records
+            seconds: Time spent on them, if not timed with phase()
+        """
+        with self._lock:
+            entry = self._phase(phase)
+            entry.records += count
+            entry.seconds += seconds
+
+    def read_file(self, path: str):
+        """Count the size of an input file as bytes read."""
+        self._count_file("bytes_read", path)
+
+    def wrote_file(self, path: str):
+        """Count the size of an output file as bytes written."""
+        self._count_file("bytes_written", path)
+
+    def _count_file(self, name: str, path: str):
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        self.inc(name, size, source="file")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the metrics as JSON-compatible values.
+
+        Returns:
+            Dict[str, Any]: phases, counters and histograms; each counter and
+            histogram is a list of series with their labels
+        """
+        with self._lock:
+            phases = [{'phase': phase.name, 'records': phase.records, 'seconds': round(phase.seconds, 6),
+                       'records_per_second': round(phase.records_per_second, 3)}
+                      for phase in self.phases.values()]
+            counters: Dict[str, List[Dict[str, Any]]] = {}
+            for (name, labels), value in sorted(self.counters.items()):
+                counters.setdefault(name, []).append({'labels': dict(labels), 'value': value})
+            histograms: Dict[str, List[Dict[str, Any]]] = {}
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                histograms.setdefault(name, []).append({
+                    'labels': dict(labels),
+                    'buckets': [[bound, count] for bound, count in
+                                zip(list(histogram.buckets) + ["+Inf"], _cumulative(histogram.counts))],
+                    'count': histogram.count,
+                    'sum': histogram.sum,
+                    'max': histogram.max
+                })
+        return {'phases': phases, 'counters': counters, 'histograms': histograms}
+
+    def to_openmetrics(self) -> str:
+        """Render the metrics in the OpenMetrics text format.
+
+        Returns:
+            str: Exposition ending with '# EOF'
+        """
+        data = self.to_dict()
+        lines = []
+        if data['phases']:
+            for name, field, kind in (("phase_records", "records", "counter"),
+                                      ("phase_duration_seconds", "seconds", "gauge"),
+                                      ("phase_records_per_second", "records_per_second", "gauge")):
+                family = METRIC_PREFIX + name
+                lines.append(f"# TYPE {family} {kind}")
+                sample = f"{family}_total" if kind == "counter" else family
+                for phase in data['phases']:
+                    lines.append(f"{sample}{_format_labels({'phase': phase['phase']})} {_format_value(phase[field])}")
+        for name, series in data['counters'].items():
+            family = METRIC_PREFIX + name
+            lines.append(f"# TYPE {family} counter")
+            for entry in series:
+                lines.append(f"{family}_total{_format_labels(entry['labels'])} {_format_value(entry['value'])}")
+        for name, series in data['histograms'].items():
+            family = METRIC_PREFIX + name
+            lines.append(f"# TYPE {family} histogram")
+            for entry in series:
+                for bound, count in entry['buckets']:
+                    labels = dict(entry['labels'], le=bound if bound == "+Inf" else repr(float(bound)))
+                    lines.append(f"{family}_bucket{_format_labels(labels)} {count}")
+                lines.append(f"{family}_count{_format_labels(entry['labels'])} {entry['count']}")
+                lines.append(f"{family}_sum{_format_labels(entry['labels'])} {_format_value(entry['sum'])}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> str:
+        """Render the phases, HTTP endpoints and bytes transferred as a text table.
+
+        Returns:
+            str: Summary table, or an empty string if nothing was recorded
+        """
+        data = self.to_dict()
+        lines = []
+        if data['phases']:
+            lines.append(f"{'Phase':<12} {'Records':>10} {'Seconds':>10} {'Records/s':>12}")
+            for phase in data['phases']:
+                lines.append(f"{phase['phase']:<12} {phase['records']:>10} {phase['seconds']:>10.2f} "
+                             f"{phase['records_per_second']:>12.0f}")
+
+        latencies = data['histograms'].get('http_request_duration_seconds', [])
+        if latencies:
+            errors = {}
+            for entry in data['counters'].get('http_requests', []):
+                if not entry['labels'].get('status', '').startswith(('2', '3')):
+                    endpoint = entry['labels'].get('endpoint')
+                    errors[endpoint] = errors.get(endpoint, 0) + entry['value']
+            width = max(len("Endpoint"), max(len(entry['labels'].get('endpoint', '')) for entry in latencies))
+            if lines:
+                lines.append("")
+            lines.append(f"{'Endpoint':<{width}} {'Requests':>9} {'Errors':>7} {'p50 ms':>8} {'p90 ms':>8} "
+                         f"{'p99 ms':>8} {'Max ms':>8}")
+            with self._lock:
+                histograms = {dict(labels).get('endpoint'): histogram
+                              for (name, labels), histogram in self.histograms.items()
+                              if name == 'http_request_duration_seconds'}
+            for endpoint in sorted(histograms):
+                histogram = histograms[endpoint]
+                lines.append(f"{endpoint:<{width}} {histogram.count:>9} {int(errors.get(endpoint, 0)):>7} "
+                             f"{histogram.quantile(0.5) * 1000:>8.1f} {histogram.quantile(0.9) * 1000:>8.1f} "
+                             f"{histogram.quantile(0.99) * 1000:>8.1f} {histogram.max * 1000:>8.1f}")
+
+        transferred = []
+        for name, label in (("bytes_read", "read"), ("bytes_written", "written")):
+            for entry in data['counters'].get(name, []):
+                transferred.append(f"{_format_bytes(entry['value'])} {label} ({entry['labels'].get('source')})")
+        if transferred:
+            if lines:
+                lines.append("")
+            lines.append("Bytes: " + ", ".join(transferred))
+        return "\n".join(lines)
+
+    def save(self, path: str) -> bool:
+        """Save the metrics as JSON (for a .json path) or in the OpenMetrics text format.
+
+        Args:
+            path: Output file path
+
+        Returns:
+            bool: True if the file was saved
+        """
+        try:
+            with open(path, 'w') as file:
+                if path.endswith('.json'):
+                    json.dump(self.to_dict(), file, indent=2)
+                    file.write("\n")
+                else:
+                    file.write(self.to_openmetrics())
+            return True
+        except Exception as e:
+            print(f"Error saving metrics: {str(e)}")
+            return False
+
+
+def _cumulative(counts: List[int]) -> List[int]:
+    total = 0
+    result = []
+    for count in counts:
+        total += count
+        result.append(total)
+    return result
+
+
+def _escape_label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _format_bytes(count: float) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if count < 1024 or unit == "GiB":
+            return f"{count:.0f} {unit}" if unit == "B" else f"{count:.1f} {unit}"
+        count /= 1024
+    return f"{count:.1f} GiB"
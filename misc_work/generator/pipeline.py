@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Pipeline Module for Audit Wizard
+Runs stages over chunks of audit records in threads connected by bounded
+queues, so reading, converting, importing and reporting overlap
+"""
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Number of chunks buffered between two stages
+PIPELINE_QUEUE_SIZE = 4
+
+# Seconds between checks for a failed stage while waiting on a queue
+_POLL_INTERVAL = 0.1
+
+_DONE = object()
+
+Chunk = List[Dict[str, Any]]
+
+
+class PipelineError(Exception):
+    """Raised when a pipeline stage fails; the other stages are stopped."""
+
+    def __init__(self, stage: str, error: BaseException):
+        super().__init__(f"{stage} stage failed: {str(error)}")
+        self.stage = stage
+        self.error = error
+
+
+class _Stopped(Exception):
+    """Raised in a stage's thread when another stage failed."""
+
+
+class StageStats:
+    """Work done by one pipeline stage."""
+
+    def __init__(self, name: str):
+        """Initialize empty statistics.
+
+        Args:
+            name: Stage name
+        """
+        self.name = name
+        self.chunks = 0
+        self.records = 0
+        self.busy_seconds = 0.0
+
+
+class Pipeline:
+    """Source, transform stages and sinks, each in its own thread.
+
+    The source yields chunks of records. Each stage turns a chunk into a new
+    chunk, and sinks consume the chunks coming out of the stage they tap.
+    Queues between threads are bounded, so a fast stage waits for a slow
+    one instead of buffering the whole input, and the total time
+    approaches that of the slowest stage.
+    """
+
+    def __init__(self, queue_size: int = PIPELINE_QUEUE_SIZE):
+        """Initialize an empty pipeline.
+
+        Args:
+            queue_size: Number of chunks buffered between two threads
+        """
+        self.queue_size = queue_size
+        self._source: Optional[Tuple[str, Iterable[Chunk]]] = None
+        self._stages: List[Tuple[str, Callable[[Chunk], Chunk]]] = []
+        self._sinks: List[Tuple[str, str, Callable[[Iterator[Chunk]], Any]]] = []
+        self._stop = threading.Event()
+        self._errors: List[PipelineError] = []
+        self.stats: Dict[str, StageStats] = {}
+
+    def source(self, name: str, chunks: Iterable[Chunk]) -> "Pipeline":
+        """Set the stage that produces the chunks.
+
+        Args:
+            name: Stage name
+            chunks: Chunks of records; iterated in the source thread
+        """
+        self._source = (name, chunks)
+        return self
+
+    def stage(self, name: str, process: Callable[[Chunk], Chunk]) -> "Pipeline":
+        """Add a stage after the previous one.
+
+        Args:
+            name: Stage name
+            process: Turns one chunk into the chunk passed on; called in
+                order, from the stage's own thread
+        """
+        self._stages.append((name, process))
+        return self
+
+    def sink(self, name: str, tap: str, consume: Callable[[Iterator[Chunk]], Any]) -> "Pipeline":
+        """Add a consumer of the chunks coming out of a stage.
+
+        Args:
+            name: Sink name
+            tap: Name of the source or stage whose output the sink reads
+            consume: Reads every chunk from the iterator it is given; its
+                return value is the sink's result
+        """
+        self._sinks.append((name, tap, consume))
+        return self
+
+    def _put(self, outbox: "queue.Queue", item: Any):
+        while not self._stop.is_set():
+            try:
+                outbox.put(item, timeout=_POLL_INTERVAL)
+                return
+            except queue.Full:
+                continue
+        raise _Stopped()
+
+    def _iter_inbox(self, inbox: "queue.Queue") -> Iterator[Chunk]:
+        """Yield the chunks put in a queue until the producer is done.
+
+        Raises _Stopped if another stage fails first, so a sink writing a
+        file does not mistake a partial stream for the full one.
+        """
+        while not self._stop.is_set():
+            try:
+                item = inbox.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+            if item is _DONE:
+                return
+            yield item
+        raise _Stopped()
+
+    def _fail(self, name: str, error: BaseException):
+        if not isinstance(error, _Stopped):
+            self._errors.append(PipelineError(name, error))
+        self._stop.set()
+
+    def run(self) -> Dict[str, Any]:
+        """Run every stage until the source is exhausted.
+
+        Returns:
+            Dict[str, Any]: Result of each sink, by sink name
+
+        Raises:
+            PipelineError: For the first stage that failed
+        """
+        if self._source is None:
+            raise ValueError("Pipeline has no source")
+
+        names = [self._source[0]] + [name for name, _ in self._stages]
+        outboxes: Dict[str, List["queue.Queue"]] = {name: [] for name in names}
+        inboxes = []
+        for name in names[:-1]:
+            inbox = queue.Queue(self.queue_size)
+            outboxes[name].append(inbox)
+            inboxes.append(inbox)
+        sink_inboxes = []
+        for sink_name, tap, _ in self._sinks:
+            if tap not in outboxes:
+                raise ValueError(f"Sink {sink_name} taps unknown stage {tap}")
+            inbox = queue.Queue(self.queue_size)
+            outboxes[tap].append(inbox)
+            sink_inboxes.append(inbox)
+
+        self.stats = {name: StageStats(name) for name in names + [name for name, _, _ in self._sinks]}
+        results: Dict[str, Any] = {}
+
+        def emit(name: str, chunk: Chunk):
+            for outbox in outboxes[name]:
+                self._put(outbox, chunk)
+
+        def finish(name: str):
+            for outbox in outboxes[name]:
+                self._put(outbox, _DONE)
+
+        def run_source():
+            name, chunks = self._source
+            stats = self.stats[name]
+            try:
+                iterator = iter(chunks)
+                while True:
+                    start = time.perf_counter()
+                    chunk = next(iterator, None)
+                    stats.busy_seconds += time.perf_counter() - start
+                    if chunk is None:
+                        break
+                    stats.chunks += 1
+                    stats.records += len(chunk)
+                    emit(name, chunk)
+                finish(name)
+            except BaseException as e:
+                self._fail(name, e)
+
+        def run_stage(name: str, process: Callable[[Chunk], Chunk], inbox: "queue.Queue"):
+            stats = self.stats[name]
+            try:
+                for chunk in self._iter_inbox(inbox):
+                    start = time.perf_counter()
+                    chunk = process(chunk)
+                    stats.busy_seconds += time.perf_counter() - start
+                    stats.chunks += 1
+                    stats.records += len(chunk)
+                    emit(name, chunk)
+                finish(name)
+            except BaseException as e:
+                self._fail(name, e)
+
+        def run_sink(name: str, consume: Callable[[Iterator[Chunk]], Any], inbox: "queue.Queue"):
+            stats = self.stats[name]
+
+            def chunks() -> Iterator[Chunk]:
+                for chunk in self._iter_inbox(inbox):
+                    stats.chunks += 1
+                    stats.records += len(chunk)
+                    start = time.perf_counter()
+                    yield chunk
+                    stats.busy_seconds += time.perf_counter() - start
+
+            try:
+                results[name] = consume(chunks())
+            except BaseException as e:
+                self._fail(name, e)
+
+        threads = [threading.Thread(target=run_source, name=names[0], daemon=True)]
+        for (name, process), inbox in zip(self._stages, inboxes):
+            threads.append(threading.Thread(target=run_stage, args=(name, process, inbox), name=name, daemon=True))
+        for (name, _, consume), inbox in zip(self._sinks, sink_inboxes):
+            threads.append(threading.Thread(target=run_sink, args=(name, consume, inbox), name=name, daemon=True))
+
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(_POLL_INTERVAL)
+        except BaseException:
+            # Stop the other threads, e.g. on Ctrl+C
+            self._stop.set()
+            raise
+
+        if self._errors:
+            raise self._errors[0]
+        if self._stop.is_set():
+            raise PipelineError("pipeline", RuntimeError("stopped"))
+        return results
+
+
+def iter_records(chunks: Iterable[Chunk]) -> Iterator[Dict[str, Any]]:
+    """Flatten chunks into a stream of records, for sinks that take records."""
+    for chunk in chunks:
+        yield from chunk
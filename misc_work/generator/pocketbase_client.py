@@ -5,26 +5,224 @@ Handles communication with the PocketBase backend
 """
 
 import json
+import logging
+import threading
+import time
 import requests
-from typing import Dict, List, Optional, Any
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Any
+
+from metrics import Metrics, endpoint_label
+from retry import RateLimiter, RetryPolicy
+from token_cache import TokenCache, decode_token_expiry
+
+# Default number of pooled keep-alive connections per host
+DEFAULT_POOL_SIZE = 10
+
+# Default number of records per page when iterating a collection (PocketBase caps perPage at 1000)
+DEFAULT_PAGE_SIZE = 500
+
+# Default number of sub-requests per /api/batch call (PocketBase's own default limit)
+DEFAULT_BATCH_SIZE = 50
+
+# Auth collection used for password authentication and token refresh
+AUTH_COLLECTION = "users"
+
+# Refresh the auth token when it expires within this many seconds
+TOKEN_REFRESH_MARGIN = 300
+
+# Statuses meaning the server does not accept batch requests at all
+BATCH_UNSUPPORTED_STATUSES = (403, 404, 405)
+
+# Per-record progress is logged at INFO level
+logger = logging.getLogger(__name__)
+
+
+class BatchError(Exception):
+    """Raised when it is unknown whether a batch request was applied."""
 
 
 class PocketBaseClient:
     """Client for interacting with the PocketBase API."""
 
-    def __init__(self, base_url: str):
+    def __init__(self, base_url: str, pool_size: int = DEFAULT_POOL_SIZE,
+                 keep_alive: bool = True, retry_policy: Optional[RetryPolicy] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 token_cache_path: Optional[str] = None,
+                 metrics: Optional[Metrics] = None):
         """Initialize the PocketBase client.
         
         Args:
             base_url: Base URL of the PocketBase instance
+            pool_size: Maximum number of pooled connections kept per host
+            keep_alive: Reuse connections between requests when True
+            retry_policy: Retry rules for transient failures (default: RetryPolicy())
+            rate_limiter: Optional limiter shared by all requests from this client
+            token_cache_path: Optional file to cache auth tokens in between runs
+            metrics: Optional metrics receiving request counts, latencies
+                per endpoint and bytes transferred
         """
         self.base_url = base_url.rstrip('/')
         self.token = None
+        self.token_expires_at = None
         self.is_authenticated = False
+        self.token_cache = TokenCache(token_cache_path) if token_cache_path else None
+        self._identity = None
+        self._password = None
+        self._auth_lock = threading.Lock()
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self._headers = None
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.rate_limiter = rate_limiter
+        self.metrics = metrics
+        self.batch_supported = True
+        self.session = self._create_session()
+
+    def _create_session(self) -> requests.Session:
+        """Create the pooled HTTP session shared by all client calls.
+        
+        Returns:
+            requests.Session: Session with a sized connection pool mounted
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update(self._get_headers())
+        return session
+
+    @staticmethod
+    def _is_connect_error(error: requests.ConnectionError) -> bool:
+        """Check whether a connection error happened before the request was sent."""
+        if isinstance(error, requests.exceptions.ConnectTimeout):
+            return True
+        reason = getattr(error.args[0], 'reason', None) if error.args else None
+        return isinstance(reason, NewConnectionError)
+
+    def _request(self, method: str, url: str, auth_request: bool = False,
+                 **kwargs) -> requests.Response:
+        """Send a request through the session, applying rate limiting and retries.
+        
+        Retryable statuses (e.g. 429, 503) are retried with exponential
+        backoff and jitter, honouring the server's Retry-After header. A 429
+        also pauses the shared rate limiter so other workers back off too.
+        The auth token is refreshed before it expires, and once more if the
+        server answers 401.
+        
+        Args:
+            method: HTTP method
+            url: Request URL
+            auth_request: True for the auth calls themselves, which skip token refresh
+            **kwargs: Passed to requests.Session.request
+            
+        Returns:
+            requests.Response: The final response (possibly still an error status)
+            
+        Raises:
+            requests.RequestException: If the request fails and may not be retried
+        """
+        retries = 0
+        reauthenticated = auth_request
+        while True:
+            if not auth_request:
+                self._ensure_fresh_token()
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except requests.ConnectionError as e:
+                self._record_request(method, url, start, None)
+                if not self.retry_policy.should_retry_error(method, self._is_connect_error(e), retries):
+                    raise
+                delay = self.retry_policy.backoff(retries)
+                logger.warning("Connection error on %s %s, retrying in %.1fs", method, url, delay)
+            else:
+                self._record_request(method, url, start, response)
+                if response.status_code == 401 and not reauthenticated and self.token:
+                    # The token was revoked or expired early; renew it and try once more
+                    reauthenticated = True
+                    if self._renew_token(self.token):
+                        continue
+                if not self.retry_policy.should_retry_status(method, response.status_code, retries):
+                    return response
+                retry_after = RetryPolicy.parse_retry_after(response.headers.get("Retry-After"))
+                delay = self.retry_policy.backoff(retries, retry_after)
+                if response.status_code == 429 and self.rate_limiter:
+                    self.rate_limiter.pause(delay)
+                logger.warning("Received status %s on %s %s, retrying in %.1fs",
+                               response.status_code, method, url, delay)
+            
+            if self.metrics:
+                self.metrics.inc("http_retries", endpoint=endpoint_label(method, url))
+            retries += 1
+            time.sleep(delay)
+
+    def _record_request(self, method: str, url: str, start: float, response: Optional[requests.Response]):
+        """Record the latency, status and size of one request attempt.
+        
+        Args:
+            method: HTTP method
+            url: Request URL
+            start: perf_counter() value from before the request was sent
+            response: The response, or None if the connection failed
+        """
+        if not self.metrics:
+            return
+        elapsed = time.perf_counter() - start
+        endpoint = endpoint_label(method, url)
+        self.metrics.observe("http_request_duration_seconds", elapsed, endpoint=endpoint)
+        self.metrics.inc("http_requests", endpoint=endpoint,
+                         status=response.status_code if response is not None else "error")
+        if response is not None:
+            body = response.request.body if response.request is not None else None
+            if body:
+                self.metrics.inc("bytes_written", len(body), source="http")
+            self.metrics.inc("bytes_read", len(response.content), source="http")
+
+    def close(self):
+        """Close the HTTP session and release pooled connections."""
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+
+    def __enter__(self) -> "PocketBaseClient":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     def authenticate(self, email: str, password: str) -> bool:
         """Authenticate with PocketBase using user credentials.
         
+        If a token cache is configured and holds a token for this identity
+        that is not about to expire, it is reused without contacting the server.
+        
+        Args:
+            email: User email or identity
+            password: User password
+            
+        Returns:
+            bool: True if authentication was successful
+        """
+        self._identity = email
+        self._password = password
+        
+        if self.token_cache:
+            cached_token = self.token_cache.load(self.base_url, email)
+            if cached_token and not self._expires_soon(decode_token_expiry(cached_token)):
+                self._set_token(cached_token)
+                print("Using cached authentication token")
+                return True
+        
+        return self._authenticate_with_password(email, password)
+
+    def _authenticate_with_password(self, email: str, password: str) -> bool:
+        """Authenticate with the auth-with-password endpoint.
+        
         Args:
             email: User email or identity
             password: User password
@@ -33,19 +231,18 @@ class PocketBaseClient:
             bool: True if authentication was successful
         """
         # Use the users collection for authentication
-        url = f"{self.base_url}/api/collections/users/auth-with-password"
+        url = f"{self.base_url}/api/collections/{AUTH_COLLECTION}/auth-with-password"
         
         # Use identity field as shown in the error message
         payload = {"identity": email, "password": password}
         
         try:
             print(f"Attempting to authenticate with {url}")
-            response = requests.post(url, json=payload)
+            response = self._request("POST", url, auth_request=True, json=payload)
             
             if response.status_code == 200:
                 data = response.json()
-                self.token = data.get('token')
-                self.is_authenticated = bool(self.token)
+                self._set_token(data.get('token'))
                 print("Authentication successful!")
                 return self.is_authenticated
             else:
@@ -54,24 +251,103 @@ class PocketBaseClient:
                 return False
         except requests.RequestException as e:
             print(f"Authentication error: {str(e)}")
-            self.token = None
-            self.is_authenticated = False
+            self._set_token(None)
             return False
 
+    def refresh_token(self) -> bool:
+        """Exchange the current auth token for a new one via auth-refresh.
+        
+        Returns:
+            bool: True if the token was refreshed
+        """
+        url = f"{self.base_url}/api/collections/{AUTH_COLLECTION}/auth-refresh"
+        
+        try:
+            response = self._request("POST", url, auth_request=True)
+            if response.status_code == 200:
+                self._set_token(response.json().get('token'))
+                return self.is_authenticated
+            print(f"Token refresh failed with status code: {response.status_code}")
+            return False
+        except requests.RequestException as e:
+            print(f"Token refresh error: {str(e)}")
+            return False
+
+    def _expires_soon(self, expires_at: Optional[float]) -> bool:
+        """Check whether a token expiry falls within the refresh margin."""
+        return expires_at is not None and time.time() >= expires_at - TOKEN_REFRESH_MARGIN
+
+    def _ensure_fresh_token(self):
+        """Refresh the auth token if it is about to expire."""
+        if self.token and self._expires_soon(self.token_expires_at):
+            self._renew_token(self.token)
+
+    def _renew_token(self, stale_token: str) -> bool:
+        """Replace a stale token, refreshing it at most once across all workers.
+        
+        Only the first worker to get here talks to the server; the others
+        wait and then reuse the token it obtained. If auth-refresh fails
+        (e.g. the token has already expired), the stored credentials are
+        used to authenticate again.
+        
+        Args:
+            stale_token: The token the caller found to be stale
+            
+        Returns:
+            bool: True if a usable token is available
+        """
+        with self._auth_lock:
+            if self.token != stale_token:
+                # Another worker already renewed it
+                return self.is_authenticated
+            
+            print("Refreshing authentication token")
+            if self.refresh_token():
+                return True
+            if self._identity and self._password is not None:
+                return self._authenticate_with_password(self._identity, self._password)
+            return False
+
+    def _set_token(self, token: Optional[str]):
+        """Store the auth token and refresh the session's default headers.
+        
+        Args:
+            token: Auth token returned by PocketBase, or None to clear it
+        """
+        self.token = token
+        self.token_expires_at = decode_token_expiry(token) if token else None
+        self.is_authenticated = bool(token)
+        self._headers = None
+        self.session.headers.pop("Authorization", None)
+        self.session.headers.update(self._get_headers())
+        
+        if token and self.token_cache and self._identity:
+            try:
+                self.token_cache.save(self.base_url, self._identity, token)
+            except OSError as e:
+                print(f"Warning: Could not write token cache: {str(e)}")
+
     def _get_headers(self) -> Dict[str, str]:
         """Get headers for API requests including authentication token.
         
+        The headers are built once per token and cached, so repeated
+        calls do not rebuild the Bearer header.
+        
         Returns:
             Dict[str, str]: Headers dictionary
         """
-        headers = {
-            "Content-Type": "application/json"
-        }
-        
-        if self.token:
-            headers["Authorization"] = f"Bearer {self.token}"
+        if self._headers is None:
+            headers = {
+                "Content-Type": "application/json",
+                "Connection": "keep-alive" if self.keep_alive else "close"
+            }
+            
+            if self.token:
+                headers["Authorization"] = f"Bearer {self.token}"
             
-        return headers
+            self._headers = headers
+            
+        return self._headers
 
     def create_record(self, collection: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Create a new record in a PocketBase collection.
@@ -90,7 +366,7 @@ class PocketBaseClient:
         url = f"{self.base_url}/api/collections/{collection}/records"
         
         try:
-            response = requests.post(url, json=data, headers=self._get_headers())
+            response = self._request("POST", url, json=data)
             response.raise_for_status()
             return response.json()
         except requests.RequestException as e:
@@ -115,7 +391,7 @@ class PocketBaseClient:
         url = f"{self.base_url}/api/collections/{collection}/records/{record_id}"
         
         try:
-            response = requests.patch(url, json=data, headers=self._get_headers())
+            response = self._request("PATCH", url, json=data)
             response.raise_for_status()
             return response.json()
         except requests.RequestException as e:
@@ -139,7 +415,7 @@ class PocketBaseClient:
         url = f"{self.base_url}/api/collections/{collection}/records/{record_id}"
         
         try:
-            response = requests.get(url, headers=self._get_headers())
+            response = self._request("GET", url)
             response.raise_for_status()
             return response.json()
         except requests.RequestException as e:
@@ -147,7 +423,8 @@ class PocketBaseClient:
             return None
             
     def list_records(self, collection: str, filter_str: str = None, sort: str = None, 
-                    page: int = 1, per_page: int = 50) -> Optional[Dict[str, Any]]:
+                    page: int = 1, per_page: int = 50, fields: Optional[List[str]] = None,
+                    skip_total: bool = False) -> Optional[Dict[str, Any]]:
         """List records from a PocketBase collection with optional filtering and sorting.
         
         Args:
@@ -156,6 +433,8 @@ class PocketBaseClient:
             sort: Sort string (e.g., "-created,+name")
             page: Page number for pagination
             per_page: Number of records per page
+            fields: Fields to return for each record (all fields if omitted)
+            skip_total: Skip the total count query (totalItems/totalPages are then -1)
             
         Returns:
             Optional[Dict[str, Any]]: Paginated records or None on failure
@@ -171,15 +450,64 @@ class PocketBaseClient:
             params["filter"] = filter_str
         if sort:
             params["sort"] = sort
+        if fields:
+            params["fields"] = ",".join(fields)
+        if skip_total:
+            params["skipTotal"] = 1
             
         try:
-            response = requests.get(url, params=params, headers=self._get_headers())
+            response = self._request("GET", url, params=params)
             response.raise_for_status()
             return response.json()
         except requests.RequestException as e:
             print(f"Error listing records: {str(e)}")
             return None
 
+    def iter_records(self, collection: str, filter_str: str = None, sort: str = None,
+                     fields: Optional[List[str]] = None,
+                     page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+        """Iterate over every matching record in a collection, one page at a time.
+        
+        Pages are requested without a total count, and the next page is
+        fetched in the background while the current one is consumed.
+        
+        Args:
+            collection: Collection name
+            filter_str: Filter query string
+            sort: Sort string (e.g., "-created,+name")
+            fields: Fields to return for each record (all fields if omitted)
+            page_size: Number of records per page request
+            
+        Yields:
+            Dict[str, Any]: Records in server order
+            
+        Raises:
+            RuntimeError: If a page cannot be fetched
+        """
+        if not self.is_authenticated:
+            print("Error: Not authenticated")
+            return
+        
+        def fetch_page(page: int) -> Optional[Dict[str, Any]]:
+            return self.list_records(collection, filter_str, sort, page, page_size,
+                                     fields=fields, skip_total=True)
+        
+        with ThreadPoolExecutor(max_workers=1) as prefetcher:
+            page = 1
+            next_page = prefetcher.submit(fetch_page, page)
+            while next_page is not None:
+                result = next_page.result()
+                if result is None:
+                    raise RuntimeError(f"Failed to fetch page {page} of {collection}")
+                
+                items = result.get('items', [])
+                # A short page is the last one when the total count is skipped
+                page += 1
+                next_page = prefetcher.submit(fetch_page, page) if len(items) >= page_size else None
+                
+                for item in items:
+                    yield item
+
     def delete_record(self, collection: str, record_id: str) -> bool:
         """Delete a record from a PocketBase collection.
         
@@ -197,19 +525,223 @@ class PocketBaseClient:
         url = f"{self.base_url}/api/collections/{collection}/records/{record_id}"
         
         try:
-            response = requests.delete(url, headers=self._get_headers())
+            response = self._request("DELETE", url)
             response.raise_for_status()
             return True
         except requests.RequestException as e:
             print(f"Error deleting record: {str(e)}")
             return False
 
-    def batch_import_audits(self, collection: str, audits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def execute_batch(self, batch_requests: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        """Send several write requests as one transactional PocketBase batch.
+        
+        Args:
+            batch_requests: Sub-requests, each with 'method', 'url' and optional 'body'
+            
+        Returns:
+            Optional[List[Dict[str, Any]]]: One {'status', 'body'} entry per sub-request,
+            in request order, or None if the batch was rejected or rolled back
+            (nothing in it was written)
+            
+        Raises:
+            BatchError: If the batch may or may not have been applied, e.g. the
+                connection failed after the request was sent or the server
+                answered with an unexpected status
+        """
+        if not self.is_authenticated:
+            print("Error: Not authenticated")
+            return None
+            
+        url = f"{self.base_url}/api/batch"
+        
+        try:
+            response = self._request("POST", url, json={"requests": batch_requests})
+            if response.status_code in BATCH_UNSUPPORTED_STATUSES:
+                print(f"Batch requests are not available (status code: {response.status_code}), "
+                      "falling back to single requests")
+                self.batch_supported = False
+                return None
+            if response.status_code == 400:
+                # PocketBase rolls the whole transaction back when a sub-request fails
+                print(f"Batch was rolled back: {response.text}")
+                return None
+            response.raise_for_status()
+            return response.json()
+        except requests.RequestException as e:
+            raise BatchError(str(e)) from e
+
+    def _run_batch(self, func: Callable[[Any], Any], audits: List[Any],
+                   concurrency: int) -> List[Any]:
+        """Apply a per-audit function, optionally across a bounded worker pool.
+        
+        Args:
+            func: Function processing one audit and returning its result record
+            audits: List of audit records
+            concurrency: Maximum number of requests in flight at once
+            
+        Returns:
+            List[Dict[str, Any]]: Results in the same order as the input audits
+        """
+        if concurrency <= 1 or len(audits) <= 1:
+            return [func(audit) for audit in audits]
+        
+        # executor.map yields results in submission order
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return list(executor.map(func, audits))
+
+    def _write_in_batches(self, items: List[Any],
+                          build_request: Callable[[Any], Optional[Dict[str, Any]]],
+                          on_success: Callable[[Any, Dict[str, Any]], Any],
+                          fallback: Callable[[Any], Any],
+                          failed: Callable[[Any], Any],
+                          batch_size: int, concurrency: int) -> List[Any]:
+        """Write items through /api/batch in chunks, falling back to single requests.
+        
+        Each chunk is all-or-nothing on the server. If a chunk is rejected or
+        rolled back, its items are retried one by one so a single bad record
+        does not fail its neighbours. If it is unknown whether a chunk was
+        applied, its items are reported as failed rather than sent again,
+        which could duplicate the creates in it.
+        
+        Args:
+            items: Items to write
+            build_request: Returns the batch sub-request for an item, or None if
+                the item needs no write (it is then passed to the fallback as-is)
+            on_success: Maps an item and its sub-response body to its result
+            fallback: Processes a single item without batching
+            failed: Maps an item whose write failed or may not have happened to its result
+            batch_size: Maximum number of sub-requests per batch
+            concurrency: Maximum number of batches in flight at once
+            
+        Returns:
+            List[Any]: Results in the same order as the input items
+        """
+        results = [None] * len(items)
+        pending = []
+        batch_requests = {}
+        for index, item in enumerate(items):
+            batch_request = build_request(item)
+            if batch_request is None:
+                results[index] = fallback(item)
+            else:
+                pending.append(index)
+                batch_requests[index] = batch_request
+        
+        def process_chunk(indices: List[int]) -> List[Any]:
+            responses = None
+            if self.batch_supported:
+                try:
+                    responses = self.execute_batch([batch_requests[i] for i in indices])
+                except BatchError as e:
+                    logger.warning("Batch of %d writes may or may not have been applied, not retrying it: %s",
+                                   len(indices), e)
+                    return [failed(items[i]) for i in indices]
+            if responses is None:
+                return [fallback(items[i]) for i in indices]
+            if len(responses) != len(indices):
+                logger.warning("Batch returned %d responses for %d writes", len(responses), len(indices))
+                return [failed(items[i]) for i in indices]
+            
+            chunk_results = []
+            for i, response in zip(indices, responses):
+                status = response.get('status')
+                if isinstance(status, int) and 200 <= status < 300:
+                    chunk_results.append(on_success(items[i], response.get('body') or {}))
+                else:
+                    logger.warning("Batch write %s failed with status %s", batch_requests[i]['url'], status)
+                    chunk_results.append(failed(items[i]))
+            return chunk_results
+        
+        chunks = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+        for indices, chunk_results in zip(chunks, self._run_batch(process_chunk, chunks, concurrency)):
+            for index, result in zip(indices, chunk_results):
+                results[index] = result
+                
+        return results
+
+    @staticmethod
+    def _bind_index(on_success: Optional[Callable[[int, Dict[str, Any]], None]],
+                    index: int) -> Optional[Callable[[Dict[str, Any]], None]]:
+        """Bind an input index to a per-record success callback."""
+        if on_success is None:
+            return None
+        return lambda record: on_success(index, record)
+
+    def _import_audit(self, collection: str, audit: Dict[str, Any],
+                      on_success: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Import a single audit record, returning it with its new ID.
+        
+        Args:
+            collection: Collection name
+            audit: Audit record to import
+            on_success: Called with the audit and its new ID after it is created
+            
+        Returns:
+            Dict[str, Any]: Audit with ID, or the original audit if skipped or failed
+        """
+        # Skip if the audit already has an ID
+        if 'id' in audit and audit['id']:
+            logger.info("Skipping audit with existing ID: %s", audit['id'])
+            return audit
+            
+        record = self.create_record(collection, audit)
+        if record:
+            # Extract the ID and add it to the original audit
+            audit_with_id = audit.copy()
+            audit_with_id['id'] = record.get('id')
+            logger.info("Imported audit for %s on %s", audit.get('account'), audit.get('date'))
+            if on_success:
+                on_success(audit_with_id)
+            return audit_with_id
+        
+        logger.warning("Failed to import audit for %s on %s", audit.get('account'), audit.get('date'))
+        return audit  # Keep the original audit in the list
+
+    def _update_audit(self, collection: str, audit: Dict[str, Any],
+                      on_success: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Update a single audit record that already has an ID.
+        
+        Args:
+            collection: Collection name
+            audit: Audit record to update
+            on_success: Called with the audit after it is updated
+            
+        Returns:
+            Dict[str, Any]: The audit record (unchanged, whether or not the update succeeded)
+        """
+        # Skip audits without IDs
+        if 'id' not in audit or not audit['id']:
+            logger.warning("Audit for %s on %s has no ID, skipping", audit.get('account'), audit.get('date'))
+            return audit
+            
+        record_id = audit['id']
+        # Create a copy without the ID for the update
+        update_data = audit.copy()
+        update_data.pop('id', None)
+        
+        updated = self.update_record(collection, record_id, update_data)
+        if updated:
+            logger.info("Updated audit %s for %s on %s", record_id, audit.get('account'), audit.get('date'))
+            if on_success:
+                on_success(audit)
+        else:
+            logger.warning("Failed to update audit %s", record_id)
+        return audit  # Keep the original audit in the list
+
+    def batch_import_audits(self, collection: str, audits: List[Dict[str, Any]],
+                            concurrency: int = 1, batch_size: Optional[int] = None,
+                            on_success: Optional[Callable[[int, Dict[str, Any]], None]] = None
+                            ) -> List[Dict[str, Any]]:
         """Import multiple audit records in batch to PocketBase.
         
         Args:
             collection: Collection name
             audits: List of audit records to import
+            concurrency: Maximum number of concurrent create requests
+            batch_size: Number of creates per /api/batch call, or None to
+                send one request per audit
+            on_success: Called with the input index and the audit with its new
+                ID as soon as each create succeeds (possibly from a worker thread)
             
         Returns:
             List[Dict[str, Any]]: List of imported records with IDs
@@ -217,34 +749,55 @@ class PocketBaseClient:
         if not self.is_authenticated:
             print("Error: Not authenticated")
             return []
+        
+        items = list(enumerate(audits))
+        
+        def import_one(item: Tuple[int, Dict[str, Any]]) -> Dict[str, Any]:
+            index, audit = item
+            return self._import_audit(collection, audit, self._bind_index(on_success, index))
+        
+        if batch_size:
+            url = f"/api/collections/{collection}/records"
             
-        imported_records = []
-        for audit in audits:
-            # Skip if the audit already has an ID
-            if 'id' in audit and audit['id']:
-                print(f"Skipping audit with existing ID: {audit['id']}")
-                imported_records.append(audit)
-                continue
-                
-            record = self.create_record(collection, audit)
-            if record:
-                # Extract the ID and add it to the original audit
+            def build_request(item: Tuple[int, Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+                audit = item[1]
+                if 'id' in audit and audit['id']:
+                    return None
+                return {"method": "POST", "url": url, "body": audit}
+            
+            def imported(item: Tuple[int, Dict[str, Any]], record: Dict[str, Any]) -> Dict[str, Any]:
+                index, audit = item
                 audit_with_id = audit.copy()
                 audit_with_id['id'] = record.get('id')
-                imported_records.append(audit_with_id)
-                print(f"Imported audit for {audit.get('account')} on {audit.get('date')}")
-            else:
-                print(f"Failed to import audit for {audit.get('account')} on {audit.get('date')}")
-                imported_records.append(audit)  # Keep the original audit in the list
-                
-        return imported_records
+                logger.info("Imported audit for %s on %s", audit.get('account'), audit.get('date'))
+                if on_success:
+                    on_success(index, audit_with_id)
+                return audit_with_id
+            
+            def not_imported(item: Tuple[int, Dict[str, Any]]) -> Dict[str, Any]:
+                audit = item[1]
+                logger.warning("Failed to import audit for %s on %s", audit.get('account'), audit.get('date'))
+                return audit
+            
+            return self._write_in_batches(items, build_request, imported, import_one, not_imported,
+                                          batch_size, concurrency)
+            
+        return self._run_batch(import_one, items, concurrency)
 
-    def batch_update_audits(self, collection: str, audits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def batch_update_audits(self, collection: str, audits: List[Dict[str, Any]],
+                            concurrency: int = 1, batch_size: Optional[int] = None,
+                            on_success: Optional[Callable[[int, Dict[str, Any]], None]] = None
+                            ) -> List[Dict[str, Any]]:
         """Update multiple audit records in batch to PocketBase.
         
         Args:
             collection: Collection name
             audits: List of audit records to update (must have IDs)
+            concurrency: Maximum number of concurrent update requests
+            batch_size: Number of updates per /api/batch call, or None to
+                send one request per audit
+            on_success: Called with the input index and the audit as soon as
+                each update succeeds (possibly from a worker thread)
             
         Returns:
             List[Dict[str, Any]]: List of updated records
@@ -252,26 +805,68 @@ class PocketBaseClient:
         if not self.is_authenticated:
             print("Error: Not authenticated")
             return audits
+        
+        items = list(enumerate(audits))
+        
+        def update_one(item: Tuple[int, Dict[str, Any]]) -> Dict[str, Any]:
+            index, audit = item
+            return self._update_audit(collection, audit, self._bind_index(on_success, index))
+        
+        if batch_size:
+            def build_request(item: Tuple[int, Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+                audit = item[1]
+                if 'id' not in audit or not audit['id']:
+                    return None
+                update_data = audit.copy()
+                update_data.pop('id', None)
+                return {"method": "PATCH",
+                        "url": f"/api/collections/{collection}/records/{audit['id']}",
+                        "body": update_data}
             
-        updated_records = []
-        for audit in audits:
-            # Skip audits without IDs
-            if 'id' not in audit or not audit['id']:
-                print(f"Warning: Audit for {audit.get('account')} on {audit.get('date')} has no ID, skipping")
-                updated_records.append(audit)
-                continue
-                
-            record_id = audit['id']
-            # Create a copy without the ID for the update
-            update_data = audit.copy()
-            update_data.pop('id', None)
-            
-            updated = self.update_record(collection, record_id, update_data)
-            if updated:
-                updated_records.append(audit)
-                print(f"Updated audit {record_id} for {audit.get('account')} on {audit.get('date')}")
-            else:
-                print(f"Failed to update audit {record_id}")
-                updated_records.append(audit)  # Keep the original audit in the list
-                
-        return updated_records
\ No newline at end of file
+            def updated(item: Tuple[int, Dict[str, Any]], record: Dict[str, Any]) -> Dict[str, Any]:
+                index, audit = item
+                logger.info("Updated audit %s for %s on %s", audit['id'], audit.get('account'), audit.get('date'))
+                if on_success:
+                    on_success(index, audit)
+                return audit
+            
+            def not_updated(item: Tuple[int, Dict[str, Any]]) -> Dict[str, Any]:
+                audit = item[1]
+                logger.warning("Failed to update audit %s", audit['id'])
+                return audit
+            
+            return self._write_in_batches(items, build_request, updated, update_one, not_updated,
+                                          batch_size, concurrency)
+            
+        return self._run_batch(update_one, items, concurrency)
+
+    def batch_delete_records(self, collection: str, record_ids: List[str],
+                             concurrency: int = 1, batch_size: Optional[int] = None) -> List[bool]:
+        """Delete multiple records from a PocketBase collection.
+        
+        Args:
+            collection: Collection name
+            record_ids: IDs of the records to delete
+            concurrency: Maximum number of concurrent delete requests
+            batch_size: Number of deletes per /api/batch call, or None to
+                send one request per record
+            
+        Returns:
+            List[bool]: Deletion success for each record ID, in input order
+        """
+        if not self.is_authenticated:
+            print("Error: Not authenticated")
+            return [False] * len(record_ids)
+        
+        if batch_size:
+            return self._write_in_batches(
+                record_ids,
+                lambda record_id: {"method": "DELETE",
+                                   "url": f"/api/collections/{collection}/records/{record_id}"},
+                lambda record_id, body: True,
+                lambda record_id: self.delete_record(collection, record_id),
+                lambda record_id: False,
+                batch_size, concurrency)
+            
+        return self._run_batch(lambda record_id: self.delete_record(collection, record_id),
+                               record_ids, concurrency)
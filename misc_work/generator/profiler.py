@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Profiling Module for Audit Wizard
+cProfile, tracemalloc and stack sampling scoped to the phases of a command
+"""
+
+import cProfile
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import ContextManager, Dict, Iterator, List, Optional, Tuple
+
+# Seconds between two stack samples for the collapsed-stack file
+PROFILE_SAMPLE_INTERVAL = 0.001
+
+# Component of a sample: the first frame, from the innermost one out, whose
+# file matches one of the component's paths ('dir/' matches any file in dir)
+COMPONENTS = (
+    ("normalize dates", ("dates.py",)),
+    ("read", ("codecs.py",)),
+    ("validate", ("validator.py",)),
+    ("write", ("json/encoder.py",)),
+    ("parse", ("readers.py", "yaml/", "json/")),
+    ("aggregate", ("aggregator.py", "stats.py", "table.py", "report_cache.py", "floor_matrix.py")),
+    ("render", ("renderers.py",)),
+    ("http", ("pocketbase_client.py", "retry.py", "requests/", "urllib3/", "http/client.py", "socket.py",
+              "ssl.py")),
+    ("convert", ("converter.py",)),
+)
+
+# Files whose innermost frame means a worker thread is idle, e.g. waiting for work
+_IDLE_FILES = ("threading.py", "queue.py", "concurrent/futures/thread.py")
+
+# The running profiler, used by profile_phase()
+_active: Optional["Profiler"] = None
+
+
+def profile_phase(name: str) -> ContextManager:
+    """Scope the following code to a named phase of the running profiler.
+
+    This is a no-op unless a Profiler is running, and outside of the thread
+    that started it, so hooks can stay in the code.
+
+    Args:
+        name: Phase name, e.g. 'aggregate' or 'render'
+
+    Returns:
+        ContextManager: Context of the phase
+    """
+    profiler = _active
+    if profiler is None or threading.get_ident() != profiler.thread_id:
+        return nullcontext()
+    return profiler.phase(name)
+
+
+class PhaseProfile:
+    """cProfile data, time and memory of one phase, added up over its calls."""
+
+    def __init__(self, path: str):
+        """Initialize an empty phase.
+
+        Args:
+            path: Phase name, prefixed by its enclosing phases, e.g. 'report/render'
+        """
+        self.path = path
+        self.profile = cProfile.Profile()
+        self.calls = 0
+        self.seconds = 0.0
+        self.peak_memory = 0
+        self.net_memory = 0
+
+
+class Profiler:
+    """Profile a command phase by phase.
+
+    Each phase gets its own cProfile data, which leaves out nested phases,
+    and its peak traced memory (tracemalloc), which includes them. A
+    sampling thread records the stacks of all threads for a flamegraph,
+    rooted at the phase they ran in, and the share of time spent in each
+    component (see COMPONENTS) across the phases.
+    """
+
+    def __init__(self, sample_interval: float = PROFILE_SAMPLE_INTERVAL):
+        """Initialize the profiler.
+
+        Args:
+            sample_interval: Seconds between two stack samples
+        """
+        self.sample_interval = sample_interval
+        self.phases: Dict[str, PhaseProfile] = {}
+        self.stacks: Dict[Tuple[str, ...], int] = {}
+        self.components: Dict[str, int] = {}
+        self.samples = 0
+        self.thread_id: Optional[int] = None
+        self._open: List[Tuple[PhaseProfile, List[int]]] = []
+        self._path: Tuple[str, ...] = ()
+        self._labels: Dict[object, Tuple[str, str]] = {}
+        self._stopped = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._started_tracing = False
+
+    def start(self):
+        """Start tracing memory and sampling stacks, and make this the running profiler.
+
+        Raises:
+            RuntimeError: If another profiler is running
+        """
+        global _active
+        if _active is not None:
+            raise RuntimeError("A profiler is already running")
+        self.thread_id = threading.get_ident()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._stopped.clear()
+        self._sampler = threading.Thread(target=self._sample, name="profiler-sampler", daemon=True)
+        self._sampler.start()
+        _active = self
+
+    def stop(self):
+        """Stop sampling and tracing memory."""
+        global _active
+        if _active is self:
+            _active = None
+        self._stopped.set()
+        if self._sampler is not None:
+            self._sampler.join()
+            self._sampler = None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def __enter__(self) -> "Profiler":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[PhaseProfile]:
+        """Profile a phase; call it from the thread that started the profiler.
+
+        Args:
+            name: Phase name
+
+        Yields:
+            PhaseProfile: The phase
+        """
+        parent = self._open[-1] if self._open else None
+        if parent:
+            parent[0].profile.disable()
+            parent[1][0] = max(parent[1][0], tracemalloc.get_traced_memory()[1])
+        path = f"{parent[0].path}/{name}" if parent else name
+        phase = self.phases.get(path)
+        if phase is None:
+            phase = self.phases[path] = PhaseProfile(path)
+
+        peak = [0]
+        self._open.append((phase, peak))
+        self._path = tuple(path.split('/'))
+        start_memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        phase.profile.enable()
+        try:
+            yield phase
+        finally:
+            phase.profile.disable()
+            elapsed = time.perf_counter() - start
+            end_memory, end_peak = tracemalloc.get_traced_memory()
+            peak[0] = max(peak[0], end_peak)
+            phase.calls += 1
+            phase.seconds += elapsed
+            phase.peak_memory = max(phase.peak_memory, peak[0])
+            phase.net_memory += end_memory - start_memory
+
+            self._open.pop()
+            self._path = tuple(parent[0].path.split('/')) if parent else ()
+            if parent:
+                parent[1][0] = max(parent[1][0], peak[0])
+                tracemalloc.reset_peak()
+                parent[0].profile.enable()
+
+    def _sample(self):
+        """Record the stacks of all threads until stopped."""
+        own_id = threading.get_ident()
+        while not self._stopped.wait(self.sample_interval):
+            path = self._path
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                frames = self._frame_labels(frame)
+                if thread_id != self.thread_id and frames and _matches(frames[-1][1], _IDLE_FILES):
+                    continue
+                stack = path + tuple(label for label, _ in frames)
+                self.stacks[stack] = self.stacks.get(stack, 0) + 1
+                if thread_id == self.thread_id and path:
+                    component = _component(frames)
+                    self.components[component] = self.components.get(component, 0) + 1
+                    self.samples += 1
+
+    def _frame_labels(self, frame) -> List[Tuple[str, str]]:
+        """Get the (label, file) of each frame of a stack, outermost first."""
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                filename = code.co_filename.replace(os.sep, '/')
+                label = self._labels[code] = (
+                    f"{code.co_name} ({os.path.basename(filename)}:{code.co_firstlineno})", filename)
+            frames.append(label)
+            frame = frame.f_back
+        frames.reverse()
+        return frames
+
+    def summary(self) -> str:
+        """Render the phases and the sampled time per component as a text table.
+
+        Returns:
+            str: Summary table
+        """
+        width = max([len("Phase")] + [len(path) for path in self.phases])
+        lines = [f"{'Phase':<{width}} {'Calls':>7} {'Seconds':>9} {'Peak MiB':>9} {'Net MiB':>9}"]
+        for path, phase in self.phases.items():
+            lines.append(f"{path:<{width}} {phase.calls:>7} {phase.seconds:>9.2f} "
+                         f"{phase.peak_memory / 2**20:>9.1f} {phase.net_memory / 2**20:>9.1f}")
+        if self.samples:
+            lines.append("")
+            lines.append(f"{'Component':<16} {'Share':>7}")
+            for component, count in sorted(self.components.items(), key=lambda item: -item[1]):
+                lines.append(f"{component:<16} {count / self.samples:>7.1%}")
+            lines.append(f"({self.samples} samples)")
+        return "\n".join(lines)
+
+    def save(self, prefix: str) -> Optional[List[str]]:
+        """Save one pstats file per phase and the sampled stacks in collapsed format.
+
+        The pstats files are named '<prefix>.<phase>.pstats' (view them with
+        'python -m pstats'), and the stacks '<prefix>.collapsed', one
+        'frame;frame;... count' line per stack for flamegraph.pl or speedscope.
+
+        Args:
+            prefix: Path prefix of the output files
+
+        Returns:
+            Optional[List[str]]: Paths of the saved files, or None on failure
+        """
+        paths = []
+        try:
+            for path, phase in self.phases.items():
+                stats_path = f"{prefix}.{path.replace('/', '.')}.pstats"
+                phase.profile.dump_stats(stats_path)
+                paths.append(stats_path)
+            collapsed_path = f"{prefix}.collapsed"
+            with open(collapsed_path, 'w') as file:
+                for stack, count in sorted(self.stacks.items()):
+                    file.write(f"{';'.join(stack)} {count}\n")
+            paths.append(collapsed_path)
+            return paths
+        except Exception as e:
+            print(f"Error saving profile: {str(e)}")
+            return None
+
+
+def _matches(filename: str, patterns: Tuple[str, ...]) -> bool:
+    for pattern in patterns:
+        if pattern.endswith('/'):
+            if f"/{pattern}" in filename:
+                return True
+        elif filename.endswith(f"/{pattern}") or filename == pattern:
+            return True
+    return False
+
+
+def _component(frames: List[Tuple[str, str]]) -> str:
+    for _, filename in reversed(frames):
+        for component, patterns in COMPONENTS:
+            if _matches(filename, patterns):
+                return component
+    return "other"
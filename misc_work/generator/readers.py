@@ -0,0 +1,503 @@
+#!/usr/bin/env python3
+"""
+Streaming Readers for Audit Wizard
+Incremental readers for YAML, JSON array and JSON Lines audit files that
+yield one audit at a time instead of loading the whole file
+"""
+
+import glob
+import json
+import os
+import yaml
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+# Number of characters read from a JSON file at a time
+READ_CHUNK_SIZE = 1 << 16
+
+# Extensions of the audit files picked up from directories
+AUDIT_FILE_EXTENSIONS = ('.yml', '.yaml', '.json', '.jsonl')
+
+# Prefer the libyaml-based parser when PyYAML was built with it
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+_WHITESPACE = " \t\n\r"
+
+
+def is_yaml_path(path: str) -> bool:
+    """Check whether a path names a YAML file."""
+    return path.endswith(('.yml', '.yaml'))
+
+
+def expand_audit_paths(patterns: Iterable[str]) -> List[str]:
+    """Expand input arguments to audit file paths.
+
+    Each argument may be a file, a directory (searched recursively for
+    audit files) or a glob pattern ('**' matches nested directories).
+
+    Args:
+        patterns: Paths, directories or glob patterns
+
+    Returns:
+        List[str]: Audit file paths, each directory or pattern sorted by
+        path, without duplicates
+
+    Raises:
+        FileNotFoundError: If a directory or pattern matches no files
+    """
+    paths = []
+    seen = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = sorted(os.path.join(root, name)
+                             for root, _, names in os.walk(pattern)
+                             for name in names if name.endswith(AUDIT_FILE_EXTENSIONS))
+        elif any(char in pattern for char in "*?["):
+            matches = sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+        else:
+            matches = [pattern]
+        if not matches:
+            raise FileNotFoundError(f"No audit files found for {pattern}")
+        for path in matches:
+            if path not in seen:
+                seen.add(path)
+                paths.append(path)
+    return paths
+
+
+def iter_json_array(file: TextIO, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[Any]:
+    """Yield the items of a top-level JSON array one at a time.
+
+    Args:
+        file: Open text file containing a JSON array
+        chunk_size: Number of characters to read at a time
+
+    Yields:
+        Any: Array items in order
+
+    Raises:
+        ValueError: If the file is not a well-formed JSON array
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    eof = False
+
+    def fill() -> bool:
+        nonlocal buffer, position, eof
+        chunk = file.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buffer = buffer[position:] + chunk
+        position = 0
+        return True
+
+    def next_char() -> Optional[str]:
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position] in _WHITESPACE:
+                position += 1
+            if position < len(buffer):
+                return buffer[position]
+            if not fill():
+                return None
+
+    if next_char() != "[":
+        raise ValueError("Expected a JSON array")
+    position += 1
+
+    if next_char() == "]":
+        return
+
+    while True:
+        if next_char() is None:
+            raise ValueError("Unexpected end of JSON array")
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+                # A number at the end of the buffer may continue in the next chunk
+                if end < len(buffer) or eof:
+                    break
+            except json.JSONDecodeError:
+                # Either the item is cut off at the end of the buffer or it is invalid
+                if eof:
+                    raise ValueError("Invalid JSON array item")
+            fill()
+        position = end
+        yield item
+
+        separator = next_char()
+        if separator == "]":
+            return
+        if separator != ",":
+            raise ValueError("Expected ',' or ']' in JSON array")
+        position += 1
+
+
+def iter_json_lines(file: TextIO) -> Iterator[Any]:
+    """Yield the records of a JSON Lines file, skipping blank lines.
+
+    Args:
+        file: Open text file with one JSON value per line
+
+    Yields:
+        Any: Parsed records in order
+    """
+    for line_number, line in enumerate(file, 1):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON on line {line_number}: {str(e)}")
+
+
+def iter_json_audits(file: TextIO) -> Iterator[Dict]:
+    """Yield audit records from a JSON array or JSON Lines file.
+
+    The format is detected from the first non-whitespace character.
+
+    Args:
+        file: Open text file
+
+    Yields:
+        Dict: Audit records in JSON format
+    """
+    first = ""
+    while True:
+        char = file.read(1)
+        if not char or char not in _WHITESPACE:
+            first = char
+            break
+
+    if not first:
+        return
+
+    rest = _PrefixedReader(first, file)
+    if first == "[":
+        yield from iter_json_array(rest)
+    else:
+        yield from iter_json_lines(rest)
+
+
+class _PrefixedReader:
+    """File-like wrapper that puts already-consumed text back in front of a file."""
+
+    def __init__(self, prefix: str, file: TextIO):
+        self.prefix = prefix
+        self.file = file
+
+    def read(self, size: int = -1) -> str:
+        prefix, self.prefix = self.prefix, ""
+        if size is None or size < 0:
+            return prefix + self.file.read()
+        return prefix + self.file.read(max(0, size - len(prefix)))
+
+    def __iter__(self) -> Iterator[str]:
+        prefix, self.prefix = self.prefix, ""
+        first_line = prefix + self.file.readline()
+        if first_line:
+            yield first_line
+        yield from self.file
+
+
+class _YamlEventReader:
+    """Builds Python values from a YAML event stream, node by node."""
+
+    def __init__(self, stream: TextIO):
+        self.events = yaml.parse(stream, Loader=_YAML_LOADER)
+        self.resolver = yaml.resolver.Resolver()
+        self.constructor = yaml.constructor.SafeConstructor()
+
+    def next(self) -> yaml.Event:
+        return next(self.events)
+
+    def scalar(self, event: yaml.ScalarEvent) -> Any:
+        """Construct a scalar exactly as yaml.safe_load would."""
+        tag = event.tag
+        if tag is None or tag == "!":
+            tag = self.resolver.resolve(yaml.ScalarNode, event.value, event.implicit)
+        node = yaml.ScalarNode(tag, event.value, event.start_mark, event.end_mark, event.style)
+        try:
+            return self.constructor.construct_object(node, deep=True)
+        finally:
+            # The constructor keeps every node it built; scalars are never
+            # shared, so drop them to keep memory flat over the file
+            self.constructor.constructed_objects.clear()
+            self.constructor.recursive_objects.clear()
+
+    def value(self, event: yaml.Event) -> Any:
+        """Construct the full value of the node starting with event."""
+        if isinstance(event, yaml.ScalarEvent):
+            return self.scalar(event)
+        if isinstance(event, yaml.SequenceStartEvent):
+            items = []
+            event = self.next()
+            while not isinstance(event, yaml.SequenceEndEvent):
+                items.append(self.value(event))
+                event = self.next()
+            return items
+        if isinstance(event, yaml.MappingStartEvent):
+            mapping = {}
+            event = self.next()
+            while not isinstance(event, yaml.MappingEndEvent):
+                key = self.value(event)
+                mapping[key] = self.value(self.next())
+                event = self.next()
+            return mapping
+        if isinstance(event, yaml.AliasEvent):
+            raise ValueError("YAML aliases are not supported when streaming audit files")
+        raise ValueError(f"Unexpected YAML event: {event}")
+
+    def skip(self, event: yaml.Event):
+        """Consume the node starting with event without building it."""
+        depth = 0
+        while True:
+            if isinstance(event, (yaml.SequenceStartEvent, yaml.MappingStartEvent)):
+                depth += 1
+            elif isinstance(event, (yaml.SequenceEndEvent, yaml.MappingEndEvent)):
+                depth -= 1
+            if depth == 0:
+                return
+            event = self.next()
+
+
+class _YamlLineReader(_YamlEventReader):
+    """Event reader that also records the line of every item of the values it builds.
+
+    Lines are kept in `lines`, keyed by the id() of each list or dict built
+    since it was last reset: a list of item lines for a sequence, and a dict
+    of value lines by key for a mapping.
+    """
+
+    def __init__(self, stream: TextIO):
+        super().__init__(stream)
+        self.lines: Dict[int, Any] = {}
+
+    def scalar(self, event: yaml.ScalarEvent) -> Any:
+        try:
+            return super().scalar(event)
+        except ValueError as e:
+            # E.g. an unquoted date that does not exist
+            raise ValueError(f"Invalid value {event.value!r} on line {event.start_mark.line + 1}: {str(e)}")
+
+    def value(self, event: yaml.Event) -> Any:
+        if isinstance(event, yaml.SequenceStartEvent):
+            items = []
+            item_lines = []
+            event = self.next()
+            while not isinstance(event, yaml.SequenceEndEvent):
+                item_lines.append(event.start_mark.line + 1)
+                items.append(self.value(event))
+                event = self.next()
+            self.lines[id(items)] = item_lines
+            return items
+        if isinstance(event, yaml.MappingStartEvent):
+            mapping = {}
+            value_lines = {}
+            event = self.next()
+            while not isinstance(event, yaml.MappingEndEvent):
+                key = self.value(event)
+                event = self.next()
+                try:
+                    value_lines[key] = event.start_mark.line + 1
+                except TypeError:
+                    pass  # Unhashable keys fail below, as in yaml.safe_load
+                mapping[key] = self.value(event)
+                event = self.next()
+            self.lines[id(mapping)] = value_lines
+            return mapping
+        return super().value(event)
+
+
+class YamlBlock:
+    """One item of a YAML file's 'accounts' sequence, with the lines of its values."""
+
+    def __init__(self, index: int, account: Any, line: int, lines: Dict[int, Any]):
+        """Initialize the block.
+
+        Args:
+            index: Position in the 'accounts' sequence
+            account: The item, built in full
+            line: Line the item starts on (1-based)
+            lines: Item lines recorded by the reader (see _YamlLineReader)
+        """
+        self.index = index
+        self.account = account
+        self.line = line
+        self.lines = lines
+
+    def line_of(self, path: Tuple[Any, ...]) -> int:
+        """Get the line of a value nested in the block.
+
+        Args:
+            path: Keys and indexes leading from the account to the value
+
+        Returns:
+            int: Line of the value, or of its closest enclosing value that exists
+        """
+        line = self.line
+        value = self.account
+        for key in path:
+            item_lines = self.lines.get(id(value))
+            try:
+                line = item_lines[key]
+                value = value[key]
+            except (IndexError, KeyError, TypeError):
+                break
+        return line
+
+
+class YamlAccountReader:
+    """Reads a YAML audit file one account block at a time, keeping line positions.
+
+    Unlike iter_yaml_accounts, the other keys of the root mapping are kept
+    in `root` (with 'accounts' as an empty list while its items are
+    streamed), so the whole file can be checked against the schema.
+    """
+
+    def __init__(self, stream: TextIO):
+        """Initialize the reader.
+
+        Args:
+            stream: Open YAML file
+        """
+        self._reader = _YamlLineReader(stream)
+        self.root: Any = None
+        self.root_lines: Dict[Any, int] = {}
+
+    def __iter__(self) -> Iterator[YamlBlock]:
+        """Yield the account blocks in file order; `root` is complete once exhausted."""
+        reader = self._reader
+        event = reader.next()
+        while isinstance(event, (yaml.StreamStartEvent, yaml.DocumentStartEvent)):
+            event = reader.next()
+        if isinstance(event, yaml.StreamEndEvent):
+            return
+        if not isinstance(event, yaml.MappingStartEvent):
+            self.root = reader.value(event)
+            return
+
+        self.root = {}
+        index = 0
+        event = reader.next()
+        while not isinstance(event, yaml.MappingEndEvent):
+            key = reader.value(event)
+            event = reader.next()
+            self.root_lines[key] = event.start_mark.line + 1
+            if key != 'accounts' or not isinstance(event, yaml.SequenceStartEvent):
+                self.root[key] = reader.value(event)
+                event = reader.next()
+                continue
+
+            self.root[key] = []
+            event = reader.next()
+            while not isinstance(event, yaml.SequenceEndEvent):
+                line = event.start_mark.line + 1
+                reader.lines = {}
+                yield YamlBlock(index, reader.value(event), line, reader.lines)
+                index += 1
+                event = reader.next()
+            event = reader.next()
+
+
+def iter_yaml_audits(stream: TextIO) -> Iterator[Tuple[Any, Optional[Dict]]]:
+    """Yield audits from a YAML audit file (accounts[].audits[]) one at a time.
+
+    Only one audit is built at a time. If an account's 'audits' come before
+    its 'id', that account's audits are held until the ID is known.
+
+    Args:
+        stream: Open YAML file
+
+    Yields:
+        Tuple[Any, Optional[Dict]]: (account ID, audit) pairs; accounts without
+        any audits are yielded once as (account ID, None)
+    """
+    reader = _YamlEventReader(stream)
+    for event in _iter_account_events(reader):
+        yield from _iter_yaml_account(reader, event)
+
+
+def iter_yaml_accounts(stream: TextIO) -> Iterator[Dict]:
+    """Yield the account blocks of a YAML audit file one at a time.
+
+    Each account is built in full, including its extra fields (e.g. floor
+    ranges) and its list of audits.
+
+    Args:
+        stream: Open YAML file
+
+    Yields:
+        Dict: Account blocks
+    """
+    reader = _YamlEventReader(stream)
+    for event in _iter_account_events(reader):
+        yield reader.value(event)
+
+
+def _iter_account_events(reader: _YamlEventReader) -> Iterator[yaml.Event]:
+    """Yield the first event of each item of the root 'accounts' sequence.
+
+    The caller must consume the rest of the item before resuming.
+    """
+    event = reader.next()
+    while not isinstance(event, yaml.MappingStartEvent):
+        if isinstance(event, yaml.StreamEndEvent):
+            return
+        event = reader.next()
+
+    event = reader.next()
+    while not isinstance(event, yaml.MappingEndEvent):
+        key = reader.value(event)
+        event = reader.next()
+        if key != 'accounts' or not isinstance(event, yaml.SequenceStartEvent):
+            reader.skip(event)
+            event = reader.next()
+            continue
+
+        event = reader.next()
+        while not isinstance(event, yaml.SequenceEndEvent):
+            yield event
+            event = reader.next()
+        event = reader.next()
+
+
+def _iter_yaml_account(reader: _YamlEventReader,
+                       event: yaml.Event) -> Iterator[Tuple[Any, Optional[Dict]]]:
+    """Yield the audits of one account mapping from the YAML event stream."""
+    if not isinstance(event, yaml.MappingStartEvent):
+        raise ValueError("Each account must be a mapping with 'id' and 'audits'")
+
+    account_id = None
+    has_id = False
+    pending = []
+    audit_count = 0
+
+    event = reader.next()
+    while not isinstance(event, yaml.MappingEndEvent):
+        key = reader.value(event)
+        event = reader.next()
+        if key == 'id':
+            account_id = reader.value(event)
+            has_id = True
+            for audit in pending:
+                yield account_id, audit
+            pending = []
+        elif key == 'audits' and isinstance(event, yaml.SequenceStartEvent):
+            event = reader.next()
+            while not isinstance(event, yaml.SequenceEndEvent):
+                audit = reader.value(event)
+                audit_count += 1
+                if has_id:
+                    yield account_id, audit
+                else:
+                    pending.append(audit)
+                event = reader.next()
+        else:
+            reader.skip(event)
+        event = reader.next()
+
+    if not has_id:
+        raise ValueError("Account is missing its 'id'")
+    if audit_count == 0:
+        yield account_id, None
@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+Rendering Module for Audit Wizard
+Structured report model and the renderers that turn it into text, JSON,
+CSV and compact columnar binary reports
+"""
+
+import csv
+import io
+import json
+import math
+import os
+import struct
+import sys
+from array import array
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from aggregator import AccountStats, AuditAggregator
+from stats import DistributionStats
+
+# Number of floors listed in the text report
+TOP_FLOOR_LIMIT = 10
+
+# Columnar binary layout: magic, then version and table count as bytes
+COLUMNAR_MAGIC = b"AUDR"
+COLUMNAR_VERSION = 1
+
+_NAN = float('nan')
+
+
+class ReportModel:
+    """Everything a report shows, computed once from an aggregate.
+
+    Renderers only format these values, so one aggregation can be written
+    in several formats.
+    """
+
+    def __init__(self, aggregate: AuditAggregator, sort_accounts: bool = True,
+                 distribution: Optional[DistributionStats] = None):
+        """Build the report model.
+
+        Args:
+            aggregate: Aggregated audit statistics
+            sort_accounts: List accounts sorted by ID instead of in input order
+            distribution: Optional gap and score distribution statistics
+        """
+        self.total_accounts = len(aggregate.accounts)
+        self.total_audits = aggregate.total_audits
+        self.missing_scores = aggregate.missing_scores
+        self.audits_by_year: List[Tuple[int, int]] = sorted(aggregate.audits_by_year.items())
+        # Most visited first, ties in first-seen order
+        self.floor_visits: List[Tuple[Any, int]] = sorted(aggregate.floor_counts.items(),
+                                                          key=lambda x: x[1], reverse=True)
+        accounts = list(aggregate.accounts.values())
+        if sort_accounts:
+            accounts.sort(key=lambda x: x.id)
+        self.accounts: List[AccountStats] = accounts
+        self.distribution = distribution
+
+    @property
+    def top_floors(self) -> List[Tuple[Any, int]]:
+        """The most frequently visited floors shown in the text report."""
+        return self.floor_visits[:TOP_FLOOR_LIMIT]
+
+
+def _percent(count: int, total: int) -> str:
+    """Format count as a percentage of total with one decimal."""
+    return f"{count / total * 100:.1f}%" if total else "0.0%"
+
+
+def render_text(model: ReportModel) -> str:
+    """Render the fixed-width text report.
+
+    Args:
+        model: Report model
+
+    Returns:
+        str: Report text
+    """
+    total_audits = model.total_audits
+
+    report = []
+    report.append("=" * 60)
+    report.append("AUDIT RECORDS REPORT")
+    report.append("=" * 60)
+    report.append("")
+
+    report.append(f"Total Accounts: {model.total_accounts}")
+    report.append(f"Total Audits: {total_audits}")
+    report.append(f"Audits Missing Scores: {model.missing_scores} "
+                  f"({_percent(model.missing_scores, total_audits)} of all audits)")
+    report.append("")
+
+    # Audits by year
+    report.append("AUDITS BY YEAR")
+    report.append("-" * 60)
+    for year, count in model.audits_by_year:
+        report.append(f"{year}: {count} audits ({_percent(count, total_audits)})")
+    report.append("")
+
+    # Most frequently visited floors
+    report.append(f"TOP {TOP_FLOOR_LIMIT} MOST FREQUENTLY VISITED FLOORS")
+    report.append("-" * 60)
+    for floor, count in model.top_floors:
+        report.append(f"Floor {floor}: {count} visits ({_percent(count, total_audits)})")
+    report.append("")
+
+    # Distribution of gaps and scores
+    distribution = model.distribution
+    if distribution is not None:
+        report.append("DISTRIBUTION")
+        report.append("-" * 60)
+        if distribution.gap_count:
+            report.append(f"Days Between Audits: median {distribution.gap_median:.1f}, "
+                          f"p90 {distribution.gap_p90:.1f} ({distribution.gap_count} gaps)")
+        else:
+            report.append("Days Between Audits: N/A")
+        if distribution.score_count:
+            percentiles = ", ".join(f"p{q} {value:.1f}" for q, value in distribution.score_percentiles.items())
+            report.append(f"Scores: mean {distribution.score_mean:.1f}, "
+                          f"stddev {distribution.score_stddev:.1f}, {percentiles} "
+                          f"({distribution.score_count} scored audits)")
+        else:
+            report.append("Scores: N/A")
+        report.append("")
+
+    # Account summary
+    report.append("ACCOUNT SUMMARY")
+    report.append("-" * 60)
+    for summary in model.accounts:
+        report.append(f"Account: {summary.id}")
+        report.append(f"  Audit Count: {summary.audit_count}")
+        report.append(f"  First Audit: {summary.first_audit}")
+        report.append(f"  Last Audit: {summary.last_audit}")
+        report.append(f"  Missing Scores: {summary.missing_scores} "
+                      f"({_percent(summary.missing_scores, summary.audit_count)})")
+        if summary.avg_days_between != 'N/A':
+            report.append(f"  Avg. Days Between Audits: {summary.avg_days_between:.1f}")
+        else:
+            report.append(f"  Avg. Days Between Audits: {summary.avg_days_between}")
+        report.append("")
+
+    return "\n".join(report)
+
+
+def _json_value(value: Any) -> Any:
+    """Keep JSON-native account IDs and floors as they are, and format anything else as in the text report."""
+    if value is None or type(value) in (str, int, bool) or (type(value) is float and math.isfinite(value)):
+        return value
+    return f"{value}"
+
+
+def _optional_date(formatted: str) -> Optional[str]:
+    return None if formatted == 'N/A' else formatted
+
+
+def _optional_number(value: Any) -> Optional[float]:
+    return None if value == 'N/A' else value
+
+
+def _distribution_fields(distribution: DistributionStats) -> Dict[str, Any]:
+    """Get the distribution statistics as flat named values (None where there is no data)."""
+    fields = {
+        'gap_count': distribution.gap_count,
+        'gap_median': distribution.gap_median,
+        'gap_p90': distribution.gap_p90,
+        'score_count': distribution.score_count,
+        'score_mean': distribution.score_mean,
+        'score_stddev': distribution.score_stddev
+    }
+    for q, value in distribution.score_percentiles.items():
+        fields[f'score_p{q}'] = value
+    return fields
+
+
+def _account_fields(summary: AccountStats) -> Dict[str, Any]:
+    """Get the values of one account's row."""
+    return {
+        'id': _json_value(summary.id),
+        'audit_count': summary.audit_count,
+        'missing_scores': summary.missing_scores,
+        'first_audit': _optional_date(summary.first_audit),
+        'last_audit': _optional_date(summary.last_audit),
+        'avg_days_between': _optional_number(summary.avg_days_between)
+    }
+
+
+def render_json(model: ReportModel) -> str:
+    """Render the report as a JSON document.
+
+    Every floor is listed, most visited first. Missing dates and averages
+    are null.
+
+    Args:
+        model: Report model
+
+    Returns:
+        str: JSON text
+    """
+    report = {
+        'total_accounts': model.total_accounts,
+        'total_audits': model.total_audits,
+        'missing_scores': model.missing_scores,
+        'audits_by_year': [{'year': year, 'audits': count} for year, count in model.audits_by_year],
+        'floors': [{'floor': _json_value(floor), 'visits': count} for floor, count in model.floor_visits],
+        'distribution': _distribution_fields(model.distribution) if model.distribution is not None else None,
+        'accounts': [_account_fields(summary) for summary in model.accounts]
+    }
+    return json.dumps(report, indent=2) + "\n"
+
+
+def render_csv(model: ReportModel) -> str:
+    """Render the report as one CSV table in long format.
+
+    Each row is one value: table ('summary', 'year', 'floor', 'account' or
+    'distribution'), key (year, floor or account ID; empty for single
+    values), field and value. Missing values are empty.
+
+    Args:
+        model: Report model
+
+    Returns:
+        str: CSV text
+    """
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator="\n")
+    writer.writerow(["table", "key", "field", "value"])
+
+    def cell(value: Any) -> Any:
+        return "" if value is None else value
+
+    writer.writerow(["summary", "", "total_accounts", model.total_accounts])
+    writer.writerow(["summary", "", "total_audits", model.total_audits])
+    writer.writerow(["summary", "", "missing_scores", model.missing_scores])
+    for year, count in model.audits_by_year:
+        writer.writerow(["year", year, "audits", count])
+    for floor, count in model.floor_visits:
+        writer.writerow(["floor", f"{floor}", "visits", count])
+    if model.distribution is not None:
+        for field, value in _distribution_fields(model.distribution).items():
+            writer.writerow(["distribution", "", field, cell(value)])
+    for summary in model.accounts:
+        fields = _account_fields(summary)
+        key = f"{summary.id}"
+        for field in ('audit_count', 'missing_scores', 'first_audit', 'last_audit', 'avg_days_between'):
+            writer.writerow(["account", key, field, cell(fields[field])])
+    return output.getvalue()
+
+
+# A column of the columnar format: (name, type code, values); type code 'q'
+# is int64, 'd' float64 (NaN for missing values) and 's' UTF-8 strings
+Column = Tuple[str, str, Sequence[Any]]
+
+
+def _columnar_tables(model: ReportModel) -> List[Tuple[str, List[Column]]]:
+    """Lay out the report model as named tables of typed columns."""
+    tables = [
+        ("summary", [("total_accounts", "q", [model.total_accounts]),
+                     ("total_audits", "q", [model.total_audits]),
+                     ("missing_scores", "q", [model.missing_scores])]),
+        ("years", [("year", "q", [year for year, _ in model.audits_by_year]),
+                   ("audits", "q", [count for _, count in model.audits_by_year])]),
+        ("floors", [("floor", "s", [f"{floor}" for floor, _ in model.floor_visits]),
+                    ("visits", "q", [count for _, count in model.floor_visits])]),
+        ("accounts", [("id", "s", [f"{summary.id}" for summary in model.accounts]),
+                      ("audit_count", "q", [summary.audit_count for summary in model.accounts]),
+                      ("missing_scores", "q", [summary.missing_scores for summary in model.accounts]),
+                      ("first_audit", "s", [_optional_date(summary.first_audit) or ""
+                                            for summary in model.accounts]),
+                      ("last_audit", "s", [_optional_date(summary.last_audit) or ""
+                                           for summary in model.accounts]),
+                      ("avg_days_between", "d", [_NAN if summary.avg_days_between == 'N/A'
+                                                 else summary.avg_days_between
+                                                 for summary in model.accounts])])
+    ]
+    if model.distribution is not None:
+        fields = _distribution_fields(model.distribution)
+        tables.append(("distribution", [(field, "d", [_NAN if value is None else float(value)])
+                                        for field, value in fields.items()]))
+    return tables
+
+
+def _pack_name(name: str) -> bytes:
+    encoded = name.encode('utf-8')
+    return struct.pack("<H", len(encoded)) + encoded
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values.tobytes()
+
+
+def render_columnar(model: ReportModel) -> bytes:
+    """Render the report tables in a compact columnar binary format.
+
+    Layout (little-endian): the magic b"AUDR", a version byte and a table
+    count byte, then for each table its name, a uint32 row count, a column
+    count byte and its columns. Each column has a name, a type code byte
+    and its values: int64 ('q') or float64 ('d', NaN for missing) values,
+    or for strings ('s') row count + 1 int64 offsets followed by the UTF-8
+    data. Names are a uint16 length and UTF-8 bytes. read_columnar decodes
+    the format.
+
+    Args:
+        model: Report model
+
+    Returns:
+        bytes: Encoded tables
+    """
+    tables = _columnar_tables(model)
+    parts = [COLUMNAR_MAGIC, struct.pack("<BB", COLUMNAR_VERSION, len(tables))]
+    for name, columns in tables:
+        row_count = len(columns[0][2])
+        parts.append(_pack_name(name))
+        parts.append(struct.pack("<IB", row_count, len(columns)))
+        for column_name, type_code, values in columns:
+            parts.append(_pack_name(column_name))
+            parts.append(type_code.encode('ascii'))
+            if type_code == "s":
+                encoded = [value.encode('utf-8') for value in values]
+                offsets = array('q', [0])
+                for value in encoded:
+                    offsets.append(offsets[-1] + len(value))
+                parts.append(_little_endian(offsets))
+                parts.append(b"".join(encoded))
+            else:
+                parts.append(_little_endian(array(type_code, values)))
+    return b"".join(parts)
+
+
+def read_columnar(data: bytes) -> Dict[str, Dict[str, List[Any]]]:
+    """Decode a report written by render_columnar.
+
+    Args:
+        data: Encoded tables
+
+    Returns:
+        Dict[str, Dict[str, List[Any]]]: Columns by name, per table name
+
+    Raises:
+        ValueError: If the data is not a columnar report of a known version
+    """
+    if data[:4] != COLUMNAR_MAGIC:
+        raise ValueError("Not a columnar audit report")
+    version, table_count = struct.unpack_from("<BB", data, 4)
+    if version != COLUMNAR_VERSION:
+        raise ValueError(f"Unsupported columnar report version: {version}")
+    position = 6
+
+    def read_name() -> str:
+        nonlocal position
+        (length,) = struct.unpack_from("<H", data, position)
+        position += 2 + length
+        return data[position - length:position].decode('utf-8')
+
+    def read_array(type_code: str, count: int) -> array:
+        nonlocal position
+        values = array(type_code)
+        size = values.itemsize * count
+        values.frombytes(data[position:position + size])
+        if sys.byteorder == 'big':
+            values.byteswap()
+        position += size
+        return values
+
+    tables = {}
+    for _ in range(table_count):
+        name = read_name()
+        row_count, column_count = struct.unpack_from("<IB", data, position)
+        position += 5
+        columns = {}
+        for _ in range(column_count):
+            column_name = read_name()
+            type_code = chr(data[position])
+            position += 1
+            if type_code == "s":
+                offsets = read_array('q', row_count + 1)
+                text = data[position:position + offsets[-1]]
+                position += offsets[-1]
+                columns[column_name] = [text[start:end].decode('utf-8') for start, end in zip(offsets, offsets[1:])]
+            elif type_code in ("q", "d"):
+                columns[column_name] = read_array(type_code, row_count).tolist()
+            else:
+                raise ValueError(f"Unknown column type: {type_code}")
+        tables[name] = columns
+    return tables
+
+
+# Renderers by report format, and the file extension of each format
+RENDERERS: Dict[str, Callable[[ReportModel], Union[str, bytes]]] = {
+    "text": render_text,
+    "json": render_json,
+    "csv": render_csv,
+    "columnar": render_columnar,
+}
+REPORT_EXTENSIONS = {"text": ".txt", "json": ".json", "csv": ".csv", "columnar": ".audr"}
+REPORT_FORMATS = tuple(RENDERERS)
+
+
+def report_output_paths(output_path: str, formats: Sequence[str]) -> List[Tuple[str, str]]:
+    """Get the file each report format is written to.
+
+    A single format is written to output_path itself; with several, each
+    one replaces the extension of output_path with its own.
+
+    Args:
+        output_path: Requested output path
+        formats: Report formats
+
+    Returns:
+        List[Tuple[str, str]]: (format, path) pairs
+    """
+    if len(formats) == 1:
+        return [(formats[0], output_path)]
+    base = os.path.splitext(output_path)[0]
+    return [(format_name, base + REPORT_EXTENSIONS[format_name]) for format_name in formats]
@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+"""
+Report Cache Module for Audit Wizard
+Persisted per-account partial aggregates, keyed by a content hash of each
+account's block of the input file, so reports only re-aggregate what changed
+"""
+
+import hashlib
+import io
+import json
+import os
+import re
+from abc import ABC, abstractmethod
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from aggregator import AccountStats, AuditAggregator, AuditRecord, iter_json_records, iter_yaml_audit_records
+from readers import is_yaml_path, iter_json_audits, iter_json_lines, iter_yaml_audits
+
+# Bumped whenever the block hashes, the partial format or the aggregation change, invalidating old caches
+REPORT_CACHE_VERSION = 2
+
+# Number of bytes of the input file scanned for blocks at a time
+SCAN_CHUNK_SIZE = 1 << 20
+
+# How yaml.dump writes {'accounts': [...]}: entries start with '-' at column 0. The
+# line patterns match from the newline before a line, which is much faster than ^
+_YAML_HEADER = b"accounts:\n"
+_YAML_ENTRY_START = re.compile(rb"\n-(?=[ \n]|\Z)")
+_YAML_OTHER_LINE = re.compile(rb"\n(?:[^ \n-]|-[^ \n])")
+
+# How the converter writes JSON arrays (json.dump with indent=2) and JSON Lines, account first
+_JSON_ARRAY_START = b"[\n"
+_JSON_RECORD_START = re.compile(rb"\n  \{\n")
+_JSON_ARRAY_ACCOUNT = b'  {\n    "account": '
+_JSON_LINE_ACCOUNT = b'{"account": '
+
+_decoder = json.JSONDecoder()
+
+# A block of the input file: (kind, start offset, end offset, content hash); kind decides how it is read
+Block = Tuple[str, int, int, str]
+
+
+class ReportCache:
+    """Cache of partial report aggregates for the blocks of an audit file.
+
+    A block is one account entry of a YAML file, or one run of consecutive
+    records of the same account in a JSON or JSON Lines file. Partials are
+    merged in file order, which gives exactly the aggregate of a full pass.
+    Files in a layout that cannot be split (see scan_blocks) are cached as
+    a single block.
+
+    The file is hashed block by block as it is read, and only the blocks
+    missing from the cache are read back, one at a time, so memory use
+    depends on the largest block rather than on the file size.
+    """
+
+    def __init__(self, path: str):
+        """Initialize the cache.
+
+        Args:
+            path: Path to the cache file
+        """
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def path_for(input_path: str) -> str:
+        """Get the cache path used for an input file.
+
+        Args:
+            input_path: Path of the audit file the report is generated from
+
+        Returns:
+            str: Path of the cache file
+        """
+        return f"{input_path}.report-cache"
+
+    def load(self) -> Dict[str, Any]:
+        """Read the cached partials, ignoring a missing, unreadable or outdated cache.
+
+        Returns:
+            Dict[str, Any]: Partials keyed by block hash
+        """
+        try:
+            with open(self.path, 'r') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get('version') != REPORT_CACHE_VERSION:
+            return {}
+        return data.get('blocks') or {}
+
+    def save(self, partials: Dict[str, Any]):
+        """Replace the cache file with the given partials.
+
+        Args:
+            partials: Partials keyed by block hash
+        """
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w') as file:
+            json.dump({'version': REPORT_CACHE_VERSION, 'blocks': partials}, file, separators=(',', ':'))
+        os.replace(temp_path, self.path)
+
+    def aggregate_file(self, input_path: str) -> Optional[AuditAggregator]:
+        """Aggregate an audit file, reusing the partials of unchanged blocks.
+
+        Only the cache entries of the file's current blocks are kept.
+
+        Args:
+            input_path: Path to a YAML, JSON or JSON Lines audit file
+
+        Returns:
+            Optional[AuditAggregator]: The aggregate, or None if a changed
+            block could not be read; the caller should then read the whole
+            file, which reports the error where it is
+        """
+        cached = self.load()
+        partials = {}
+        aggregate = AuditAggregator()
+        self.hits = self.misses = 0
+
+        with open(input_path, 'rb') as file:
+            for kind, start, end, key in scan_blocks(file, is_yaml_path(input_path)):
+                partial = partials.get(key) or cached.get(key)
+                if partial is not None:
+                    self.hits += 1
+                    aggregate.merge(load_partial(partial))
+                else:
+                    self.misses += 1
+                    try:
+                        block_aggregate = _aggregate_block(file, input_path, kind, start, end)
+                    except Exception:
+                        self.hits = self.misses = 0
+                        return None
+                    partial = dump_partial(block_aggregate)
+                    aggregate.merge(block_aggregate)
+                if partial is not None:
+                    partials[key] = partial
+
+        if self.misses or len(partials) != len(cached):
+            self.save(partials)
+        return aggregate
+
+
+def _aggregate_block(file: BinaryIO, input_path: str, kind: str, start: int, end: int) -> AuditAggregator:
+    """Aggregate one block, reading the whole file as a stream for a whole-file block."""
+    if kind in _FILE_READERS:
+        with open(input_path, 'r') as text_file:
+            return AuditAggregator().add_records(_FILE_READERS[kind](text_file))
+    file.seek(start)
+    return AuditAggregator().add_records(_BLOCK_READERS[kind](file.read(end - start).decode('utf-8')))
+
+
+def dump_partial(aggregate: AuditAggregator) -> Optional[List[Any]]:
+    """Encode an aggregate as JSON-compatible values.
+
+    Args:
+        aggregate: Aggregate of one block
+
+    Returns:
+        Optional[List[Any]]: The encoded aggregate, or None if it holds
+        values (e.g. YAML dates as floors) that would not decode to the same
+        values
+    """
+    partial = [
+        aggregate.total_audits,
+        aggregate.missing_scores,
+        [[year, count] for year, count in aggregate.audits_by_year.items()],
+        [[floor, count] for floor, count in aggregate.floor_counts.items()],
+        [[stats.id, stats.audit_count, stats.missing_scores, stats.dated_count, stats.first_day, stats.last_day]
+         for stats in aggregate.accounts.values()]
+    ]
+    try:
+        if json.loads(json.dumps(partial, allow_nan=False)) != partial:
+            return None
+    except (TypeError, ValueError):
+        return None
+    if any(not _json_exact(value) for value, _ in partial[3]) or any(
+            not _json_exact(stats[0]) for stats in partial[4]):
+        return None
+    return partial
+
+
+def _json_exact(value: Any) -> bool:
+    """Check whether a floor or account ID decodes from JSON as the same type."""
+    return value is None or type(value) in (str, int, float, bool)
+
+
+def load_partial(partial: List[Any]) -> AuditAggregator:
+    """Decode an aggregate encoded by dump_partial.
+
+    Args:
+        partial: Encoded aggregate
+
+    Returns:
+        AuditAggregator: The aggregate
+    """
+    total_audits, missing_scores, years, floors, accounts = partial
+    aggregate = AuditAggregator()
+    aggregate.total_audits = total_audits
+    aggregate.missing_scores = missing_scores
+    aggregate.audits_by_year = dict(years)
+    aggregate.floor_counts = dict(floors)
+    for account_id, audit_count, missing, dated_count, first_day, last_day in accounts:
+        stats = aggregate.accounts[account_id] = AccountStats(account_id)
+        stats.audit_count = audit_count
+        stats.missing_scores = missing
+        stats.dated_count = dated_count
+        stats.first_day = first_day
+        stats.last_day = last_day
+    return aggregate
+
+
+def scan_blocks(file: BinaryIO, yaml_format: bool, chunk_size: int = SCAN_CHUNK_SIZE) -> List[Block]:
+    """Split an audit file into blocks that aggregate independently, hashing them as it is read.
+
+    Only the layouts the wizard writes are split: YAML as yaml.dump writes
+    {'accounts': [...]}, a JSON array as json.dump writes it with indent=2,
+    and JSON Lines, each record starting with its account. Any other file,
+    or a file with '\\r' line ends, is one block.
+
+    Args:
+        file: Audit file opened in binary mode
+        yaml_format: True for a YAML file, False for JSON or JSON Lines
+        chunk_size: Number of bytes read at a time
+
+    Returns:
+        List[Block]: Blocks in file order
+    """
+    whole_kind = "yaml-file" if yaml_format else "json-file"
+    whole = _block_hash(whole_kind)
+    splitter = _YamlSplitter() if yaml_format else _JsonSplitter()
+    pending = b""
+    base = 0
+    while True:
+        chunk = file.read(chunk_size)
+        whole.update(chunk)
+        if splitter is None:
+            if not chunk:
+                break
+            continue
+
+        # The splitters get whole lines, and keep back what they cannot split yet
+        final = not chunk
+        data = pending + chunk
+        cut = len(data) if final else data.rfind(b"\n") + 1
+        try:
+            used = splitter.feed(data[:cut], base, final)
+            blocks = splitter.finish(base + len(data)) if final else None
+        except ValueError:
+            splitter = None
+            pending = b""
+            continue
+        if final:
+            return blocks
+        pending = data[used:]
+        base += used
+
+    return [(whole_kind, 0, file.tell(), whole.hexdigest())]
+
+
+def _block_hash(kind: str) -> Any:
+    """Start the hash of a block of the given kind."""
+    return hashlib.blake2b(f"{kind}\0".encode(), digest_size=16)
+
+
+class _BlockSplitter(ABC):
+    """Finds the blocks of a file in consecutive pieces of it, hashing them on the way."""
+
+    def __init__(self):
+        self.blocks: List[Block] = []
+        self._kind = ""
+        self._start = 0
+        self._hash = None
+
+    @abstractmethod
+    def feed(self, data: bytes, base: int, final: bool) -> int:
+        """Split the next piece of the file.
+
+        Args:
+            data: Whole lines of the file, or the rest of it when final
+            base: File offset of data[0]
+            final: True for the last piece
+
+        Returns:
+            int: Number of bytes used; the rest comes again at the start of
+            the next piece
+
+        Raises:
+            ValueError: If the file is not in the layout the splitter handles
+        """
+
+    def finish(self, end: int) -> List[Block]:
+        """End the last block at the end of the file and return all blocks."""
+        self._close(end)
+        if not self.blocks:
+            raise ValueError("No records to split")
+        return self.blocks
+
+    def _split(self, kind: str, position: int):
+        """End the current block, if any, and start a new one at a file offset."""
+        self._close(position)
+        self._kind = kind
+        self._start = position
+        self._hash = _block_hash(kind)
+
+    def _close(self, position: int):
+        if self._hash is not None:
+            self.blocks.append((self._kind, self._start, position, self._hash.hexdigest()))
+            self._hash = None
+
+    def _update(self, data: bytes, start: int, stop: int):
+        if self._hash is not None and stop > start:
+            self._hash.update(memoryview(data)[start:stop])
+
+
+class _YamlSplitter(_BlockSplitter):
+    """Splits a YAML file written as 'accounts:' and its entries at column 0.
+
+    Any other line at column 0 (another key, a comment or a document
+    marker) rejects the file, so the entries are all there is to it.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._header = True
+
+    def feed(self, data: bytes, base: int, final: bool) -> int:
+        if b"\r" in data:
+            raise ValueError("Line ends with '\\r' are not split")
+        position = 0
+        if self._header:
+            if not data and not final:
+                return 0
+            if not data.startswith(_YAML_HEADER):
+                raise ValueError("Expected 'accounts:' on the first line")
+            position = len(_YAML_HEADER)
+            self._header = False
+        # Index i of the text is offset position + i - 1 of the data
+        text = b"\n" + data[position:]
+        if _YAML_OTHER_LINE.search(text):
+            raise ValueError("Only account entries may start at column 0")
+
+        start = position
+        for match in _YAML_ENTRY_START.finditer(text):
+            entry = position + match.start()
+            if self._hash is None and data[start:entry].strip():
+                raise ValueError("Expected an account entry after 'accounts:'")
+            self._update(data, start, entry)
+            self._split("yaml", base + entry)
+            start = entry
+        if self._hash is None and data[start:].strip():
+            raise ValueError("Expected an account entry after 'accounts:'")
+        self._update(data, start, len(data))
+        return len(data)
+
+
+class _JsonSplitter(_BlockSplitter):
+    """Splits a JSON array or JSON Lines file into runs of consecutive records of the same account.
+
+    The first character tells the two apart. The last array record seen is
+    kept back until the next one starts, so it is read whole.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._array: Optional[bool] = None
+        self._opened = False
+        self._account: Any = None
+
+    def feed(self, data: bytes, base: int, final: bool) -> int:
+        if b"\r" in data:
+            raise ValueError("Line ends with '\\r' are not split")
+        if self._array is None:
+            if not data:
+                return 0
+            self._array = data.startswith(b"[")
+        if self._array:
+            return self._feed_array(data, base, final)
+        return self._feed_lines(data, base)
+
+    def _feed_lines(self, data: bytes, base: int) -> int:
+        start = 0
+        position = 0
+        for line in data.split(b"\n"):
+            if line.strip():
+                if not line.startswith(_JSON_LINE_ACCOUNT):
+                    raise ValueError("Expected the account first in each record")
+                account_id = _decoder.raw_decode(line.decode('utf-8'), len(_JSON_LINE_ACCOUNT))[0]
+                if self._hash is None or account_id != self._account:
+                    self._update(data, start, position)
+                    self._split("jsonl", base + position)
+                    start = position
+                self._account = account_id
+            position += len(line) + 1
+        self._update(data, start, len(data))
+        return len(data)
+
+    def _feed_array(self, data: bytes, base: int, final: bool) -> int:
+        position = 0
+        if not self._opened:
+            if len(data) < len(_JSON_ARRAY_START) and not final:
+                return 0
+            if not data.startswith(_JSON_ARRAY_START):
+                raise ValueError("Expected '[' on a line of its own")
+            position = len(_JSON_ARRAY_START)
+            self._opened = True
+
+        starts = [position + match.start() for match in _JSON_RECORD_START.finditer(b"\n" + data[position:])]
+        if self._hash is None:
+            first = starts[0] if starts else len(data)
+            if first != position or (final and not starts):
+                raise ValueError("Expected the first record after '['")
+            if not starts:
+                return position
+
+        bounds = starts + [len(data)] if final else starts
+        run_start = bounds[0] if bounds else 0
+        for start, stop in zip(bounds, bounds[1:]):
+            if not data.startswith(_JSON_ARRAY_ACCOUNT, start):
+                raise ValueError("Expected the account first in each record")
+            value_start = start + len(_JSON_ARRAY_ACCOUNT)
+            line_end = data.find(b"\n", value_start, stop)
+            # The raw text is compared; the same account written another way only starts a new run
+            account_id = data[value_start:line_end if line_end >= 0 else stop]
+            if self._hash is None or account_id != self._account:
+                self._update(data, run_start, start)
+                self._split("json", base + start)
+                run_start = start
+                self._account = account_id
+        self._update(data, run_start, bounds[-1] if bounds else 0)
+
+        if final:
+            if not data.rstrip().endswith(b"\n]"):
+                raise ValueError("Expected ']' on a line of its own after the last record")
+            return len(data)
+        return starts[-1] if starts else position
+
+
+def _json_array_body(block: str) -> str:
+    """Turn a run of JSON array items (with its ',' or closing ']') into an array of its own."""
+    body = block.rstrip()
+    if body.endswith("]"):
+        body = body[:-1].rstrip()
+    elif body.endswith(","):
+        body = body[:-1]
+    else:
+        raise ValueError("Expected ',' or ']' after JSON array items")
+    return "[" + body + "]"
+
+
+def _json_array_records(block: str) -> Iterator[AuditRecord]:
+    return iter_json_records(json.loads(_json_array_body(block)))
+
+
+def _yaml_file_records(file: TextIO) -> Iterator[AuditRecord]:
+    return iter_yaml_audit_records(iter_yaml_audits(file))
+
+
+def _json_file_records(file: TextIO) -> Iterator[AuditRecord]:
+    return iter_json_records(iter_json_audits(file))
+
+
+_BLOCK_READERS: Dict[str, Callable[[str], Iterator[AuditRecord]]] = {
+    "yaml": lambda block: _yaml_file_records(io.StringIO("accounts:\n" + block)),
+    "jsonl": lambda block: iter_json_records(iter_json_lines(io.StringIO(block))),
+    "json": _json_array_records,
+}
+
+# Readers of the files that are one block, streamed from the file
+_FILE_READERS: Dict[str, Callable[[TextIO], Iterator[AuditRecord]]] = {
+    "yaml-file": _yaml_file_records,
+    "json-file": _json_file_records,
+}
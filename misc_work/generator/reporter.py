@@ -4,26 +4,37 @@ Report Module for Audit Wizard
 Generates statistics and summaries from audit data
 """
 
-import json
-import yaml
-from datetime import datetime
-from typing import Dict, List, Any, Union, Tuple
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Optional, Sequence, Union
+
+from aggregator import AuditAggregator, iter_json_records, iter_yaml_audit_records, iter_yaml_records
+from metrics import Metrics
+from profiler import profile_phase
+from readers import is_yaml_path, iter_json_audits, iter_yaml_audits
+from renderers import RENDERERS, ReportModel, render_text, report_output_paths
+from report_cache import ReportCache
+from stats import DistributionStats, compute_table_stats
+from table import AuditTable
 
 
 class AuditReporter:
     """Reporter for generating statistics and summaries from audit data."""
 
     @staticmethod
-    def generate_report(data: Union[Dict, List], format_type: str = None) -> str:
+    def generate_report(data: Union[Dict, List, AuditTable], format_type: str = None) -> str:
         """Generate a comprehensive report from audit data.
         
         Args:
-            data: Audit data in either YAML or JSON format
+            data: Audit data in either YAML or JSON format, or an audit table
             format_type: Optional format type hint ('yaml' or 'json')
             
         Returns:
             str: Formatted report text
         """
+        if isinstance(data, AuditTable):
+            return AuditReporter._generate_table_report(data, format_type or data.source)
+        
         # Determine format based on data structure if not specified
         if format_type is None:
             if isinstance(data, dict) and 'accounts' in data:
@@ -49,106 +60,9 @@ class AuditReporter:
         Returns:
             str: Formatted report text
         """
-        report = []
-        report.append("=" * 60)
-        report.append("AUDIT RECORDS REPORT")
-        report.append("=" * 60)
-        report.append("")
-        
-        total_audits = 0
-        missing_scores = 0
-        accounts_summary = []
-        floor_data = {}
-        audits_by_year = {}
-        
-        for account in data['accounts']:
-            account_id = account['id']
-            audits = account['audits']
-            total_audits += len(audits)
-            
-            # Count audits with missing scores
-            account_missing_scores = sum(1 for audit in audits if audit.get('score') is None)
-            missing_scores += account_missing_scores
-            
-            # Collect audit dates and analyze them
-            audit_dates = []
-            for audit in audits:
-                date_str = audit['date']
-                date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-                audit_dates.append(date_obj)
-                
-                # Track audits by year
-                year = date_obj.year
-                if year not in audits_by_year:
-                    audits_by_year[year] = 0
-                audits_by_year[year] += 1
-                
-                # Track floor visit frequency
-                for floor in audit.get('visited_floors', []):
-                    if floor not in floor_data:
-                        floor_data[floor] = 0
-                    floor_data[floor] += 1
-            
-            first_date = min(audit_dates).strftime("%Y-%m-%d") if audit_dates else 'N/A'
-            last_date = max(audit_dates).strftime("%Y-%m-%d") if audit_dates else 'N/A'
-            
-            # Calculate average time between audits
-            if len(audit_dates) > 1:
-                sorted_dates = sorted(audit_dates)
-                time_diffs = [(sorted_dates[i+1] - sorted_dates[i]).days 
-                              for i in range(len(sorted_dates)-1)]
-                avg_days_between = sum(time_diffs) / len(time_diffs)
-            else:
-                avg_days_between = 'N/A'
-            
-            accounts_summary.append({
-                'id': account_id,
-                'audit_count': len(audits),
-                'first_audit': first_date,
-                'last_audit': last_date,
-                'missing_scores': account_missing_scores,
-                'avg_days_between': avg_days_between
-            })
-        
-        # Generate the report text
-        report.append(f"Total Accounts: {len(data['accounts'])}")
-        report.append(f"Total Audits: {total_audits}")
-        report.append(f"Audits Missing Scores: {missing_scores} ({missing_scores/total_audits*100:.1f}% of all audits)")
-        report.append("")
-        
-        # Audits by year
-        report.append("AUDITS BY YEAR")
-        report.append("-" * 60)
-        for year in sorted(audits_by_year.keys()):
-            report.append(f"{year}: {audits_by_year[year]} audits " +
-                         f"({audits_by_year[year]/total_audits*100:.1f}%)")
-        report.append("")
-        
-        # Most frequently visited floors
-        report.append("TOP 10 MOST FREQUENTLY VISITED FLOORS")
-        report.append("-" * 60)
-        top_floors = sorted(floor_data.items(), key=lambda x: x[1], reverse=True)[:10]
-        for floor, count in top_floors:
-            report.append(f"Floor {floor}: {count} visits ({count/total_audits*100:.1f}%)")
-        report.append("")
-        
-        # Account summary
-        report.append("ACCOUNT SUMMARY")
-        report.append("-" * 60)
-        for summary in accounts_summary:
-            report.append(f"Account: {summary['id']}")
-            report.append(f"  Audit Count: {summary['audit_count']}")
-            report.append(f"  First Audit: {summary['first_audit']}")
-            report.append(f"  Last Audit: {summary['last_audit']}")
-            report.append(f"  Missing Scores: {summary['missing_scores']} " +
-                         f"({summary['missing_scores']/summary['audit_count']*100:.1f}%)")
-            if summary['avg_days_between'] != 'N/A':
-                report.append(f"  Avg. Days Between Audits: {summary['avg_days_between']:.1f}")
-            else:
-                report.append(f"  Avg. Days Between Audits: {summary['avg_days_between']}")
-            report.append("")
-        
-        return "\n".join(report)
+        aggregate = AuditAggregator().add_records(iter_yaml_records(data))
+        # Accounts are listed in file order
+        return AuditReporter.render_text_report(aggregate, sort_accounts=False)
 
     @staticmethod
     def _generate_json_report(data: List[Dict]) -> str:
@@ -160,133 +74,47 @@ class AuditReporter:
         Returns:
             str: Formatted report text
         """
-        report = []
-        report.append("=" * 60)
-        report.append("AUDIT RECORDS REPORT")
-        report.append("=" * 60)
-        report.append("")
-        
-        total_audits = len(data)
-        missing_scores = sum(1 for audit in data if audit.get('score') is None)
-        
-        # Group by account
-        accounts = {}
-        floor_data = {}
-        audits_by_year = {}
+        aggregate = AuditAggregator().add_records(iter_json_records(data))
+        return AuditReporter.render_text_report(aggregate, sort_accounts=True)
+
+    @staticmethod
+    def _generate_table_report(table: AuditTable, format_type: str, distribution: bool = False,
+                               backend: str = 'auto') -> str:
+        """Generate a report from an audit table.
         
-        for audit in data:
-            account_id = audit.get('account', 'unknown')
-            if account_id not in accounts:
-                accounts[account_id] = []
-            accounts[account_id].append(audit)
-            
-            # Parse date
-            date_str = audit.get('date', '')
-            if date_str.endswith('Z'):
-                date_obj = datetime.fromisoformat(date_str[:-1])
-            else:
-                try:
-                    date_obj = datetime.fromisoformat(date_str)
-                except ValueError:
-                    continue  # Skip if date can't be parsed
-            
-            # Track audits by year
-            year = date_obj.year
-            if year not in audits_by_year:
-                audits_by_year[year] = 0
-            audits_by_year[year] += 1
+        Args:
+            table: Audit table
+            format_type: 'yaml' to list accounts in table order, 'json' to sort them
+            distribution: Include gap and score distribution statistics
+            backend: Statistics backend ('auto', 'numpy' or 'python')
             
-            # Track floor visit frequency
-            try:
-                floors = json.loads(audit.get('visited_floors', '[]'))
-                if isinstance(floors, list):
-                    for floor in floors:
-                        if floor not in floor_data:
-                            floor_data[floor] = 0
-                        floor_data[floor] += 1
-            except (json.JSONDecodeError, TypeError):
-                pass  # Skip if visited_floors can't be parsed
+        Returns:
+            str: Formatted report text
+        """
+        return render_text(AuditReporter._table_report_model(table, format_type, distribution, backend))
+
+    @staticmethod
+    def _table_report_model(table: AuditTable, format_type: str, distribution: bool = False,
+                            backend: str = 'auto') -> ReportModel:
+        """Compute the report model of an audit table (see _generate_table_report)."""
+        stats = compute_table_stats(table, backend)
+        return ReportModel(stats.aggregate, sort_accounts=format_type != 'yaml',
+                           distribution=stats.distribution if distribution else None)
+
+    @staticmethod
+    def render_text_report(aggregate: AuditAggregator, sort_accounts: bool = True,
+                           distribution: Optional[DistributionStats] = None) -> str:
+        """Render aggregated audit statistics as the text report.
         
-        # Process account summaries
-        accounts_summary = []
-        for account_id, audits in accounts.items():
-            # Extract and parse dates
-            audit_dates = []
-            for audit in audits:
-                date_str = audit.get('date', '')
-                if date_str.endswith('Z'):
-                    date_obj = datetime.fromisoformat(date_str[:-1])
-                    audit_dates.append(date_obj)
-                else:
-                    try:
-                        date_obj = datetime.fromisoformat(date_str)
-                        audit_dates.append(date_obj)
-                    except ValueError:
-                        continue  # Skip if date can't be parsed
-            
-            first_date = min(audit_dates).strftime("%Y-%m-%d") if audit_dates else 'N/A'
-            last_date = max(audit_dates).strftime("%Y-%m-%d") if audit_dates else 'N/A'
-            
-            # Calculate average time between audits
-            if len(audit_dates) > 1:
-                sorted_dates = sorted(audit_dates)
-                time_diffs = [(sorted_dates[i+1] - sorted_dates[i]).days 
-                              for i in range(len(sorted_dates)-1)]
-                avg_days_between = sum(time_diffs) / len(time_diffs)
-            else:
-                avg_days_between = 'N/A'
+        Args:
+            aggregate: Aggregated audit statistics
+            sort_accounts: List accounts sorted by ID instead of in input order
+            distribution: Optional gap and score distribution statistics to include
             
-            accounts_summary.append({
-                'id': account_id,
-                'audit_count': len(audits),
-                'first_audit': first_date,
-                'last_audit': last_date,
-                'missing_scores': sum(1 for audit in audits if audit.get('score') is None),
-                'avg_days_between': avg_days_between
-            })
-        
-        # Generate the report text
-        report.append(f"Total Accounts: {len(accounts)}")
-        report.append(f"Total Audits: {total_audits}")
-        report.append(f"Audits Missing Scores: {missing_scores} ({missing_scores/total_audits*100:.1f}% of all audits)")
-        report.append("")
-        
-        # Audits by year
-        report.append("AUDITS BY YEAR")
-        report.append("-" * 60)
-        for year in sorted(audits_by_year.keys()):
-            report.append(f"{year}: {audits_by_year[year]} audits " +
-                         f"({audits_by_year[year]/total_audits*100:.1f}%)")
-        report.append("")
-        
-        # Most frequently visited floors
-        report.append("TOP 10 MOST FREQUENTLY VISITED FLOORS")
-        report.append("-" * 60)
-        top_floors = sorted(floor_data.items(), key=lambda x: x[1], reverse=True)[:10]
-        for floor, count in top_floors:
-            report.append(f"Floor {floor}: {count} visits ({count/total_audits*100:.1f}%)")
-        report.append("")
-        
-        # Account summary
-        report.append("ACCOUNT SUMMARY")
-        report.append("-" * 60)
-        for summary in sorted(accounts_summary, key=lambda x: x['id']):
-            report.append(f"Account: {summary['id']}")
-            report.append(f"  Audit Count: {summary['audit_count']}")
-            report.append(f"  First Audit: {summary['first_audit']}")
-            report.append(f"  Last Audit: {summary['last_audit']}")
-            if summary['audit_count'] > 0:
-                report.append(f"  Missing Scores: {summary['missing_scores']} " +
-                             f"({summary['missing_scores']/summary['audit_count']*100:.1f}%)")
-            else:
-                report.append(f"  Missing Scores: {summary['missing_scores']} (0.0%)")
-            if summary['avg_days_between'] != 'N/A':
-                report.append(f"  Avg. Days Between Audits: {summary['avg_days_between']:.1f}")
-            else:
-                report.append(f"  Avg. Days Between Audits: {summary['avg_days_between']}")
-            report.append("")
-        
-        return "\n".join(report)
+        Returns:
+            str: Formatted report text
+        """
+        return render_text(ReportModel(aggregate, sort_accounts, distribution))
 
     @staticmethod
     def save_report_to_file(report: str, output_path: str) -> bool:
@@ -308,32 +136,166 @@ class AuditReporter:
             return False
 
     @staticmethod
-    def generate_report_from_file(input_path: str, output_path: str) -> bool:
+    def save_report(model: ReportModel, output_path: str, formats: Sequence[str] = ("text",)) -> bool:
+        """Render a report in one or more formats and save each one.
+        
+        Args:
+            model: Report model
+            output_path: Path to output file; with several formats, each
+                format replaces its extension (see report_output_paths)
+            formats: Report formats ('text', 'json', 'csv' or 'columnar')
+            
+        Returns:
+            bool: True if every report was saved
+        """
+        for format_name, path in report_output_paths(output_path, formats):
+            report = RENDERERS[format_name](model)
+            if isinstance(report, bytes):
+                try:
+                    with open(path, 'wb') as file:
+                        file.write(report)
+                except Exception as e:
+                    print(f"Error saving report: {str(e)}")
+                    return False
+            elif not AuditReporter.save_report_to_file(report, path):
+                return False
+        return True
+
+    @staticmethod
+    def aggregate_file(input_path: str, cache: Optional[ReportCache] = None) -> AuditAggregator:
+        """Stream the audits of a file through the aggregator.
+        
+        Args:
+            input_path: Path to a YAML, JSON or JSON Lines file
+            cache: Optional cache of per-account partial aggregates
+            
+        Returns:
+            AuditAggregator: Aggregate of the file's audits
+        """
+        if cache is not None:
+            aggregate = cache.aggregate_file(input_path)
+            if aggregate is not None:
+                return aggregate
+        
+        with open(input_path, 'r') as file:
+            if is_yaml_path(input_path):
+                records = iter_yaml_audit_records(iter_yaml_audits(file))
+            else:
+                records = iter_json_records(iter_json_audits(file))
+            return AuditAggregator().add_records(records)
+
+    @staticmethod
+    def generate_report_from_file(input_path: str, output_path: str, distribution: bool = False,
+                                  backend: Optional[str] = None, cache: Optional[ReportCache] = None,
+                                  formats: Sequence[str] = ("text",), metrics: Optional[Metrics] = None) -> bool:
         """Generate a report from a file and save it to another file.
         
+        By default the file is streamed through the aggregator. With a
+        cache, only the accounts whose part of the file changed since the
+        last run are aggregated again. With distribution statistics or an
+        explicit statistics backend, the file is loaded into an AuditTable
+        instead and the cache is not used.
+        
         Args:
-            input_path: Path to input YAML or JSON file
+            input_path: Path to input YAML, JSON or JSON Lines file
             output_path: Path to output report file
+            distribution: Include gap and score distribution statistics
+            backend: Statistics backend ('auto', 'numpy' or 'python')
+            cache: Optional cache of per-account partial aggregates
+            formats: Report formats to write from the one aggregation (see save_report)
+            metrics: Optional metrics receiving the number of reported audits
+                (phase 'report') and the file sizes
             
         Returns:
             bool: True if report generation was successful
         """
         try:
-            # Determine file type and read data
-            if input_path.endswith(('.yml', '.yaml')):
-                with open(input_path, 'r') as file:
-                    data = yaml.safe_load(file)
-                format_type = 'yaml'
-            else:
-                with open(input_path, 'r') as file:
-                    data = json.load(file)
-                format_type = 'json'
-            
-            # Generate report
-            report = AuditReporter.generate_report(data, format_type)
+            with profile_phase('aggregate'):
+                if distribution or backend is not None:
+                    table = AuditTable.from_file(input_path)
+                    model = AuditReporter._table_report_model(table, table.source, distribution, backend or 'auto')
+                    count = len(table)
+                else:
+                    aggregate = AuditReporter.aggregate_file(input_path, cache)
+                    # Accounts are listed in file order for YAML
+                    model = ReportModel(aggregate, sort_accounts=not is_yaml_path(input_path))
+                    count = aggregate.total_audits
             
-            # Save report to file
-            return AuditReporter.save_report_to_file(report, output_path)
+            with profile_phase('render'):
+                if not AuditReporter.save_report(model, output_path, formats):
+                    return False
+            if metrics:
+                AuditReporter._record_report_metrics(metrics, count, [input_path], output_path, formats)
+            return True
         except Exception as e:
             print(f"Error generating report from file: {str(e)}")
-            return False
\ No newline at end of file
+            return False
+
+    @staticmethod
+    def generate_report_from_files(input_paths: List[str], output_path: str, workers: Optional[int] = None,
+                                   use_cache: bool = False, formats: Sequence[str] = ("text",),
+                                   metrics: Optional[Metrics] = None) -> bool:
+        """Generate one report from several audit files, e.g. per-year or per-region shards.
+        
+        Each file is aggregated in a worker process, and the partial
+        aggregates are merged in input order, so the report is the same as
+        for one file holding all the audits. Accounts are listed in file
+        order if every input is YAML, and sorted by ID otherwise.
+        
+        Args:
+            input_paths: Paths to YAML, JSON or JSON Lines files
+            output_path: Path to output report file
+            workers: Number of worker processes (default: one per CPU, at most one per file)
+            use_cache: Keep a report cache next to each input file (see ReportCache)
+            formats: Report formats to write (see save_report)
+            metrics: Optional metrics receiving the number of reported audits
+                (phase 'report') and the file sizes
+            
+        Returns:
+            bool: True if report generation was successful
+        """
+        workers = max(1, min(workers or os.cpu_count() or 1, len(input_paths)))
+        aggregate = AuditAggregator()
+        input_path = None
+        try:
+            with profile_phase('aggregate'):
+                if workers == 1:
+                    for input_path in input_paths:
+                        aggregate.merge(_aggregate_shard(input_path, use_cache))
+                else:
+                    with ProcessPoolExecutor(max_workers=workers) as executor:
+                        futures = [executor.submit(_aggregate_shard, path, use_cache) for path in input_paths]
+                        try:
+                            for input_path, future in zip(input_paths, futures):
+                                aggregate.merge(future.result())
+                        except BaseException:
+                            executor.shutdown(cancel_futures=True)
+                            raise
+            
+            sort_accounts = not all(is_yaml_path(path) for path in input_paths)
+            with profile_phase('render'):
+                if not AuditReporter.save_report(ReportModel(aggregate, sort_accounts), output_path, formats):
+                    return False
+            if metrics:
+                AuditReporter._record_report_metrics(metrics, aggregate.total_audits, input_paths,
+                                                     output_path, formats)
+            return True
+        except Exception as e:
+            print(f"Error generating report from {input_path}: {str(e)}")
+            return False
+
+    @staticmethod
+    def _record_report_metrics(metrics: Metrics, count: int, input_paths: List[str], output_path: str,
+                               formats: Sequence[str]):
+        """Count the reported audits and the sizes of the input and report files."""
+        metrics.add_records('report', count)
+        for input_path in input_paths:
+            metrics.read_file(input_path)
+        for _, path in report_output_paths(output_path, formats):
+            metrics.wrote_file(path)
+
+
+def _aggregate_shard(input_path: str, use_cache: bool) -> AuditAggregator:
+    """Aggregate one input file of a multi-file report in a worker process."""
+    cache = ReportCache(ReportCache.path_for(input_path)) if use_cache else None
+    return AuditReporter.aggregate_file(input_path, cache)
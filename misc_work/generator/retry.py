@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Retry Module for Audit Wizard
+Retry policy with exponential backoff and a shared token-bucket rate limiter
+for PocketBase requests
+"""
+
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Set
+
+# Statuses that are worth retrying: rate limited, or the server is temporarily unavailable
+DEFAULT_RETRY_STATUSES = {429, 502, 503, 504}
+
+# HTTP methods that can be safely re-sent after a connection error
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "PATCH", "DELETE"}
+
+# Statuses meaning the request was refused without being processed, so even
+# non-idempotent requests can be re-sent
+UNPROCESSED_STATUSES = {429, 503}
+
+
+class RetryPolicy:
+    """Decides whether and when to retry a failed request."""
+
+    def __init__(self, max_retries: int = 5, backoff_factor: float = 0.5,
+                 max_backoff: float = 30.0, retry_statuses: Optional[Set[int]] = None,
+                 status_max_retries: Optional[Dict[int, int]] = None, jitter: bool = True):
+        """Initialize the retry policy.
+
+        Args:
+            max_retries: Maximum number of retries per request
+            backoff_factor: Base delay in seconds; attempt n waits up to
+                backoff_factor * 2 ** n seconds
+            max_backoff: Upper bound for a single delay in seconds
+            retry_statuses: HTTP statuses to retry (default: 429, 502, 503, 504)
+            status_max_retries: Per-status overrides of max_retries
+            jitter: Randomize delays ("full jitter") so concurrent workers
+                do not retry in lockstep
+        """
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.retry_statuses = set(DEFAULT_RETRY_STATUSES if retry_statuses is None else retry_statuses)
+        self.status_max_retries = status_max_retries or {}
+        self.jitter = jitter
+
+    def should_retry_status(self, method: str, status_code: int, retries: int) -> bool:
+        """Check whether a response status should be retried.
+
+        Non-idempotent requests (e.g. POST creates) are only retried on 429
+        and 503. A 502 or 504 comes from a proxy that may have passed the
+        request on, so the server may already have processed it.
+
+        Args:
+            method: HTTP method of the request
+            status_code: HTTP status of the response
+            retries: Number of retries already made for this request
+
+        Returns:
+            bool: True if the request should be sent again
+        """
+        if status_code not in self.retry_statuses:
+            return False
+        if method.upper() not in IDEMPOTENT_METHODS and status_code not in UNPROCESSED_STATUSES:
+            return False
+        return retries < self.status_max_retries.get(status_code, self.max_retries)
+
+    def should_retry_error(self, method: str, connect_error: bool, retries: int) -> bool:
+        """Check whether a request that raised a connection error should be retried.
+
+        Non-idempotent requests (e.g. POST creates) are only retried when the
+        connection was never established, since otherwise the server may
+        already have processed them.
+
+        Args:
+            method: HTTP method of the request
+            connect_error: True if the connection could not be established at all
+            retries: Number of retries already made for this request
+
+        Returns:
+            bool: True if the request should be sent again
+        """
+        if retries >= self.max_retries:
+            return False
+        return connect_error or method.upper() in IDEMPOTENT_METHODS
+
+    def backoff(self, retries: int, retry_after: Optional[float] = None) -> float:
+        """Get the delay before the next attempt.
+
+        Args:
+            retries: Number of retries already made for this request
+            retry_after: Delay requested by the server, if any
+
+        Returns:
+            float: Delay in seconds
+        """
+        if retry_after is not None:
+            return min(max(retry_after, 0.0), self.max_backoff)
+
+        delay = min(self.backoff_factor * (2 ** retries), self.max_backoff)
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+    @staticmethod
+    def parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """Parse a Retry-After header given in seconds or as an HTTP date.
+
+        Args:
+            value: Header value
+
+        Returns:
+            Optional[float]: Delay in seconds, or None if missing or invalid
+        """
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return (retry_at - datetime.now(timezone.utc)).total_seconds()
+
+
+class RateLimiter:
+    """Thread-safe token-bucket rate limiter shared by all workers of a client."""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        """Initialize the rate limiter.
+
+        Args:
+            rate: Sustained number of requests per second
+            burst: Maximum number of requests sent back to back (default: rate, at least 1)
+        """
+        self.rate = rate
+        self.capacity = max(1, burst if burst is not None else int(rate))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now >= self._paused_until:
+                    self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+                else:
+                    wait = self._paused_until - now
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Hold back every worker, e.g. after the server answered 429 with Retry-After.
+
+        Args:
+            seconds: How long to stop sending requests
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._paused_until = max(self._paused_until, now + seconds)
+            # Start refilling from empty once the pause ends
+            self._tokens = 0.0
+            self._updated = self._paused_until
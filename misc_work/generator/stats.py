@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Statistics Module for Audit Wizard
+Report statistics over an audit table, vectorized with NumPy when it is installed
+"""
+
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from aggregator import AuditAggregator, iter_json_records
+from table import NO_DAY, AuditTable
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the pure-Python backend is used without it
+    np = None
+
+HAVE_NUMPY = np is not None
+
+# Score percentiles included in the distribution statistics
+SCORE_PERCENTILES = (25, 50, 75, 90)
+
+# Day ordinal of 1970-01-01, the epoch of NumPy's datetime64
+_EPOCH_ORDINAL = 719163
+
+# Largest floor value range counted with bincount; wider ranges use unique
+_MAX_BINCOUNT_SPAN = 1 << 16
+
+
+def percentile(sorted_values: Sequence, q: float) -> Optional[float]:
+    """Get a percentile of sorted values, interpolating linearly between ranks.
+
+    This is the default method of numpy.percentile. Both backends use this
+    function, so they return identical values.
+
+    Args:
+        sorted_values: Values in ascending order
+        q: Percentile between 0 and 100
+
+    Returns:
+        Optional[float]: The percentile, or None if there are no values
+    """
+    count = len(sorted_values)
+    if count == 0:
+        return None
+    position = (count - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, count - 1)
+    low = float(sorted_values[lower])
+    high = float(sorted_values[upper])
+    return low + (high - low) * (position - lower)
+
+
+class DistributionStats:
+    """Distribution of the days between audits and of the audit scores."""
+
+    def __init__(self, sorted_gaps: Sequence[int], sorted_scores: Sequence[int],
+                 score_sum: int, score_sum_of_squares: int):
+        """Compute the distribution statistics.
+
+        Args:
+            sorted_gaps: Days between consecutive audits of each account, ascending
+            sorted_scores: Integer scores, ascending
+            score_sum: Sum of the scores
+            score_sum_of_squares: Sum of the squared scores
+        """
+        self.gap_count = len(sorted_gaps)
+        self.gap_median = percentile(sorted_gaps, 50)
+        self.gap_p90 = percentile(sorted_gaps, 90)
+
+        count = len(sorted_scores)
+        self.score_count = count
+        self.score_mean = score_sum / count if count else None
+        # Population standard deviation from exact integer sums
+        self.score_stddev = (math.sqrt((count * score_sum_of_squares - score_sum * score_sum) / (count * count))
+                             if count else None)
+        self.score_percentiles: Dict[int, Optional[float]] = {
+            q: percentile(sorted_scores, q) for q in SCORE_PERCENTILES
+        }
+
+
+class TableStatistics:
+    """Report statistics of an audit table."""
+
+    def __init__(self, aggregate: AuditAggregator, distribution: DistributionStats, backend: str):
+        """Initialize the statistics.
+
+        Args:
+            aggregate: Aggregated audit statistics, as used by the text report
+            distribution: Gap and score distribution statistics
+            backend: Backend that computed them ('python' or 'numpy')
+        """
+        self.aggregate = aggregate
+        self.distribution = distribution
+        self.backend = backend
+
+
+def compute_table_stats(table: AuditTable, backend: str = 'auto') -> TableStatistics:
+    """Compute report statistics of an audit table.
+
+    Both backends return identical results.
+
+    Args:
+        table: Audit table
+        backend: 'numpy' or 'auto' to vectorize with NumPy if it is installed,
+            'python' for the pure-Python backend
+
+    Returns:
+        TableStatistics: The statistics
+    """
+    if backend in ('auto', 'numpy') and HAVE_NUMPY:
+        return _numpy_table_stats(table)
+    if backend not in ('auto', 'numpy', 'python'):
+        raise ValueError(f"Unknown statistics backend: {backend}")
+    return _python_table_stats(table)
+
+
+def _python_table_stats(table: AuditTable) -> TableStatistics:
+    """Compute table statistics with interpreted loops over the normalized records."""
+    aggregate = AuditAggregator()
+    days_by_account: Dict[Any, List[int]] = {}
+    for account_id, day, floors, missing_score in table.iter_records():
+        if missing_score is None:
+            aggregate.add_account(account_id)
+            continue
+        aggregate.add(account_id, day, floors, missing_score)
+        if day is not None:
+            days_by_account.setdefault(account_id, []).append(day)
+
+    gaps = []
+    for days in days_by_account.values():
+        days.sort()
+        gaps.extend(later - earlier for earlier, later in zip(days, days[1:]))
+    gaps.sort()
+
+    scores = sorted(int(score) for score in table.scores if score == score)
+    distribution = DistributionStats(gaps, scores, sum(scores), sum(score * score for score in scores))
+    return TableStatistics(aggregate, distribution, 'python')
+
+
+def _numpy_table_stats(table: AuditTable) -> TableStatistics:
+    """Compute table statistics with NumPy array operations.
+
+    Rows whose values are not fully stored in the columns (see
+    AuditTable.irregular_rows) are normalized in Python and merged in, and
+    accounts and floors are ordered by first appearance as the
+    pure-Python aggregator orders them.
+    """
+    row_count = len(table)
+    accounts = np.frombuffer(table.accounts, dtype=np.intc) if row_count else np.zeros(0, dtype=np.intc)
+    days = np.frombuffer(table.days, dtype=np.intc) if row_count else np.zeros(0, dtype=np.intc)
+    scores = np.frombuffer(table.scores, dtype=np.float64) if row_count else np.zeros(0)
+    offsets = np.frombuffer(table.floor_offsets, dtype=np.int64)
+    floor_values = (np.frombuffer(table.floor_values, dtype=np.intc) if len(table.floor_values)
+                    else np.zeros(0, dtype=np.intc))
+
+    irregular = table.irregular_rows()
+    regular = np.ones(row_count, dtype=bool)
+    regular[irregular] = False
+    regular_rows = np.flatnonzero(regular)
+    codes = accounts[regular]
+
+    slow_records = [(row, record) for row in irregular
+                    for record in iter_json_records([table.json_audit(row)])]
+
+    # Order accounts by first appearance: (row, 0), or (-1, code) when registered up front
+    first_seen: Dict[Any, Tuple[int, int]] = {}
+    if table.source == 'yaml':
+        for code, account_id in enumerate(table.account_ids):
+            first_seen.setdefault(account_id, (-1, code))
+    unique_codes, first_index = np.unique(codes, return_index=True)
+    seen = [(table.account_ids[code], row)
+            for code, row in zip(unique_codes.tolist(), regular_rows[first_index].tolist())]
+    seen.extend((record[0], row) for row, record in slow_records)
+    for account_id, row in seen:
+        if account_id not in first_seen or (row, 0) < first_seen[account_id]:
+            first_seen[account_id] = (row, 0)
+    account_order = sorted(first_seen, key=first_seen.get)
+    index_of = {account_id: index for index, account_id in enumerate(account_order)}
+    code_index = np.array([index_of.get(account_id, -1) for account_id in table.account_ids], dtype=np.int64)
+
+    # Per-audit columns over regular and irregular rows alike
+    audit_accounts = np.concatenate([code_index[codes] if codes.size else np.zeros(0, dtype=np.int64),
+                                     np.array([index_of[record[0]] for _, record in slow_records],
+                                              dtype=np.int64)])
+    audit_days = np.concatenate([days[regular].astype(np.int64),
+                                 np.array([record[1] if record[1] is not None else NO_DAY
+                                           for _, record in slow_records], dtype=np.int64)])
+    audit_rows = np.concatenate([regular_rows, np.array([row for row, _ in slow_records], dtype=np.int64)])
+    audit_missing = np.concatenate([np.isnan(scores[regular]),
+                                    np.array([record[3] for _, record in slow_records], dtype=bool)])
+
+    account_count = len(account_order)
+    audit_counts = np.bincount(audit_accounts, minlength=account_count).tolist()
+    missing_counts = np.bincount(audit_accounts[audit_missing], minlength=account_count).tolist()
+
+    # Sort dated audits by account, then day; gaps are the differences within an account
+    dated = audit_days != NO_DAY
+    dated_accounts = audit_accounts[dated]
+    dated_days = audit_days[dated]
+    order = np.lexsort((dated_days, dated_accounts))
+    sorted_accounts = dated_accounts[order]
+    sorted_days = dated_days[order]
+    dated_counts = np.bincount(sorted_accounts, minlength=account_count).tolist()
+    same_account = sorted_accounts[1:] == sorted_accounts[:-1]
+    gaps = np.diff(sorted_days)[same_account]
+    gaps.sort()
+
+    # Each account's audits form one run in the sorted order
+    first_days: Dict[int, int] = {}
+    last_days: Dict[int, int] = {}
+    if sorted_days.size:
+        group_starts = np.flatnonzero(np.concatenate([[True], ~same_account]))
+        group_ends = np.append(group_starts[1:], sorted_days.size) - 1
+        first_days = dict(zip(sorted_accounts[group_starts].tolist(), sorted_days[group_starts].tolist()))
+        last_days = dict(zip(sorted_accounts[group_ends].tolist(), sorted_days[group_ends].tolist()))
+
+    aggregate = AuditAggregator()
+    aggregate.total_audits = int(audit_accounts.size)
+    aggregate.missing_scores = int(audit_missing.sum())
+
+    # Count audits per year, keyed in order of first appearance
+    years = (dated_days - _EPOCH_ORDINAL).astype('datetime64[D]').astype('datetime64[Y]').astype(np.int64) + 1970
+    if years.size:
+        unique_years, year_index = np.unique(years, return_inverse=True)
+        year_counts = np.bincount(year_index)
+        first_rows = np.full(unique_years.size, row_count, dtype=np.int64)
+        np.minimum.at(first_rows, year_index, audit_rows[dated])
+        for position in np.argsort(first_rows, kind='stable').tolist():
+            aggregate.audits_by_year[int(unique_years[position])] = int(year_counts[position])
+
+    aggregate.floor_counts = _numpy_floor_counts(table, offsets, floor_values, regular, days, slow_records)
+
+    for index, account_id in enumerate(account_order):
+        stats = aggregate.add_account(account_id)
+        stats.audit_count = audit_counts[index]
+        stats.missing_scores = missing_counts[index]
+        stats.dated_count = dated_counts[index]
+        stats.first_day = first_days.get(index)
+        stats.last_day = last_days.get(index)
+
+    score_values = np.sort(scores[~np.isnan(scores)]).astype(np.int64)
+    if score_values.size and int(np.abs(score_values).max()) ** 2 * score_values.size < 2 ** 63:
+        score_sum = int(score_values.sum())
+        score_sum_of_squares = int((score_values * score_values).sum())
+    else:
+        score_list = score_values.tolist()
+        score_sum = sum(score_list)
+        score_sum_of_squares = sum(score * score for score in score_list)
+    distribution = DistributionStats(gaps, score_values, score_sum, score_sum_of_squares)
+    return TableStatistics(aggregate, distribution, 'numpy')
+
+
+def _numpy_floor_counts(table: AuditTable, offsets, floor_values, regular, days,
+                        slow_records: List[Tuple[int, Any]]) -> Dict[Any, int]:
+    """Count visited floors, keyed in order of first appearance.
+
+    As in the JSON report, floors of audits without a known date are not counted.
+    """
+    lengths = np.diff(offsets)
+    floor_rows = np.repeat(np.arange(len(table), dtype=np.int64), lengths)
+    keep = regular[floor_rows] & (days[floor_rows] != NO_DAY) if floor_rows.size else np.zeros(0, dtype=bool)
+    values = floor_values[keep].astype(np.int64)
+    positions = np.flatnonzero(keep)
+
+    # (row, position in row, floor, count) for the first appearance of each floor
+    entries = []
+    if values.size:
+        unique_floors, first_index = np.unique(values, return_index=True)
+        low = int(unique_floors[0])
+        if int(unique_floors[-1]) - low < _MAX_BINCOUNT_SPAN:
+            counts = np.bincount(values - low)[unique_floors - low]
+        else:
+            counts = np.unique(values, return_counts=True)[1]
+        first_rows = floor_rows[positions[first_index]]
+        first_positions = positions[first_index] - offsets[first_rows]
+        entries.extend(zip(first_rows.tolist(), first_positions.tolist(),
+                           unique_floors.tolist(), counts.tolist()))
+    for row, record in slow_records:
+        entries.extend((row, position, floor, 1) for position, floor in enumerate(record[2]))
+    entries.sort(key=lambda entry: (entry[0], entry[1]))
+
+    floor_counts: Dict[Any, int] = {}
+    for _, _, floor, count in entries:
+        floor_counts[floor] = floor_counts.get(floor, 0) + count
+    return floor_counts
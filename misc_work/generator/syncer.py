@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Sync Module for Audit Wizard
+Computes and applies the minimal set of writes to bring PocketBase in line
+with a local audit file
+"""
+
+import hashlib
+import json
+import logging
+from typing import Dict, List, Optional, Any, Tuple
+
+from pocketbase_client import PocketBaseClient, DEFAULT_PAGE_SIZE
+
+# Audit fields compared between the local file and PocketBase
+SYNC_FIELDS = ["account", "date", "status", "note", "visited_floors", "score"]
+
+logger = logging.getLogger(__name__)
+
+
+class SyncPlan:
+    """The writes needed to bring a collection in line with a local audit list."""
+
+    def __init__(self, audits: List[Dict[str, Any]]):
+        """Initialize an empty sync plan.
+
+        Args:
+            audits: Local audit records the plan was computed for
+        """
+        self.audits = audits
+        # Indexes into audits of records that do not exist on the server yet
+        self.creates: List[int] = []
+        # (index into audits, server record ID, changed fields) for modified records
+        self.updates: List[Tuple[int, str, Dict[str, Any]]] = []
+        # Server record IDs with no local counterpart
+        self.deletes: List[str] = []
+        # Local index -> server record ID for every matched record
+        self.matched_ids: Dict[int, str] = {}
+        self.unchanged = 0
+
+    def summary(self) -> str:
+        """Get a one-line summary of the plan."""
+        return (f"{len(self.creates)} to create, {len(self.updates)} to update, "
+                f"{len(self.deletes)} to delete, {self.unchanged} unchanged")
+
+
+class AuditSyncer:
+    """Diff-based sync of audit records into a PocketBase collection."""
+
+    def __init__(self, client: PocketBaseClient, collection: str):
+        """Initialize the syncer.
+
+        Args:
+            client: Authenticated PocketBase client
+            collection: Audit collection name
+        """
+        self.client = client
+        self.collection = collection
+        # Number of writes that failed in the last apply()
+        self.failed = 0
+
+    @staticmethod
+    def normalize_audit(audit: Dict[str, Any]) -> Dict[str, Any]:
+        """Normalize an audit (local JSON format or PocketBase record) for comparison.
+
+        Dates are reduced to YYYY-MM-DD, visited_floors to a list, and a
+        missing score to 0, since PocketBase stores an empty number field as 0.
+
+        Args:
+            audit: Audit record
+
+        Returns:
+            Dict[str, Any]: Normalized values of the synced fields
+        """
+        visited_floors = audit.get('visited_floors')
+        if isinstance(visited_floors, str):
+            try:
+                visited_floors = json.loads(visited_floors)
+            except json.JSONDecodeError:
+                pass
+
+        return {
+            'account': audit.get('account'),
+            'date': (audit.get('date') or '')[:10],
+            'status': audit.get('status') or 'completed',
+            'note': audit.get('note') or '',
+            'visited_floors': visited_floors or [],
+            'score': audit.get('score') or 0
+        }
+
+    @staticmethod
+    def content_hash(normalized: Dict[str, Any]) -> str:
+        """Get a stable hash of a normalized audit.
+
+        Args:
+            normalized: Audit as returned by normalize_audit
+
+        Returns:
+            str: Hex digest of the audit content
+        """
+        payload = json.dumps(normalized, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def fetch_server_state(self, page_size: int = DEFAULT_PAGE_SIZE) -> Dict[str, Dict[str, Any]]:
+        """Fetch the normalized content of every record in the collection.
+
+        Records are paged in ID order, so records written while the pages
+        are fetched cannot shift later pages and be skipped or repeated.
+
+        Args:
+            page_size: Number of records fetched per request
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Normalized audits keyed by record ID
+        """
+        server_state = {}
+        for record in self.client.iter_records(self.collection, sort="id", fields=["id"] + SYNC_FIELDS,
+                                               page_size=page_size):
+            server_state[record['id']] = self.normalize_audit(record)
+        return server_state
+
+    def plan(self, audits: List[Dict[str, Any]], server_state: Dict[str, Dict[str, Any]],
+             delete_missing: bool = False) -> SyncPlan:
+        """Compute the creates, updates and deletes needed for a local audit list.
+
+        Local audits are matched to server records by ID when they have one
+        that still exists, and otherwise by (account, date).
+
+        Args:
+            audits: Local audit records in JSON format
+            server_state: Normalized server records keyed by ID
+            delete_missing: Plan deletes for server records absent locally
+
+        Returns:
+            SyncPlan: The computed plan
+        """
+        plan = SyncPlan(audits)
+
+        by_key = {}
+        for record_id, normalized in server_state.items():
+            key = (normalized['account'], normalized['date'])
+            by_key.setdefault(key, []).append(record_id)
+
+        # First match by ID so keyed matching cannot claim those records
+        local = [self.normalize_audit(audit) for audit in audits]
+        for index, audit in enumerate(audits):
+            if audit.get('id') in server_state:
+                plan.matched_ids[index] = audit['id']
+        claimed = set(plan.matched_ids.values())
+
+        for index, normalized in enumerate(local):
+            record_id = plan.matched_ids.get(index)
+            if record_id is None:
+                candidates = by_key.get((normalized['account'], normalized['date']), [])
+                while candidates and candidates[0] in claimed:
+                    candidates.pop(0)
+                if not candidates:
+                    plan.creates.append(index)
+                    continue
+                record_id = candidates.pop(0)
+                claimed.add(record_id)
+                plan.matched_ids[index] = record_id
+
+            server = server_state[record_id]
+            if self.content_hash(normalized) == self.content_hash(server):
+                plan.unchanged += 1
+                continue
+
+            changes = {field: audits[index].get(field) for field in SYNC_FIELDS
+                       if normalized[field] != server[field]}
+            plan.updates.append((index, record_id, changes))
+
+        if delete_missing:
+            plan.deletes = [record_id for record_id in server_state if record_id not in claimed]
+
+        return plan
+
+    def apply(self, plan: SyncPlan, concurrency: int = 1,
+              batch_size: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Apply a sync plan to the server.
+
+        The number of creates, updates and deletes that failed is left in
+        self.failed.
+
+        Args:
+            plan: Plan returned by plan()
+            concurrency: Maximum number of concurrent requests
+            batch_size: Number of writes per /api/batch call, or None for
+                single requests
+
+        Returns:
+            List[Dict[str, Any]]: Local audits with the IDs of their server records
+        """
+        results = []
+        for index, audit in enumerate(plan.audits):
+            audit = audit.copy()
+            if index in plan.matched_ids:
+                audit['id'] = plan.matched_ids[index]
+            else:
+                audit.pop('id', None)
+            results.append(audit)
+
+        self.failed = 0
+        if plan.creates:
+            created = self.client.batch_import_audits(self.collection,
+                                                      [results[i] for i in plan.creates],
+                                                      concurrency=concurrency, batch_size=batch_size)
+            for index, audit in zip(plan.creates, created):
+                results[index] = audit
+            self._report("Created", sum(1 for audit in created if audit.get('id')), len(plan.creates),
+                         "new records")
+
+        if plan.updates:
+            patches = [dict(changes, id=record_id) for _, record_id, changes in plan.updates]
+            updated = []
+            self.client.batch_update_audits(self.collection, patches,
+                                            concurrency=concurrency, batch_size=batch_size,
+                                            on_success=lambda index, audit: updated.append(index))
+            self._report("Updated", len(updated), len(plan.updates), "changed records")
+
+        if plan.deletes:
+            deleted = self.client.batch_delete_records(self.collection, plan.deletes,
+                                                       concurrency=concurrency, batch_size=batch_size)
+            self._report("Deleted", sum(deleted), len(plan.deletes), "records missing from the input")
+
+        return results
+
+    def _report(self, action: str, done: int, total: int, what: str):
+        """Log how many writes of one kind succeeded and count the failures."""
+        self.failed += total - done
+        level = logging.WARNING if done < total else logging.INFO
+        logger.log(level, "%s %d of %d %s", action, done, total, what)
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Synthetic Data Module for Audit Wizard
+Deterministic generator of realistic audit files for tests and benchmarks
+"""
+
+import random
+from datetime import date
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from converter import AuditConverter
+
+# Seed of the default dataset
+SYNTHETIC_SEED = 0
+
+# Last day of the generated dates, fixed so a dataset does not depend on when it is generated
+SYNTHETIC_END_DATE = date(2025, 12, 31)
+
+# Characters of PocketBase record IDs
+_ID_LETTERS = "abcdefghijklmnopqrstuvwxyz"
+_ID_ALPHABET = _ID_LETTERS + "0123456789"
+
+# Audit statuses and their cumulative probabilities
+AUDIT_STATUSES = (("completed", 0.70), ("pending", 0.82), ("scheduled", 0.92), ("canceled", 1.0))
+
+# Notes of the few audits that have one
+AUDIT_NOTES = ("Stairwell door blocked", "Access badge missing", "Floor under renovation",
+               "Tenant asked to reschedule", "Fire extinguisher expired", "Follow-up needed")
+
+# Lowest floor of a building and how often it occurs (basements are below 1)
+_FLOORS_MIN = (1, 0, -1, -2)
+_FLOORS_MIN_WEIGHTS = (80, 10, 6, 4)
+
+# Days between audits an account is typically scheduled for
+_CADENCES = (7, 14, 30, 30, 60, 90)
+
+
+class SyntheticDataset:
+    """Accounts with floor ranges and audits, generated from a seed.
+
+    Every account is generated from the seed and its index alone, so a
+    dataset is the same wherever and however often it is generated, and
+    its accounts can be produced one at a time. The data follows
+    audit-schema.json and looks like an 'export --with-floors' file:
+    buildings of a few to a hundred floors, some with basements and
+    excluded floors (often 13), audits at a per-account cadence spread over
+    the last years, floors visited only by completed or pending audits,
+    and scores on a fraction of the completed ones.
+    """
+
+    def __init__(self, accounts: int, audits_per_account: int, seed: int = SYNTHETIC_SEED,
+                 years: int = 5, score_rate: float = 0.3, note_rate: float = 0.05,
+                 records: Optional[int] = None, end_date: date = SYNTHETIC_END_DATE):
+        """Initialize the dataset.
+
+        Args:
+            accounts: Number of accounts
+            audits_per_account: Number of audits of each account
+            seed: Random seed
+            years: Years the audit dates are spread over, ending at end_date
+            score_rate: Fraction of completed audits with a score
+            note_rate: Fraction of audits with a note
+            records: Total number of audits, if less than accounts x
+                audits_per_account; the last account gets the remainder
+            end_date: Date of the latest possible audit
+        """
+        self.accounts = accounts
+        self.audits_per_account = audits_per_account
+        self.seed = seed
+        self.years = years
+        self.score_rate = score_rate
+        self.note_rate = note_rate
+        self.records = accounts * audits_per_account if records is None else records
+        self.end_date = end_date
+
+    @classmethod
+    def of_size(cls, records: int, audits_per_account: int = 100, **options: Any) -> "SyntheticDataset":
+        """Create a dataset with a total number of audits.
+
+        Args:
+            records: Total number of audits
+            audits_per_account: Number of audits of each account
+            **options: Further options (see __init__)
+
+        Returns:
+            SyntheticDataset: Dataset of -(-records // audits_per_account) accounts
+        """
+        audits_per_account = max(1, min(audits_per_account, records))
+        accounts = -(-records // audits_per_account)
+        return cls(accounts, audits_per_account, records=records, **options)
+
+    def account(self, index: int) -> Dict[str, Any]:
+        """Generate one account with its audits.
+
+        Args:
+            index: Account index
+
+        Returns:
+            Dict[str, Any]: Account in YAML format (id, floors_min,
+            floors_max, excluded_floors and audits)
+        """
+        rng = random.Random(f"{self.seed}:{index}")
+        account_id = rng.choice(_ID_LETTERS) + "".join(rng.choices(_ID_ALPHABET, k=14))
+
+        floors_min = rng.choices(_FLOORS_MIN, _FLOORS_MIN_WEIGHTS)[0]
+        floors_max = max(floors_min + 2, min(120, int(rng.lognormvariate(2.3, 0.7))))
+        excluded = set()
+        if floors_min <= 13 <= floors_max and rng.random() < 0.4:
+            excluded.add(13)
+        for _ in range(rng.choice((0, 0, 0, 1, 2))):
+            excluded.add(rng.randint(floors_min, floors_max))
+        floors = [floor for floor in range(floors_min, floors_max + 1) if floor not in excluded]
+
+        count = min(self.audits_per_account, self.records - index * self.audits_per_account)
+        end = self.end_date.toordinal()
+        cadence = rng.choice(_CADENCES)
+        # Accounts joined at different times; the span fits the cadence unless the years run out
+        span = min(self.years * 365, max(90, count * cadence))
+        start = end - rng.randint(span // 2, span)
+
+        audits = []
+        for day in sorted(rng.randint(start, end) for _ in range(count)):
+            roll = rng.random()
+            status = next(name for name, threshold in AUDIT_STATUSES if roll < threshold)
+            if status == "completed":
+                visited = rng.sample(floors, rng.randint(1, min(6, len(floors))))
+            elif status == "pending":
+                visited = rng.sample(floors, rng.randint(0, min(2, len(floors))))
+            else:
+                visited = []
+            score = None
+            if status == "completed" and rng.random() < self.score_rate:
+                score = rng.randint(40, 100)
+            note = rng.choice(AUDIT_NOTES) if rng.random() < self.note_rate else ''
+            audits.append({'date': date.fromordinal(day).isoformat(), 'visited_floors': visited,
+                           'status': status, 'note': note, 'score': score})
+
+        return {'id': account_id, 'floors_min': floors_min, 'floors_max': floors_max,
+                'excluded_floors': sorted(excluded), 'audits': audits}
+
+    def iter_accounts(self) -> Iterator[Dict[str, Any]]:
+        """Generate the accounts one at a time.
+
+        Yields:
+            Dict[str, Any]: Accounts in YAML format
+        """
+        for index in range(self.accounts):
+            yield self.account(index)
+
+    def iter_pairs(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Generate (account ID, YAML audit) pairs, as readers.iter_yaml_audits yields them."""
+        for account in self.iter_accounts():
+            for audit in account['audits']:
+                yield account['id'], audit
+
+    def iter_json_audits(self) -> Iterator[Dict[str, Any]]:
+        """Generate the audits in JSON format, as the converter writes them."""
+        return AuditConverter.iter_yaml_audits_to_json(self.iter_pairs())
+
+    def write_yaml(self, file: TextIO) -> int:
+        """Write the dataset as YAML, formatted exactly as yaml.dump would.
+
+        The values are known to need no quoting beyond the dates, so the
+        text is written directly, many times faster than through yaml.dump.
+
+        Args:
+            file: Open text file to write to
+
+        Returns:
+            int: Number of audits written
+        """
+        if not self.accounts:
+            file.write("accounts: []\n")
+            return 0
+
+        count = 0
+        file.write("accounts:\n")
+        for account in self.iter_accounts():
+            lines = [f"- id: {account['id']}",
+                     f"  floors_min: {account['floors_min']}",
+                     f"  floors_max: {account['floors_max']}"]
+            _append_list(lines, "  excluded_floors", account['excluded_floors'], "  ")
+            if not account['audits']:
+                lines.append("  audits: []")
+            else:
+                lines.append("  audits:")
+            for audit in account['audits']:
+                lines.append(f"  - date: '{audit['date']}'")
+                _append_list(lines, "    visited_floors", audit['visited_floors'], "    ")
+                lines.append(f"    status: {audit['status']}")
+                note = audit['note'] or "''"
+                lines.append(f"    note: {note}")
+                lines.append(f"    score: {'null' if audit['score'] is None else audit['score']}")
+            lines.append("")
+            file.write("\n".join(lines))
+            count += len(account['audits'])
+        return count
+
+
+def _append_list(lines: List[str], key: str, values: List[int], indent: str):
+    """Append a list of integers in yaml.dump's block style."""
+    if not values:
+        lines.append(f"{key}: []")
+        return
+    lines.append(f"{key}:")
+    lines.extend(f"{indent}- {value}" for value in values)
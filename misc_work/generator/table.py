@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Table Module for Audit Wizard
+Columnar, array-backed in-memory store of audit records
+"""
+
+import json
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from aggregator import AuditRecord, iter_json_records
+from dates import day_to_json, json_date_ordinal, yaml_date_ordinal
+from readers import is_yaml_path, iter_json_audits, iter_yaml_audits
+
+# Audit statuses allowed by audit-schema.json, stored by their index
+AUDIT_STATUSES = ("scheduled", "pending", "completed", "canceled")
+STATUS_CODES = {status: code for code, status in enumerate(AUDIT_STATUSES)}
+
+# Column values for a date that cannot be parsed and a status outside AUDIT_STATUSES
+NO_DAY = 0
+OTHER_STATUS = -1
+
+# Keys of a JSON format audit record, in the order the converter writes them
+JSON_FIELDS = ["account", "date", "status", "note", "visited_floors", "score"]
+JSON_FIELDS_WITH_ID = JSON_FIELDS + ["id"]
+
+_NO_SCORE = float('nan')
+_INT32_MIN = -2 ** 31
+_INT32_MAX = 2 ** 31 - 1
+
+
+class AuditTable:
+    """Columnar store of audit records.
+
+    Account IDs are interned, dates are stored as day ordinals, scores as
+    floats (NaN for no score), statuses as codes into AUDIT_STATUSES and
+    visited floors as one flat array of values with per-audit offsets.
+
+    Values that do not fit the columns (e.g. an unknown status or a date in
+    another format) are kept per audit as overrides, so converting back to
+    dicts returns exactly the records that were added.
+    """
+
+    def __init__(self, source: str = 'json'):
+        """Initialize an empty table.
+
+        Args:
+            source: Format the audits were read from ('yaml' or 'json');
+                decides how reports list accounts
+        """
+        self.source = source
+        self.account_ids: List[Any] = []
+        self._account_codes: Dict[Any, int] = {}
+        self.accounts = array('i')
+        self.days = array('i')
+        self.scores = array('d')
+        self.statuses = array('b')
+        self.floor_offsets = array('q', [0])
+        self.floor_values = array('i')
+        self.notes: List[Any] = []
+        self.ids: List[Optional[str]] = []
+        self._overrides: Dict[int, Dict[str, Any]] = {}
+        self._raw: Dict[int, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def intern_account(self, account_id: Any) -> int:
+        """Get the code of an account ID, adding it if it is new.
+
+        Codes are assigned in order of first appearance.
+
+        Args:
+            account_id: Account ID
+
+        Returns:
+            int: Account code
+        """
+        code = self._account_codes.get(account_id)
+        if code is None:
+            code = self._account_codes[account_id] = len(self.account_ids)
+            self.account_ids.append(account_id)
+        return code
+
+    def _append(self, account_id: Any, day: int, status: Any, note: Any, floors: Any,
+                floors_json: Any, score: Any, record_id: Any, has_id: bool) -> Dict[str, Any]:
+        """Append one audit to the columns.
+
+        floors are stored if they are a list of integers; otherwise the JSON
+        format value floors_json is kept as an override.
+
+        Returns:
+            Dict[str, Any]: JSON format values that did not fit the columns
+        """
+        overrides = {}
+
+        self.accounts.append(self.intern_account(account_id))
+        self.days.append(day)
+
+        code = STATUS_CODES.get(status) if isinstance(status, str) else None
+        if code is None:
+            code = OTHER_STATUS
+            overrides['status'] = status
+        self.statuses.append(code)
+
+        if score is None:
+            self.scores.append(_NO_SCORE)
+        elif type(score) is int and int(float(score)) == score:
+            self.scores.append(float(score))
+        else:
+            self.scores.append(_NO_SCORE)
+            overrides['score'] = score
+
+        if (isinstance(floors, list) and all(type(floor) is int and _INT32_MIN <= floor <= _INT32_MAX
+                                             for floor in floors)):
+            self.floor_values.extend(floors)
+        else:
+            overrides['visited_floors'] = floors_json
+        self.floor_offsets.append(len(self.floor_values))
+
+        self.notes.append(note)
+        self.ids.append(record_id if has_id else None)
+        if has_id and record_id is None:
+            overrides['id'] = None
+
+        return overrides
+
+    def append_json(self, audit: Dict[str, Any]):
+        """Add an audit record in JSON format.
+
+        Args:
+            audit: Audit record in JSON format
+        """
+        row = len(self)
+        date = audit.get('date')
+        day = json_date_ordinal(date) if isinstance(date, str) else None
+
+        floors_json = audit.get('visited_floors')
+        floors = None
+        try:
+            parsed = json.loads(floors_json)
+            # Only store floors that are written back exactly as they were
+            if isinstance(parsed, list) and json.dumps(parsed) == floors_json:
+                floors = parsed
+        except (json.JSONDecodeError, TypeError):
+            pass
+
+        overrides = self._append(audit.get('account'), day or NO_DAY, audit.get('status'),
+                                 audit.get('note'), floors, floors_json, audit.get('score'),
+                                 audit.get('id'), 'id' in audit)
+        if day is None or day_to_json(day) != date:
+            overrides['date'] = date
+
+        if list(audit) not in (JSON_FIELDS, JSON_FIELDS_WITH_ID):
+            # Missing or extra keys: keep the record as it was
+            self._raw[row] = dict(audit)
+        elif overrides:
+            self._overrides[row] = overrides
+
+    def append_yaml(self, account_id: Any, audit: Dict[str, Any]):
+        """Add an audit in YAML format, stored as AuditConverter would convert it to JSON.
+
+        Args:
+            account_id: Account ID
+            audit: YAML audit entry
+
+        Raises:
+            ValueError: If the audit date is invalid
+        """
+        row = len(self)
+        day = yaml_date_ordinal(audit.get('date'))
+        floors = audit.get('visited_floors', [])
+        overrides = self._append(account_id, day, audit.get('status', 'completed'),
+                                 audit.get('note', ''), floors, None,
+                                 audit.get('score'), audit.get('id'), 'id' in audit)
+        if 'visited_floors' in overrides:
+            overrides['visited_floors'] = json.dumps(floors)
+        if overrides:
+            self._overrides[row] = overrides
+
+    @classmethod
+    def from_json_audits(cls, audits: Iterable[Dict[str, Any]]) -> "AuditTable":
+        """Build a table from audit records in JSON format.
+
+        Args:
+            audits: Audit records in JSON format
+
+        Returns:
+            AuditTable: The new table
+        """
+        table = cls(source='json')
+        for audit in audits:
+            table.append_json(audit)
+        return table
+
+    @classmethod
+    def from_yaml_audits(cls, pairs: Iterable[Tuple[Any, Optional[Dict[str, Any]]]]) -> "AuditTable":
+        """Build a table from (account ID, YAML audit) pairs.
+
+        Args:
+            pairs: Pairs as yielded by readers.iter_yaml_audits; accounts
+                without audits are registered without rows
+
+        Returns:
+            AuditTable: The new table
+        """
+        table = cls(source='yaml')
+        for account_id, audit in pairs:
+            if audit is None:
+                table.intern_account(account_id)
+            else:
+                table.append_yaml(account_id, audit)
+        return table
+
+    @classmethod
+    def from_yaml(cls, yaml_data: Dict[str, Any]) -> "AuditTable":
+        """Build a table from YAML audit data (dict with 'accounts' key).
+
+        Args:
+            yaml_data: YAML data structure
+
+        Returns:
+            AuditTable: The new table
+        """
+        def pairs():
+            for account in yaml_data.get('accounts', []):
+                audits = account.get('audits', [])
+                if not audits:
+                    yield account.get('id'), None
+                for audit in audits:
+                    yield account.get('id'), audit
+
+        return cls.from_yaml_audits(pairs())
+
+    @classmethod
+    def from_file(cls, path: str) -> "AuditTable":
+        """Read a YAML, JSON or JSON Lines audit file into a table.
+
+        Args:
+            path: Path to the audit file
+
+        Returns:
+            AuditTable: The new table
+        """
+        with open(path, 'r') as file:
+            if is_yaml_path(path):
+                return cls.from_yaml_audits(iter_yaml_audits(file))
+            return cls.from_json_audits(iter_json_audits(file))
+
+    def account_id(self, row: int) -> Any:
+        """Get the account ID of an audit."""
+        return self.account_ids[self.accounts[row]]
+
+    def day(self, row: int) -> Optional[int]:
+        """Get the date of an audit as a day ordinal, or None if it cannot be parsed."""
+        day = self.days[row]
+        return day if day != NO_DAY else None
+
+    def floors(self, row: int) -> Optional[List[int]]:
+        """Get the visited floors of an audit, or None if they are not integers."""
+        if 'visited_floors' in self.overrides(row):
+            return None
+        return self.floor_values[self.floor_offsets[row]:self.floor_offsets[row + 1]].tolist()
+
+    def score(self, row: int) -> Any:
+        """Get the score of an audit."""
+        overrides = self.overrides(row)
+        if 'score' in overrides:
+            return overrides['score']
+        score = self.scores[row]
+        return None if score != score else int(score)
+
+    def status(self, row: int) -> Any:
+        """Get the status of an audit."""
+        code = self.statuses[row]
+        return AUDIT_STATUSES[code] if code != OTHER_STATUS else self.overrides(row)['status']
+
+    def overrides(self, row: int) -> Dict[str, Any]:
+        """Get the JSON format values of an audit that are not stored in the columns."""
+        return self._overrides.get(row) or self._raw.get(row) or {}
+
+    def is_raw(self, row: int) -> bool:
+        """Check whether an audit is kept as its original record (non-standard keys)."""
+        return row in self._raw
+
+    def irregular_rows(self) -> List[int]:
+        """Get the rows with values that are not (fully) stored in the columns, in order."""
+        return sorted(set(self._overrides) | set(self._raw))
+
+    def json_audit(self, row: int) -> Dict[str, Any]:
+        """Convert one audit back to a record in JSON format.
+
+        Args:
+            row: Position of the audit in the table
+
+        Returns:
+            Dict[str, Any]: Audit record in JSON format
+        """
+        raw = self._raw.get(row)
+        if raw is not None:
+            return dict(raw)
+
+        day = self.days[row]
+        code = self.statuses[row]
+        score = self.scores[row]
+        audit = {
+            "account": self.account_ids[self.accounts[row]],
+            "date": day_to_json(day) if day != NO_DAY else None,
+            "status": AUDIT_STATUSES[code] if code != OTHER_STATUS else None,
+            "note": self.notes[row],
+            "visited_floors": json.dumps(
+                self.floor_values[self.floor_offsets[row]:self.floor_offsets[row + 1]].tolist()),
+            "score": None if score != score else int(score)
+        }
+        if self.ids[row] is not None:
+            audit['id'] = self.ids[row]
+
+        overrides = self._overrides.get(row)
+        if overrides:
+            audit.update(overrides)
+        return audit
+
+    def iter_json_audits(self) -> Iterator[Dict[str, Any]]:
+        """Yield every audit as a record in JSON format, in table order."""
+        for row in range(len(self)):
+            yield self.json_audit(row)
+
+    def to_json_audits(self) -> List[Dict[str, Any]]:
+        """Convert the table to a list of audit records in JSON format."""
+        return list(self.iter_json_audits())
+
+    def rows_by_account(self) -> List[int]:
+        """Get the rows grouped by account, accounts in order of first appearance."""
+        accounts = self.accounts
+        return sorted(range(len(self)), key=accounts.__getitem__)
+
+    def iter_records(self) -> Iterator[AuditRecord]:
+        """Normalize the audits for AuditAggregator, as iter_json_records would.
+
+        For tables read from YAML, every account is registered first, so
+        accounts without audits are counted and accounts keep their file order.
+
+        Yields:
+            AuditRecord: Normalized audits
+        """
+        if self.source == 'yaml':
+            for account_id in self.account_ids:
+                yield account_id, None, [], None
+
+        account_ids = self.account_ids
+        accounts = self.accounts
+        days = self.days
+        scores = self.scores
+        offsets = self.floor_offsets
+        values = self.floor_values
+        for row in range(len(self)):
+            if row in self._raw or row in self._overrides:
+                yield from iter_json_records([self.json_audit(row)])
+                continue
+            day = days[row]
+            score = scores[row]
+            if day == NO_DAY:
+                yield account_ids[accounts[row]], None, [], score != score
+            else:
+                yield account_ids[accounts[row]], day, values[offsets[row]:offsets[row + 1]], score != score
@@ -0,0 +1,72 @@
+"""Shared fixtures for the Audit Wizard tests."""
+
+import json
+import os
+import sys
+
+import pytest
+
+# The modules are imported by bare name, as audit_wizard.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from local_server import LocalPocketBase  # noqa: E402
+from synthetic import SyntheticDataset  # noqa: E402
+
+EMAIL = "admin@example.com"
+PASSWORD = "password"
+
+
+@pytest.fixture
+def server():
+    """A running in-process PocketBase stand-in."""
+    with LocalPocketBase(users={EMAIL: PASSWORD}) as pocketbase:
+        yield pocketbase
+
+
+@pytest.fixture
+def yaml_file(tmp_path):
+    """Write a small synthetic YAML audit file and return its path."""
+    def write(accounts: int = 5, audits: int = 20, seed: int = 1, name: str = "audits.yml") -> str:
+        path = tmp_path / name
+        with open(path, 'w') as file:
+            SyntheticDataset(accounts, audits, seed=seed).write_yaml(file)
+        return str(path)
+    return write
+
+
+@pytest.fixture
+def json_file(tmp_path):
+    """Write synthetic audits in JSON format and return the path."""
+    path = tmp_path / "audits.json"
+    with open(path, 'w') as file:
+        json.dump(list(SyntheticDataset(3, 10, seed=2).iter_json_audits()), file, indent=2)
+    return str(path)
+
+@pytest.fixture
+def wizard(server, monkeypatch):
+    """Run wizard commands against the stand-in; returns the exit status."""
+    import audit_wizard
+
+    monkeypatch.setattr(audit_wizard, "POCKETBASE_URL", server.url)
+    monkeypatch.setattr(audit_wizard, "POCKETBASE_EMAIL", EMAIL)
+    monkeypatch.setattr(audit_wizard, "POCKETBASE_PASSWORD", PASSWORD)
+
+    def run(*args: str) -> int:
+        monkeypatch.setattr(sys, "argv", ["audit_wizard.py", *args])
+        return audit_wizard.main()
+    return run
+
+
+@pytest.fixture
+def writes(server, monkeypatch):
+    """Record the method and path of every record write the stand-in handles."""
+    recorded = []
+    handle = server.handle
+
+    def recording(method, path, query, body, authorization):
+        if method != "GET" and "/auth-" not in path:
+            recorded.append((method, path))
+        return handle(method, path, query, body, authorization)
+
+    monkeypatch.setattr(server, "handle", recording)
+    return recorded
@@ -0,0 +1,76 @@
+"""Tests of the single-pass aggregation core."""
+
+from datetime import date
+
+from aggregator import AuditAggregator, iter_json_records, iter_yaml_records
+from synthetic import SyntheticDataset
+
+
+def naive_summary(data):
+    """Summarize YAML data the way the per-format reports used to, keeping every date."""
+    by_year, floors, accounts = {}, {}, {}
+    for account in data['accounts']:
+        dates = sorted(date.fromisoformat(audit['date']) for audit in account['audits'])
+        for audit in account['audits']:
+            year = int(audit['date'][:4])
+            by_year[year] = by_year.get(year, 0) + 1
+            for floor in audit['visited_floors']:
+                floors[floor] = floors.get(floor, 0) + 1
+        gaps = [(later - earlier).days for earlier, later in zip(dates, dates[1:])]
+        accounts[account['id']] = (
+            len(dates),
+            sum(1 for audit in account['audits'] if audit['score'] is None),
+            dates[0].isoformat() if dates else 'N/A',
+            dates[-1].isoformat() if dates else 'N/A',
+            sum(gaps) / len(gaps) if gaps else 'N/A',
+        )
+    return by_year, floors, accounts
+
+
+def summary(aggregate: AuditAggregator):
+    return aggregate.audits_by_year, aggregate.floor_counts, {
+        stats.id: (stats.audit_count, stats.missing_scores, stats.first_audit, stats.last_audit,
+                   stats.avg_days_between)
+        for stats in aggregate.accounts.values()}
+
+
+def test_matches_keeping_every_date():
+    data = {'accounts': list(SyntheticDataset(8, 40, seed=11).iter_accounts())}
+    data['accounts'][3]['audits'] = []
+    data['accounts'][5]['audits'] = data['accounts'][5]['audits'][:1]
+
+    aggregate = AuditAggregator().add_records(iter_yaml_records(data))
+
+    assert summary(aggregate) == naive_summary(data)
+    assert aggregate.total_audits == sum(len(account['audits']) for account in data['accounts'])
+    assert aggregate.missing_scores == sum(count[1] for count in naive_summary(data)[2].values())
+
+
+def test_yaml_and_json_agree_and_merge():
+    dataset = SyntheticDataset(5, 20, seed=4)
+    from_yaml = AuditAggregator().add_records(iter_yaml_records({'accounts': list(dataset.iter_accounts())}))
+    audits = list(dataset.iter_json_audits())
+
+    halves = AuditAggregator().add_records(iter_json_records(audits[:37]))
+    halves.merge(AuditAggregator().add_records(iter_json_records(audits[37:])))
+
+    assert summary(halves) == summary(from_yaml)
+    assert halves.top_floors(3) == from_yaml.top_floors(3)
+    assert (halves.total_audits, halves.missing_scores) == (from_yaml.total_audits, from_yaml.missing_scores)
+
+
+def test_json_audits_with_bad_dates_still_count():
+    audits = [
+        {'account': "a", 'date': "2024-01-01T00:00:00.000Z", 'visited_floors': "[1, 2]", 'score': 5},
+        {'account': "a", 'date': "not a date", 'visited_floors': "[1]", 'score': None},
+        {'date': "2023-06-01", 'visited_floors': "oops"},
+    ]
+
+    aggregate = AuditAggregator().add_records(iter_json_records(audits))
+
+    # Floors of the undated audit are not counted, as in the original JSON report
+    assert aggregate.floor_counts == {1: 1, 2: 1}
+    assert aggregate.audits_by_year == {2024: 1, 2023: 1}
+    assert (aggregate.total_audits, aggregate.missing_scores) == (3, 2)
+    assert aggregate.accounts["a"].dated_count == 1 and aggregate.accounts["a"].avg_days_between == 'N/A'
+    assert aggregate.accounts["unknown"].first_audit == "2023-06-01"
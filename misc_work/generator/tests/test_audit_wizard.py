@@ -0,0 +1,108 @@
+"""Tests of the wizard's PocketBase commands against the local stand-in."""
+
+import json
+
+import yaml
+
+from local_server import ApiError
+
+COLLECTION = "audits"
+
+
+def stored_records(server):
+    return server.store.list(COLLECTION, 1, 1000, None, None, False)['items']
+
+
+def stored_ids(server):
+    return {record['id'] for record in stored_records(server)}
+
+
+def read_json(path):
+    with open(path) as file:
+        return json.load(file)
+
+
+def test_concurrent_import_and_update(server, wizard, writes, json_file, tmp_path):
+    output = str(tmp_path / "with_ids.json")
+    assert wizard("import", "-i", json_file, "-o", output, "-c", "4") == 0
+
+    audits = read_json(output)
+    assert [audit['date'] for audit in audits] == [audit['date'] for audit in read_json(json_file)]
+    assert {audit['id'] for audit in audits} == stored_ids(server) and len(audits) == 30
+
+    for audit in audits:
+        audit['note'] = "Updated"
+    with open(output, 'w') as file:
+        json.dump(audits, file)
+    writes.clear()
+    assert wizard("update", "-i", output, "-c", "4") == 0
+    assert len(writes) == 30 and {method for method, _ in writes} == {"PATCH"}
+    assert {record['note'] for record in stored_records(server)} == {"Updated"}
+
+
+def test_batched_update_writes_every_audit(server, wizard, writes, json_file, tmp_path):
+    output = str(tmp_path / "with_ids.json")
+    assert wizard("import", "-i", json_file, "-o", output, "-b", "10") == 0
+    assert len(writes) == 3 and len(stored_ids(server)) == 30
+    writes.clear()
+
+    assert wizard("update", "-i", output, "-b", "8") == 0
+    assert writes == [("POST", "/api/batch")] * 4
+
+
+def test_export_writes_the_working_formats(server, wizard, json_file, tmp_path):
+    imported = str(tmp_path / "with_ids.json")
+    assert wizard("import", "-i", json_file, "-o", imported) == 0
+    expected = sorted(read_json(imported), key=lambda audit: (audit['account'], audit['date']))
+    for audit in expected:
+        # PocketBase stores a missing score as 0
+        audit['score'] = audit['score'] or 0
+    first_account = expected[0]['account']
+    server.store.create("accounts", {'id': first_account, 'floors_min': -1, 'floors_max': 9, 'excluded_floors': [4]})
+
+    exported = str(tmp_path / "exported.json")
+    assert wizard("export", "-f", "json", "-o", exported, "--page-size", "7") == 0
+    assert read_json(exported) == expected
+
+    exported = str(tmp_path / "exported.yml")
+    assert wizard("export", "-o", exported, "--with-floors", "--page-size", "7") == 0
+    with open(exported) as file:
+        accounts = yaml.safe_load(file)['accounts']
+    assert [account['id'] for account in accounts] == sorted({audit['account'] for audit in expected})
+    assert (accounts[0]['floors_min'], accounts[0]['floors_max'], accounts[0]['excluded_floors']) == (-1, 9, [4])
+    assert 'floors_min' not in accounts[1]
+    assert [audit['id'] for account in accounts for audit in account['audits']] == \
+        [audit['id'] for audit in expected]
+
+
+def test_second_sync_writes_nothing(server, wizard, writes, json_file, tmp_path):
+    output = str(tmp_path / "synced.json")
+    assert wizard("sync", "-i", json_file, "-o", output, "-b", "10") == 0
+    assert len(writes) == 3 and len(stored_ids(server)) == 30
+
+    writes.clear()
+    assert wizard("sync", "-i", json_file, "-o", output) == 0
+    assert writes == []
+
+    # Only the changed audit is written
+    audits = read_json(output)
+    audits[4]['note'] = "Changed"
+    with open(output, 'w') as file:
+        json.dump(audits, file)
+    assert wizard("sync", "-i", output, "-o", output) == 0
+    assert writes == [("PATCH", f"/api/collections/{COLLECTION}/records/{audits[4]['id']}")]
+
+
+def test_sync_fails_when_a_write_fails(server, wizard, json_file, tmp_path, monkeypatch):
+    output = str(tmp_path / "synced.json")
+    assert wizard("sync", "-i", json_file, "-o", output) == 0
+    audits = read_json(output)
+    audits[4]['note'] = "Changed"
+    with open(output, 'w') as file:
+        json.dump(audits, file)
+
+    def reject(collection, record_id, data):
+        raise ApiError(400, "Failed to update record.")
+
+    monkeypatch.setattr(server.store, "update", reject)
+    assert wizard("sync", "-i", output, "-o", output) == 1
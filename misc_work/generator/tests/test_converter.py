@@ -0,0 +1,93 @@
+"""Tests of the streaming converter."""
+
+import io
+import json
+
+import pytest
+import yaml
+
+from converter import AuditConverter
+from synthetic import SyntheticDataset
+
+
+@pytest.mark.parametrize("count", [0, 1, 5])
+def test_json_stream_matches_json_dump(count):
+    audits = list(SyntheticDataset(2, 3, seed=1).iter_json_audits())[:count]
+    file = io.StringIO()
+    assert AuditConverter.write_json_stream(iter(audits), file) == count
+    assert file.getvalue() == json.dumps(audits, indent=2)
+
+
+def test_yaml_stream_matches_yaml_dump():
+    audits = list(SyntheticDataset(3, 4, seed=1).iter_json_audits())
+    file = io.StringIO()
+    assert AuditConverter.write_yaml_stream(iter(audits), file) == 12
+    assert file.getvalue() == yaml.dump(AuditConverter.json_to_yaml(audits), default_flow_style=False,
+                                        sort_keys=False)
+
+    file = io.StringIO()
+    assert AuditConverter.write_yaml_stream(iter([]), file) == 0
+    assert file.getvalue() == yaml.dump({'accounts': []})
+
+
+def test_output_starts_before_input_ends():
+    file = io.StringIO()
+
+    def audits():
+        yield from SyntheticDataset(1, 2, seed=1).iter_json_audits()
+        assert file.getvalue().count('"account"') == 2
+        yield from SyntheticDataset(1, 1, seed=2).iter_json_audits()
+
+    assert AuditConverter.write_json_stream(audits(), file) == 3
+
+
+@pytest.mark.parametrize("name", ["audits.json", "audits.jsonl"])
+def test_file_round_trip(tmp_path, yaml_file, name):
+    source = yaml_file(3, 5, seed=8)
+    json_path = str(tmp_path / name)
+    assert AuditConverter.yaml_file_to_json_file(source, json_path)
+    with open(json_path) as file:
+        if name.endswith(".jsonl"):
+            audits = [json.loads(line) for line in file]
+        else:
+            audits = json.load(file)
+    assert audits == list(SyntheticDataset(3, 5, seed=8).iter_json_audits())
+
+    yaml_path = str(tmp_path / "back.yml")
+    assert AuditConverter.json_file_to_yaml_file(json_path, yaml_path)
+    with open(yaml_path) as file, open(source) as original:
+        assert yaml.safe_load(file) == {'accounts': [
+            {'id': account['id'], 'audits': account['audits']} for account in yaml.safe_load(original)['accounts']]}
+
+
+def test_ungrouped_json_is_grouped(tmp_path):
+    audits = list(SyntheticDataset(2, 2, seed=3).iter_json_audits())
+    json_path = tmp_path / "audits.jsonl"
+    json_path.write_text("".join(json.dumps(audit) + "\n" for audit in [audits[0], audits[2], audits[1], audits[3]]))
+
+    yaml_path = str(tmp_path / "audits.yml")
+    assert AuditConverter.json_file_to_yaml_file(str(json_path), yaml_path)
+    with open(yaml_path) as file:
+        accounts = yaml.safe_load(file)['accounts']
+    assert [len(account['audits']) for account in accounts] == [2, 2]
+
+
+def test_invalid_audits_are_skipped_as_on_import(server, wizard, tmp_path):
+    input_file = tmp_path / "audits.yml"
+    input_file.write_text("accounts:\n"
+                          "- id: a1\n"
+                          "  audits:\n"
+                          "  - {date: '2024-01-02', visited_floors: [1], score: 80}\n"
+                          "  - {date: '2024-02-03', visited_floors: [2], score: 3.5}\n")
+    output = str(tmp_path / "audits.json")
+
+    assert wizard("convert", "-f", "json", "-i", str(input_file), "-o", output) == 1
+    with open(output) as file:
+        assert [audit['score'] for audit in json.load(file)] == [80]
+    assert wizard("import", "-i", output, "-o", str(tmp_path / "with_ids.json")) == 0
+
+    assert wizard("convert", "-f", "json", "-i", str(input_file), "-o", output, "--no-validate") == 0
+    with open(output) as file:
+        assert [audit['score'] for audit in json.load(file)] == [80, 3.5]
+    assert wizard("import", "-i", output, "-o", str(tmp_path / "with_ids.json")) == 1
+    assert server.store.list("audits", 1, 10, None, None, False)['totalItems'] == 2
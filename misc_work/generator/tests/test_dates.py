@@ -0,0 +1,61 @@
+"""Tests of the fast date parsing against the datetime calls it replaces."""
+
+from datetime import datetime
+
+import pytest
+
+from dates import (day_to_json, is_iso_date, json_date_ordinal, json_date_to_yaml, yaml_date_ordinal,
+                   yaml_date_to_json, year_of)
+
+YAML_DATES = ["2024-01-15", "2024-02-29", "0999-12-31", "2023-02-29", "2024-1-5", "2024-13-01",
+              "２０２４-01-01", "2024-01-15 ", "20240115", ""]
+JSON_DATES = ["2024-01-15T00:00:00.000Z", "2024-01-15", "2024-01-15T12:30:00Z", "2024-01-15T00:00:00.000+00:00",
+              "2023-02-29T00:00:00.000Z", "0999-12-31T00:00:00.000Z", "garbage", "", "Z"]
+
+
+def outcome(function, value):
+    try:
+        return function(value)
+    except ValueError:
+        return ValueError
+
+
+@pytest.mark.parametrize("value", YAML_DATES)
+def test_yaml_dates_parse_as_strptime(value):
+    def slow_ordinal(text):
+        return datetime.strptime(text, "%Y-%m-%d").toordinal()
+
+    def slow_json(text):
+        return datetime.strptime(text, "%Y-%m-%d").isoformat() + ".000Z"
+
+    assert outcome(yaml_date_ordinal, value) == outcome(slow_ordinal, value)
+    assert outcome(yaml_date_to_json, value) == outcome(slow_json, value)
+
+
+@pytest.mark.parametrize("value", JSON_DATES)
+def test_json_dates_parse_as_fromisoformat(value):
+    def slow_ordinal(text):
+        return datetime.fromisoformat(text[:-1] if text.endswith('Z') else text).toordinal()
+
+    def slow_yaml(text):
+        return datetime.fromisoformat(text[:-1]).strftime("%Y-%m-%d") if text.endswith('Z') else text
+
+    expected = outcome(slow_ordinal, value)
+    assert json_date_ordinal(value) == (None if expected is ValueError else expected)
+    assert outcome(json_date_to_yaml, value) == outcome(slow_yaml, value)
+
+
+def test_day_helpers():
+    day = yaml_date_ordinal("2024-03-01")
+    assert year_of(day) == 2024
+    assert day_to_json(day) == "2024-03-01T00:00:00.000Z"
+    assert is_iso_date("2024-02-29") and not is_iso_date("2023-02-29") and not is_iso_date("2024-2-29")
+
+
+def test_repeated_dates_hit_the_cache():
+    yaml_date_ordinal.cache_clear()
+    for _ in range(100):
+        for day in range(1, 29):
+            yaml_date_ordinal(f"2024-02-{day:02d}")
+    info = yaml_date_ordinal.cache_info()
+    assert (info.misses, info.hits) == (28, 2772)
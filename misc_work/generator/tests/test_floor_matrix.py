@@ -0,0 +1,111 @@
+"""Tests of the floor matrix, mirroring crm/src/shared/utils/buildFloorMatrix.test.ts."""
+
+import logging
+import math
+
+import pytest
+
+from floor_matrix import FloorMatrix, build_account_matrix
+
+
+def build(account, audits):
+    return FloorMatrix.build(account, audits).to_dict()
+
+
+def test_standard_account_and_audits():
+    account = {'floors_min': 1, 'floors_max': 5, 'excluded_floors': [4]}
+    audits = [
+        {'date': "2024-01-15", 'visited_floors': [1, 2, 3]},
+        {'date': "2024-02-20", 'visited_floors': [2, 5]},
+    ]
+
+    matrix = build(account, audits)
+
+    assert [int(floor) for floor in matrix] == [1, 2, 3, 4, 5]
+    assert list(matrix["1"]) == ["01-2024", "02-2024"]
+    assert matrix["1"] == {"01-2024": "visited", "02-2024": "skipped"}
+    assert matrix["2"] == {"01-2024": "visited", "02-2024": "visited"}
+    assert matrix["4"] == {"01-2024": "excluded", "02-2024": "excluded"}
+
+
+def test_negative_floors():
+    account = {'floors_min': -2, 'floors_max': 2, 'excluded_floors': [-1]}
+    audits = [{'date': "2024-01-15", 'visited_floors': [-2, 0, 1, 2]}]
+
+    matrix = build(account, audits)
+
+    # Keys come out as JSON.stringify orders the dashboard's object: non-negative first
+    assert list(matrix) == ["0", "1", "2", "-2", "-1"]
+    assert matrix["-1"]["01-2024"] == "excluded"
+    assert matrix["-2"]["01-2024"] == "visited"
+
+
+@pytest.mark.parametrize("account, audits, message", [
+    ({'floors_min': "invalid"}, [], "Invalid account object"),
+    ({'floors_min': 10, 'floors_max': 5, 'excluded_floors': []}, [], "floors_min cannot be greater than floors_max"),
+    ({'floors_min': 1, 'floors_max': 5, 'excluded_floors': []}, [{'date': "invalid-date", 'visited_floors': [1]}],
+     "Failed extracting dates: Invalid date format"),
+    ({'floors_min': 1, 'floors_max': 5, 'excluded_floors': []}, [{'date': "2024-01-15", 'visited_floors': "1"}],
+     "visited_floors must be an array for audit on 2024-01-15"),
+    ({'floors_min': 1, 'floors_max': 5, 'excluded_floors': []}, [{'date': "2024-01-15", 'visited_floors': ["2"]}],
+     r"Invalid floor number \(2\) in audit on 2024-01-15"),
+])
+def test_errors(account, audits, message):
+    with pytest.raises(ValueError, match=message):
+        FloorMatrix.build(account, audits)
+
+
+def test_overlapping_visits():
+    account = {'floors_min': 1, 'floors_max': 6, 'excluded_floors': [3]}
+    audits = [
+        {'date': "2024-01-15", 'visited_floors': [1, 2, 4]},
+        {'date': "2024-01-15", 'visited_floors': [2, 5, 6]},
+        {'date': "2024-02-20", 'visited_floors': [1, 4, 5]},
+    ]
+
+    matrix = build(account, audits)
+
+    assert matrix["2"]["01-2024"] == "visited"
+    assert matrix["1"] == {"01-2024": "visited", "02-2024": "visited"}
+    assert matrix["3"] == {"01-2024": "excluded", "02-2024": "excluded"}
+
+
+def test_dates_sorted_chronologically():
+    account = {'floors_min': 1, 'floors_max': 3, 'excluded_floors': []}
+    audits = [
+        {'date': "2024-02-15", 'visited_floors': [1]},
+        {'date': "2024-01-10", 'visited_floors': [2]},
+        {'date': "2023-03-20", 'visited_floors': [3]},
+    ]
+
+    matrix = build(account, audits)
+
+    assert list(matrix["1"]) == ["03-2023", "01-2024", "02-2024"]
+    assert matrix["1"] == {"03-2023": "skipped", "01-2024": "skipped", "02-2024": "visited"}
+
+
+def test_non_finite_floors():
+    # Visited and excluded floors without a row are ignored, as in the dashboard
+    account = {'floors_min': 1, 'floors_max': 3, 'excluded_floors': [math.inf]}
+    audits = [{'date': "2024-01-15", 'visited_floors': [math.inf, -math.inf, math.nan, 2.5, 2]}]
+    assert build(account, audits) == {"1": {"01-2024": "skipped"}, "2": {"01-2024": "visited"},
+                                      "3": {"01-2024": "skipped"}}
+
+    for floors_max in (math.inf, math.nan):
+        with pytest.raises(ValueError, match="Invalid floor range"):
+            FloorMatrix.build({'floors_min': 1, 'floors_max': floors_max, 'excluded_floors': []}, audits)
+        assert build_account_matrix({'id': "a", 'floors_min': 1, 'floors_max': floors_max}, audits) is None
+
+
+def test_account_matrix_reads_dashboard_fields(caplog):
+    account = {'id': "a", 'floors_min': "2", 'floors_max': 4, 'excluded_floors': "[3]"}
+    audits = [{'date': "2024-05-01", 'visited_floors': "[2, 3]"}]
+    assert build_account_matrix(account, audits).to_dict() == {
+        "2": {"05-2024": "visited"}, "3": {"05-2024": "excluded"}, "4": {"05-2024": "skipped"}}
+    assert build_account_matrix({'id': "b", 'floors_min': 5, 'floors_max': 1}, audits) is None
+
+    with caplog.at_level(logging.WARNING, logger="floor_matrix"):
+        assert build_account_matrix({'id': "c", 'floors_min': 1, 'floors_max': 4},
+                                    [{'date': "invalid-date", 'visited_floors': "[1]"}]) is None
+    assert caplog.messages == ["Could not build floor matrix for account c: Failed extracting dates: "
+                               "Invalid date format: invalid-date. Expected 'YYYY-MM-DD'."]
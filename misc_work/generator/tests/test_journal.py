@@ -0,0 +1,73 @@
+"""Tests of the import journal and resuming interrupted imports."""
+
+import json
+import logging
+import os
+
+import pytest
+
+from journal import ImportJournal
+
+
+def test_journal_is_created_by_first_record(tmp_path):
+    journal = ImportJournal(str(tmp_path / "out.json.journal")).open()
+    assert not os.path.exists(journal.path)
+    journal.record('create', 0, {'account': 'a', 'date': 'd', 'id': 'r1'})
+    journal.close()
+    assert journal.exists()
+    assert journal.load() == {0: {'op': 'create', 'index': 0, 'account': 'a', 'date': 'd', 'id': 'r1'}}
+
+
+def test_empty_journal_counts_as_absent(tmp_path):
+    path = tmp_path / "out.json.journal"
+    path.write_text("")
+    assert not ImportJournal(str(path)).exists()
+
+
+def test_apply_skips_done_audits_and_ignores_mismatches(caplog):
+    entries = {0: {'op': 'create', 'index': 0, 'account': 'a', 'date': 'd1', 'id': 'r1'},
+               1: {'op': 'create', 'index': 1, 'account': 'a', 'date': 'other', 'id': 'r2'}}
+    audits = [{'account': 'a', 'date': 'd1'}, {'account': 'a', 'date': 'd2'}]
+    with caplog.at_level(logging.WARNING, logger="journal"):
+        assert ImportJournal.apply(entries, audits, 'create') == [0]
+    assert audits == [{'account': 'a', 'date': 'd1', 'id': 'r1'}, {'account': 'a', 'date': 'd2'}]
+    assert caplog.messages == ["Journal entry 1 does not match the input file, ignoring it"]
+
+
+def test_partial_last_line_is_ignored(tmp_path):
+    path = tmp_path / "out.json.journal"
+    entry = {'op': 'update', 'index': 3, 'account': 'a', 'date': 'd', 'id': 'r'}
+    path.write_text(json.dumps(entry) + "\n" + '{"op": "upd')
+    assert ImportJournal(str(path)).load() == {3: entry}
+
+
+def test_interrupted_import_resumes_from_journal(server, wizard, json_file, tmp_path, monkeypatch):
+    output = str(tmp_path / "with_ids.json")
+    record = ImportJournal.record
+    interrupted = []
+
+    def interrupt_after_five(journal, op, index, audit):
+        record(journal, op, index, audit)
+        if index == 4 and not interrupted:
+            interrupted.append(index)
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(ImportJournal, "record", interrupt_after_five)
+    with pytest.raises(KeyboardInterrupt):
+        wizard("import", "-i", json_file, "-o", output)
+    journal = ImportJournal(ImportJournal.path_for(output))
+    done = journal.load()
+    assert sorted(done) == [0, 1, 2, 3, 4]
+
+    # Without --resume the journal is not overwritten
+    assert wizard("import", "-i", json_file, "-o", output) == 1
+    assert journal.load() == done
+
+    assert wizard("import", "-i", json_file, "-o", output, "--resume") == 0
+    with open(output) as file:
+        audits = json.load(file)
+    stored_ids = {record['id'] for record in server.store.list("audits", 1, 1000, None, None, False)['items']}
+    assert len(audits) == 30 and len(stored_ids) == 30
+    assert {audit['id'] for audit in audits} == stored_ids
+    assert [audits[index]['id'] for index in done] == [entry['id'] for entry in done.values()]
+    assert not os.path.exists(journal.path)
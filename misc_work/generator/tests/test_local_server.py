@@ -0,0 +1,82 @@
+"""Tests of the local PocketBase stand-in."""
+
+import requests
+import pytest
+
+from conftest import EMAIL, PASSWORD
+from local_server import ApiError, LocalPocketBase, RecordStore
+
+COLLECTION = "audits"
+
+
+def login(server: LocalPocketBase) -> dict:
+    response = requests.post(f"{server.url}/api/collections/users/auth-with-password",
+                             json={"identity": EMAIL, "password": PASSWORD})
+    assert response.status_code == 200
+    return {"Authorization": response.json()['token']}
+
+
+def test_records_need_a_valid_token(server):
+    url = f"{server.url}/api/collections/{COLLECTION}/records"
+    assert requests.get(url).status_code == 401
+    assert requests.post(f"{server.url}/api/collections/users/auth-with-password",
+                         json={"identity": EMAIL, "password": "wrong"}).status_code == 400
+
+    headers = login(server)
+    created = requests.post(url, json={'account': "a", 'date': "2024-01-02T00:00:00Z", 'visited_floors': "[1]",
+                                       'score': None}, headers=headers).json()
+    # Fields are coerced as PocketBase's field types would
+    assert (created['date'], created['visited_floors'], created['score']) == ("2024-01-02 00:00:00Z", [1], 0)
+    assert requests.get(f"{url}/{created['id']}", headers=headers).json() == created
+
+    server.tokens.clear()
+    assert requests.get(f"{url}/{created['id']}", headers=headers).status_code == 401
+
+
+def test_connection_close_is_acknowledged(server):
+    url = f"{server.url}/api/collections/{COLLECTION}/records"
+    assert requests.get(url, headers={"Connection": "close"}).headers['Connection'] == "close"
+    assert "Connection" not in requests.get(url).headers
+
+
+def test_list_filters_sorts_and_pages():
+    store = RecordStore()
+    for index, account in enumerate("bacab"):
+        store.create(COLLECTION, {'account': account, 'score': index})
+
+    result = store.list(COLLECTION, 1, 2, "account = 'a' || score >= 4", "-score", False)
+    # Equal sort keys keep insertion order, so offset pages never overlap
+    assert [item['score'] for item in result['items']] == [4, 3]
+    assert (result['totalItems'], result['totalPages']) == (3, 2)
+    assert [item['score'] for item in store.list(COLLECTION, 2, 2, None, "account", True)['items']] == [0, 4]
+
+    with pytest.raises(ApiError):
+        store.list(COLLECTION, 1, 2, "account = ", None, False)
+
+
+def test_batch_is_one_transaction(server):
+    headers = login(server)
+    url = f"/api/collections/{COLLECTION}/records"
+    response = requests.post(f"{server.url}/api/batch", headers=headers, json={"requests": [
+        {"method": "POST", "url": url, "body": {'account': "a"}},
+        {"method": "DELETE", "url": f"{url}/missing"},
+    ]})
+
+    assert response.status_code == 400
+    assert list(response.json()['data']['requests']) == ["1"]
+    assert server.store.list(COLLECTION, 1, 10, None, None, False)['totalItems'] == 0
+
+    server.batch_enabled = False
+    assert requests.post(f"{server.url}/api/batch", headers=headers, json={"requests": []}).status_code == 403
+
+
+def test_injected_errors_are_reproducible():
+    def statuses() -> list:
+        with LocalPocketBase(users={EMAIL: PASSWORD}, error_rate=0.5, retry_after=2, seed=3) as server:
+            responses = [requests.get(f"{server.url}/api/collections/{COLLECTION}/records") for _ in range(20)]
+        assert all(response.headers['Retry-After'] == "2" for response in responses if response.status_code == 503)
+        return [response.status_code for response in responses]
+
+    first = statuses()
+    assert set(first) == {401, 503}
+    assert statuses() == first
@@ -0,0 +1,136 @@
+"""Tests of the staged pipeline and the pipeline command."""
+
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from pipeline import Pipeline, PipelineError, iter_records
+
+# Seconds to wait for another stage before calling the test stuck
+TIMEOUT = 5
+
+
+def wait(event: threading.Event):
+    if not event.wait(TIMEOUT):
+        raise AssertionError("Stages did not overlap")
+
+
+def test_stages_overlap_and_keep_order():
+    first_reported = threading.Event()
+
+    def source():
+        yield [{'n': 0}, {'n': 1}]
+        # The report sink has to see the first chunk before the source goes on
+        wait(first_reported)
+        yield [{'n': 2}]
+
+    def report(chunks):
+        seen = []
+        for chunk in chunks:
+            seen.extend(record['n'] for record in chunk)
+            first_reported.set()
+        return seen
+
+    pipeline = Pipeline(queue_size=1)
+    pipeline.source("read", source())
+    pipeline.stage("double", lambda chunk: [{'n': record['n'] * 2} for record in chunk])
+    pipeline.sink("report", "double", report)
+    pipeline.sink("raw", "read", lambda chunks: [record['n'] for record in iter_records(chunks)])
+
+    assert pipeline.run() == {'report': [0, 2, 4], 'raw': [0, 1, 2]}
+    assert (pipeline.stats['double'].chunks, pipeline.stats['double'].records) == (2, 3)
+
+
+def test_queues_are_bounded():
+    produced = []
+    release = threading.Event()
+
+    def source():
+        for n in range(20):
+            produced.append(n)
+            yield [{'n': n}]
+
+    def slow(chunk):
+        wait(release)
+        return chunk
+
+    pipeline = Pipeline(queue_size=2)
+    pipeline.source("read", source())
+    pipeline.stage("slow", slow)
+    pipeline.sink("count", "slow", lambda chunks: sum(1 for _ in chunks))
+    thread = threading.Thread(target=lambda: produced.append(pipeline.run()))
+    thread.start()
+    # One chunk in the stage, two queued and one waiting to be put
+    time.sleep(0.5)
+    assert len(produced) == 4
+    release.set()
+    thread.join(TIMEOUT)
+    assert produced[-1] == {'count': 20}
+
+
+def test_failed_stage_stops_the_others():
+    def source():
+        n = 0
+        while True:
+            yield [{'n': n}]
+            n += 1
+
+    def convert(chunk):
+        if chunk[0]['n'] == 3:
+            raise ValueError("bad record")
+        return chunk
+
+    pipeline = Pipeline()
+    pipeline.source("read", source())
+    pipeline.stage("convert", convert)
+    pipeline.sink("report", "convert", lambda chunks: list(chunks))
+    with pytest.raises(PipelineError, match="convert stage failed: bad record") as error:
+        pipeline.run()
+    assert error.value.stage == "convert"
+
+    with pytest.raises(ValueError, match="taps unknown stage"):
+        Pipeline().source("read", []).sink("report", "import", list).run()
+
+
+def test_command_matches_the_separate_commands(server, wizard, yaml_file, tmp_path, monkeypatch):
+    import audit_wizard
+    monkeypatch.setattr(audit_wizard, "IMPORT_CHUNK_SIZE", 30)
+    monkeypatch.chdir(tmp_path)
+    input_file = yaml_file(5, 20)
+
+    assert wizard("pipeline", "-i", input_file, "-r", "pipeline.txt") == 0
+    # Intermediate files are only written on request
+    assert sorted(os.listdir(tmp_path)) == ["audits.yml", "pipeline.txt"]
+    assert wizard("report", "-i", input_file, "-o", "report.txt") == 0
+    with open("pipeline.txt") as pipeline_report, open("report.txt") as report:
+        assert pipeline_report.read() == report.read()
+
+    assert wizard("convert", "-f", "json", "-i", input_file, "-o", "converted.json") == 0
+    assert wizard("pipeline", "-i", input_file, "-r", "pipeline.txt", "--json-output", "pipeline.json",
+                  "-o", "with_ids.json", "--yaml-output", "with_ids.yml") == 0
+    with open("converted.json") as converted, open("pipeline.json") as pipeline_json:
+        assert json.load(pipeline_json) == json.load(converted)
+    with open("with_ids.json") as file:
+        imported = json.load(file)
+    stored = {record['id'] for record in server.store.list("audits", 1, 1000, None, None, False)['items']}
+    assert len(imported) == 100 and len(stored) == 200
+    assert {audit['id'] for audit in imported} <= stored
+    assert os.path.exists("with_ids.yml") and not os.path.exists("with_ids.json.journal")
+
+
+def test_command_skips_invalid_audits(server, wizard, tmp_path):
+    input_file = tmp_path / "audits.yml"
+    input_file.write_text("accounts:\n"
+                          "- id: a1\n"
+                          "  audits:\n"
+                          "  - {date: '2024-01-02', visited_floors: [1], score: 80}\n"
+                          "  - {date: '2024-02-03', visited_floors: [2], score: high}\n")
+    report = str(tmp_path / "report.txt")
+
+    assert wizard("pipeline", "-i", str(input_file), "-r", report) == 1
+    assert server.store.list("audits", 1, 10, None, None, False)['totalItems'] == 1
+    with open(report) as file:
+        assert "Total Audits: 1\n" in file.read()
@@ -0,0 +1,209 @@
+"""Tests of the PocketBase client against the local stand-in."""
+
+import pytest
+from urllib3.connection import HTTPConnection
+
+from conftest import EMAIL, PASSWORD
+from local_server import ApiError, LocalPocketBase
+from pocketbase_client import PocketBaseClient
+from retry import RetryPolicy
+
+COLLECTION = "audits"
+
+
+def make_audits(count: int):
+    return [{'account': f"acc{index % 3}", 'date': f"2024-01-{index + 1:02d} 00:00:00.000Z",
+             'visited_floors': "[1]", 'status': "completed", 'note': "", 'score': None}
+            for index in range(count)]
+
+
+def stored(server: LocalPocketBase) -> int:
+    return server.store.list(COLLECTION, 1, 1, None, None, False)['totalItems']
+
+
+@pytest.fixture
+def connect():
+    """Create authenticated clients of a server; they are closed after the test."""
+    clients = []
+
+    def create(server: LocalPocketBase, **options) -> PocketBaseClient:
+        options.setdefault('retry_policy', RetryPolicy(backoff_factor=0.01))
+        client = PocketBaseClient(server.url, **options)
+        clients.append(client)
+        assert client.authenticate(EMAIL, PASSWORD)
+        return client
+
+    yield create
+    for client in clients:
+        client.close()
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    """Count the TCP connections opened by urllib3."""
+    opened = []
+    connect = HTTPConnection.connect
+
+    def counting(connection):
+        opened.append(connection.host)
+        return connect(connection)
+
+    monkeypatch.setattr(HTTPConnection, "connect", counting)
+    return opened
+
+
+@pytest.mark.parametrize("keep_alive, expected", [(True, 1), (False, 11)])
+def test_connections_are_kept_alive(server, connect, connections, keep_alive, expected):
+    client = connect(server, keep_alive=keep_alive)
+    for audit in make_audits(10):
+        assert client.create_record(COLLECTION, audit) is not None
+
+    # Authentication and ten creates
+    assert len(connections) == expected
+    assert stored(server) == 10
+
+
+def test_headers_are_built_once_per_token(server):
+    with PocketBaseClient(server.url) as client:
+        assert client.authenticate(EMAIL, PASSWORD)
+        headers = client._get_headers()
+        assert client._get_headers() is headers
+        assert client.session.headers['Authorization'] == f"Bearer {client.token}"
+
+        assert client.list_records(COLLECTION) is not None
+        assert client._get_headers() is headers
+
+    assert client.session is None
+
+
+def test_concurrent_writes_keep_input_order(server, connect, monkeypatch):
+    create = server.store.create
+
+    def reject_bad(collection, data):
+        if data.get('note') == "bad":
+            raise ApiError(400, "Failed to create record.")
+        return create(collection, data)
+
+    monkeypatch.setattr(server.store, "create", reject_bad)
+    server.latency = 0.01
+    audits = make_audits(20)
+    audits[3]['note'] = "bad"
+    audits[7]['id'] = "existing"
+    client = connect(server)
+
+    done = []
+    imported = client.batch_import_audits(COLLECTION, audits, concurrency=8,
+                                          on_success=lambda index, audit: done.append(index))
+
+    # Existing IDs are skipped and failed creates keep the audit without an ID
+    assert imported[3] == audits[3] and imported[7] == audits[7]
+    assert sorted(done) == [index for index in range(20) if index not in (3, 7)]
+    assert [audit['date'] for audit in imported] == [audit['date'] for audit in audits]
+    assert stored(server) == 18
+
+    for audit in imported:
+        audit['note'] = "updated"
+    updated = []
+    assert client.batch_update_audits(COLLECTION, imported, concurrency=8,
+                                      on_success=lambda index, audit: updated.append(index)) == imported
+    # The audit without an ID is skipped and the unknown ID fails
+    assert sorted(updated) == sorted(done)
+    assert {record['note'] for record in server.store.list(COLLECTION, 1, 100, None, None, False)['items']} == \
+        {"updated"}
+
+
+@pytest.mark.parametrize("status", [403, 404, 405])
+def test_batch_falls_back_to_single_requests(server, connect, monkeypatch, status):
+    def reject(batch_requests):
+        raise ApiError(status, "Batch requests are not allowed.")
+
+    monkeypatch.setattr(server, "_handle_batch", reject)
+    client = connect(server)
+    done = []
+    imported = client.batch_import_audits(COLLECTION, make_audits(12), batch_size=5,
+                                          on_success=lambda index, audit: done.append(index))
+
+    assert not client.batch_supported
+    assert all(audit.get('id') for audit in imported)
+    assert sorted(done) == list(range(12))
+    assert stored(server) == 12
+
+
+def test_batches_are_used_when_supported(server, connect):
+    client = connect(server)
+    imported = client.batch_import_audits(COLLECTION, make_audits(12), batch_size=5)
+
+    assert client.batch_supported
+    assert all(audit.get('id') for audit in imported)
+    # Authentication and three batches
+    assert server.request_count == 4
+
+
+def test_failed_batch_is_rolled_back_and_retried_singly(server, connect):
+    client = connect(server)
+    ids = [audit['id'] for audit in client.batch_import_audits(COLLECTION, make_audits(3))]
+
+    # The missing record fails the whole batch; had the first deletes been kept,
+    # retrying them one by one would fail too
+    results = client.batch_delete_records(COLLECTION, ids[:2] + ["missing"] + ids[2:], batch_size=10)
+
+    assert results == [True, True, False, True]
+    assert stored(server) == 0
+
+
+def test_ambiguous_batch_is_not_sent_again(server, connect, monkeypatch):
+    handle_batch = server._handle_batch
+
+    def commit_then_fail(batch_requests):
+        handle_batch(batch_requests)
+        raise ApiError(500, "Something went wrong while processing your request.")
+
+    monkeypatch.setattr(server, "_handle_batch", commit_then_fail)
+    client = connect(server)
+    done = []
+    audits = make_audits(6)
+    imported = client.batch_import_audits(COLLECTION, audits, batch_size=5,
+                                          on_success=lambda index, audit: done.append(index))
+
+    # The batches were committed, so re-sending their creates would duplicate them
+    assert imported == audits and done == []
+    assert client.batch_supported
+    assert stored(server) == 6
+
+
+def test_failed_sub_responses_are_not_reported_as_written(server, connect, monkeypatch):
+    handle_batch = server._handle_batch
+
+    def fail_second(batch_requests):
+        status, responses = handle_batch(batch_requests)
+        responses[1] = {'status': 404, 'body': {}}
+        return status, responses
+
+    monkeypatch.setattr(server, "_handle_batch", fail_second)
+    client = connect(server)
+    done = []
+    imported = client.batch_import_audits(COLLECTION, make_audits(3), batch_size=5,
+                                          on_success=lambda index, audit: done.append(index))
+
+    assert done == [0, 2]
+    assert 'id' not in imported[1]
+
+
+def test_iter_records_pages_through_collection(server, connect, monkeypatch):
+    client = connect(server)
+    client.batch_import_audits(COLLECTION, make_audits(25), batch_size=10)
+    queries = []
+    handle = server.handle
+
+    def recording(method, path, query, body, authorization):
+        queries.append(query)
+        return handle(method, path, query, body, authorization)
+
+    monkeypatch.setattr(server, "handle", recording)
+    records = list(client.iter_records(COLLECTION, sort="-date", fields=["id", "date"], page_size=10))
+
+    assert [record['date'] for record in records] == sorted((audit['date'] for audit in make_audits(25)),
+                                                            reverse=True)
+    assert all(set(record) == {"id", "date"} for record in records)
+    assert [query['page'] for query in queries] == [["1"], ["2"], ["3"]]
+    assert all(query['skipTotal'] == ["1"] for query in queries)
@@ -0,0 +1,80 @@
+"""Tests of the streaming YAML and JSON readers."""
+
+import io
+import json
+import tracemalloc
+
+import yaml
+
+from converter import AuditConverter
+from readers import YamlAccountReader, iter_json_audits, iter_yaml_accounts, iter_yaml_audits
+from synthetic import SyntheticDataset
+
+YAML_EDGE_CASES = """\
+accounts:
+- id: a1
+  audits:
+  - date: 2024-01-02
+    visited_floors: [1, 2]
+    status: completed
+    note: "multi
+      line"
+    score: ~
+  - {date: '2024-02-03', visited_floors: [], score: 0x10}
+- id: a2
+  audits: []
+- id: a3
+"""
+
+
+def test_yaml_accounts_match_safe_load():
+    expected = yaml.safe_load(YAML_EDGE_CASES)['accounts']
+    assert list(iter_yaml_accounts(io.StringIO(YAML_EDGE_CASES))) == expected
+
+
+def test_yaml_audits_match_safe_load(yaml_file):
+    path = yaml_file(accounts=4, audits=15)
+    with open(path) as file:
+        expected = [(account['id'], audit) for account in yaml.safe_load(file)['accounts']
+                    for audit in account['audits']]
+    with open(path) as file:
+        assert list(iter_yaml_audits(file)) == expected
+
+
+def test_json_array_and_lines_match_json_load(tmp_path):
+    audits = list(SyntheticDataset(3, 10, seed=2).iter_json_audits())
+    array_path = tmp_path / "audits.json"
+    lines_path = tmp_path / "audits.jsonl"
+    with open(array_path, 'w') as file:
+        AuditConverter.write_json_stream(audits, file)
+    with open(lines_path, 'w') as file:
+        AuditConverter.write_json_lines(audits, file)
+
+    with open(array_path) as file:
+        assert json.load(file) == audits
+    with open(array_path) as file:
+        assert list(iter_json_audits(file)) == audits
+    with open(lines_path) as file:
+        assert list(iter_json_audits(file)) == audits
+
+
+def _peak_memory(path: str, read) -> int:
+    tracemalloc.start()
+    try:
+        with open(path) as file:
+            for _ in read(file):
+                pass
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_yaml_reader_memory_stays_flat(yaml_file):
+    small = yaml_file(accounts=20, audits=100, name="small.yml")
+    large = yaml_file(accounts=150, audits=100, name="large.yml")
+
+    for read in (iter_yaml_audits, YamlAccountReader):
+        small_peak = _peak_memory(small, read)
+        large_peak = _peak_memory(large, read)
+        # Ten times the audits may not take much more memory than one account block
+        assert large_peak < small_peak * 2 + (1 << 20), (read, small_peak, large_peak)
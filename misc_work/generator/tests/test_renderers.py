@@ -0,0 +1,138 @@
+"""Tests of the report model and its renderers."""
+
+import csv
+import io
+import json
+import math
+
+import pytest
+
+from aggregator import AuditAggregator, iter_yaml_records
+from renderers import (ReportModel, read_columnar, render_columnar, render_csv, render_json, render_text,
+                       report_output_paths)
+from reporter import AuditReporter
+from stats import DistributionStats
+
+DATA = {'accounts': [
+    {'id': "b2", 'audits': [{'date': "2023-12-30", 'visited_floors': [1, 2], 'score': 80},
+                            {'date': "2024-01-09", 'visited_floors': [2], 'score': None}]},
+    {'id': "a1", 'audits': []},
+]}
+
+# As the text report was written before the report model existed
+TEXT_REPORT = """\
+============================================================
+AUDIT RECORDS REPORT
+============================================================
+
+Total Accounts: 2
+Total Audits: 2
+Audits Missing Scores: 1 (50.0% of all audits)
+
+AUDITS BY YEAR
+------------------------------------------------------------
+2023: 1 audits (50.0%)
+2024: 1 audits (50.0%)
+
+TOP 10 MOST FREQUENTLY VISITED FLOORS
+------------------------------------------------------------
+Floor 2: 2 visits (100.0%)
+Floor 1: 1 visits (50.0%)
+
+ACCOUNT SUMMARY
+------------------------------------------------------------
+Account: b2
+  Audit Count: 2
+  First Audit: 2023-12-30
+  Last Audit: 2024-01-09
+  Missing Scores: 1 (50.0%)
+  Avg. Days Between Audits: 10.0
+
+Account: a1
+  Audit Count: 0
+  First Audit: N/A
+  Last Audit: N/A
+  Missing Scores: 0 (0.0%)
+  Avg. Days Between Audits: N/A
+"""
+
+
+def model(**options) -> ReportModel:
+    return ReportModel(AuditAggregator().add_records(iter_yaml_records(DATA)), **options)
+
+
+def test_text_report_is_unchanged():
+    assert render_text(model(sort_accounts=False)) == TEXT_REPORT
+    assert AuditReporter.generate_report(DATA, 'yaml') == TEXT_REPORT
+
+
+def test_structured_formats_hold_the_same_values():
+    report = model()
+    document = json.loads(render_json(report))
+    assert document['floors'] == [{'floor': 2, 'visits': 2}, {'floor': 1, 'visits': 1}]
+    assert document['distribution'] is None
+    assert document['accounts'] == [
+        {'id': "a1", 'audit_count': 0, 'missing_scores': 0, 'first_audit': None, 'last_audit': None,
+         'avg_days_between': None},
+        {'id': "b2", 'audit_count': 2, 'missing_scores': 1, 'first_audit': "2023-12-30",
+         'last_audit': "2024-01-09", 'avg_days_between': 10.0}]
+
+    rows = list(csv.DictReader(io.StringIO(render_csv(report))))
+    assert {(row['table'], row['key'], row['field']): row['value'] for row in rows} == {
+        ("summary", "", "total_accounts"): "2", ("summary", "", "total_audits"): "2",
+        ("summary", "", "missing_scores"): "1",
+        ("year", "2023", "audits"): "1", ("year", "2024", "audits"): "1",
+        ("floor", "2", "visits"): "2", ("floor", "1", "visits"): "1",
+        **{("account", account['id'], field): "" if value is None else f"{value}"
+           for account in document['accounts'] for field, value in account.items() if field != 'id'}}
+
+    tables = read_columnar(render_columnar(report))
+    assert tables['summary'] == {'total_accounts': [2], 'total_audits': [2], 'missing_scores': [1]}
+    assert tables['floors'] == {'floor': ["2", "1"], 'visits': [2, 1]}
+    accounts = tables['accounts']
+    assert accounts['id'] == ["a1", "b2"] and accounts['first_audit'] == ["", "2023-12-30"]
+    assert math.isnan(accounts['avg_days_between'][0]) and accounts['avg_days_between'][1] == 10.0
+    assert 'distribution' not in tables
+
+
+def test_distribution_in_every_format():
+    # No gaps and one score
+    distribution = DistributionStats([], [80], 80, 6400)
+    report = model(distribution=distribution)
+
+    assert "Days Between Audits: N/A" in render_text(report)
+    assert ("Scores: mean 80.0, stddev 0.0, p25 80.0, p50 80.0, p75 80.0, p90 80.0 "
+            "(1 scored audits)") in render_text(report)
+    assert json.loads(render_json(report))['distribution'] == {
+        'gap_count': 0, 'gap_median': None, 'gap_p90': None, 'score_count': 1, 'score_mean': 80.0,
+        'score_stddev': 0.0, 'score_p25': 80.0, 'score_p50': 80.0, 'score_p75': 80.0, 'score_p90': 80.0}
+    assert "distribution,,gap_median,\n" in render_csv(report)
+    columns = read_columnar(render_columnar(report))['distribution']
+    assert math.isnan(columns['gap_median'][0]) and columns['score_p50'] == [80.0]
+
+
+def test_columnar_rejects_other_data():
+    with pytest.raises(ValueError, match="Not a columnar audit report"):
+        read_columnar(b"PK\x03\x04")
+    data = bytearray(render_columnar(model()))
+    data[4] = 9
+    with pytest.raises(ValueError, match="Unsupported columnar report version: 9"):
+        read_columnar(bytes(data))
+
+
+def test_several_formats_from_one_aggregation(tmp_path, monkeypatch):
+    path = tmp_path / "audits.json"
+    path.write_text(json.dumps([{'account': "a", 'date': "2024-01-02 00:00:00Z", 'visited_floors': [3],
+                                 'score': None}]))
+    calls = []
+    aggregate_file = AuditReporter.aggregate_file
+    monkeypatch.setattr(AuditReporter, "aggregate_file",
+                        lambda *args: calls.append(args) or aggregate_file(*args))
+
+    output = str(tmp_path / "report.out")
+    assert report_output_paths(output, ["csv"]) == [("csv", output)]
+    assert AuditReporter.generate_report_from_file(str(path), output, formats=["text", "json", "columnar"])
+    assert len(calls) == 1
+    assert (tmp_path / "report.txt").read_text().startswith("=" * 60)
+    assert json.loads((tmp_path / "report.json").read_text())['total_audits'] == 1
+    assert read_columnar((tmp_path / "report.audr").read_bytes())['years'] == {'year': [2024], 'audits': [1]}
@@ -0,0 +1,87 @@
+"""Tests of the incremental report cache."""
+
+import io
+import json
+
+import pytest
+
+from report_cache import ReportCache, dump_partial, scan_blocks
+from reporter import AuditReporter
+from synthetic import SyntheticDataset
+
+
+def write_dataset(tmp_path, name: str, dataset: SyntheticDataset) -> str:
+    """Write a dataset in the format its file name asks for, as the converter would."""
+    path = str(tmp_path / name)
+    with open(path, 'w') as file:
+        if name.endswith('.yml'):
+            dataset.write_yaml(file)
+        elif name.endswith('.jsonl'):
+            for audit in dataset.iter_json_audits():
+                file.write(json.dumps(audit) + "\n")
+        else:
+            json.dump(list(dataset.iter_json_audits()), file, indent=2)
+    return path
+
+
+def assert_same_aggregate(path: str, cache: ReportCache):
+    assert dump_partial(cache.aggregate_file(path)) == dump_partial(AuditReporter.aggregate_file(path))
+
+
+@pytest.mark.parametrize("name", ["audits.yml", "audits.json", "audits.jsonl"])
+def test_unchanged_blocks_are_reused(tmp_path, name):
+    path = write_dataset(tmp_path, name, SyntheticDataset(6, 10, seed=3))
+    cache = ReportCache(ReportCache.path_for(path))
+
+    assert_same_aggregate(path, cache)
+    assert (cache.hits, cache.misses) == (0, 6)
+    assert_same_aggregate(path, cache)
+    assert (cache.hits, cache.misses) == (6, 0)
+
+    # Replacing one account changes only its block
+    with open(path) as file:
+        text = file.read()
+    account_id = SyntheticDataset(6, 10, seed=3).account(2)['id']
+    with open(path, 'w') as file:
+        file.write(text.replace(account_id, "renamed0000000"))
+    assert_same_aggregate(path, cache)
+    assert (cache.hits, cache.misses) == (5, 1)
+
+
+@pytest.mark.parametrize("name", ["audits.yml", "audits.json", "audits.jsonl"])
+def test_blocks_do_not_depend_on_chunk_size(tmp_path, name):
+    path = write_dataset(tmp_path, name, SyntheticDataset(4, 8, seed=5))
+    with open(path, 'rb') as file:
+        expected = scan_blocks(file, name.endswith('.yml'))
+    for chunk_size in (1, 7, 100):
+        with open(path, 'rb') as file:
+            assert scan_blocks(file, name.endswith('.yml'), chunk_size) == expected
+    assert [kind for kind, _, _, _ in expected] == [expected[0][0]] * 4
+
+
+@pytest.mark.parametrize("name, text, count", [
+    # As yaml.dump writes it, blank lines inside an entry included
+    ("audits.yml", "accounts:\n- id: a\n  audits: []\n- id: b\n  note: |-\n    x\n\n    y\n  audits: []\n", 2),
+    # Other layouts are one block
+    ("audits.yml", "---\naccounts:\n- id: a\n  audits: []\n- id: b\n  audits: []\n", 1),
+    ("audits.yml", "accounts:\n  - id: a\n    audits: []\n  - id: b\n    audits: []\n", 1),
+    ("audits.yml", "accounts:\n- id: a\n  audits: []\n# b\n- id: b\n  audits: []\n", 1),
+    ("audits.yml", "accounts:\n- id: a\n  audits: []\naccounts: []\n", 1),
+    ("audits.yml", "accounts: [{id: a, audits: []}, {id: b, audits: []}]\n", 1),
+    ("audits.yml", "accounts:\r\n- id: a\r\n  audits: []\r\n", 1),
+    ("audits.json", json.dumps([{'account': "a"}, {'account': "b"}], indent=2), 2),
+    ("audits.json", json.dumps([{'account': "a"}, {'account': "b"}], indent=4), 1),
+    ("audits.json", json.dumps([{'date': "", 'account': "a"}, {'account': "b"}], indent=2), 1),
+    ("audits.json", " " + json.dumps([{'account': "a"}, {'account': "b"}], indent=2), 1),
+    ("audits.json", "[]", 1),
+    ("audits.jsonl", '{"account": "a"}\n\n{"account": "b"}\n', 2),
+    ("audits.jsonl", '{"account": "a"}\n{"date": "", "account": "b"}\n', 1),
+])
+def test_layouts(tmp_path, name, text, count):
+    assert len(scan_blocks(io.BytesIO(text.encode()), name.endswith('.yml'))) == count
+    path = str(tmp_path / name)
+    with open(path, 'w', newline='') as file:
+        file.write(text)
+    cache = ReportCache(ReportCache.path_for(path))
+    assert_same_aggregate(path, cache)
+    assert cache.misses == count
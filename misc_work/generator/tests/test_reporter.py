@@ -0,0 +1,73 @@
+"""Tests of reports on several audit files."""
+
+import json
+
+import pytest
+import yaml
+
+from readers import expand_audit_paths
+from reporter import AuditReporter
+from synthetic import SyntheticDataset
+
+
+def read(path: str) -> str:
+    with open(path) as file:
+        return file.read()
+
+
+def write_shards(tmp_path, name: str, dataset: SyntheticDataset) -> list:
+    """Write a dataset to one file and split it over three shards in the same order."""
+    suffix = name.rsplit('.', 1)[1]
+    if suffix == 'yml':
+        accounts = list(dataset.iter_accounts())
+        parts = [accounts[:2], accounts[2:3], accounts[3:]]
+        texts = [yaml.safe_dump({'accounts': part}, sort_keys=False) for part in [accounts] + parts]
+    else:
+        # Shards split in the middle of an account, as per-year files do
+        lines = [json.dumps(audit) + "\n" for audit in dataset.iter_json_audits()]
+        parts = [lines[:7], lines[7:25], lines[25:]]
+        texts = ["".join(part) for part in [lines] + parts]
+    paths = []
+    for index, text in enumerate(texts):
+        path = tmp_path / (name if index == 0 else f"shards/{index}.{suffix}")
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(text)
+        paths.append(str(path))
+    return paths
+
+
+@pytest.mark.parametrize("name", ["audits.yml", "audits.jsonl"])
+@pytest.mark.parametrize("workers", [1, 2])
+def test_shards_report_like_one_file(tmp_path, name, workers):
+    whole, *shards = write_shards(tmp_path, name, SyntheticDataset(5, 10, seed=4))
+    formats = ("text", "json")
+    assert AuditReporter.generate_report_from_file(whole, str(tmp_path / "whole.txt"), formats=formats)
+    assert AuditReporter.generate_report_from_files(shards, str(tmp_path / "shards.txt"), workers=workers,
+                                                    formats=formats)
+
+    assert read(tmp_path / "shards.txt") == read(tmp_path / "whole.txt")
+    assert read(tmp_path / "shards.json") == read(tmp_path / "whole.json")
+
+
+def test_report_command_expands_directories(tmp_path, wizard):
+    whole, *shards = write_shards(tmp_path, "audits.jsonl", SyntheticDataset(5, 10, seed=4))
+    assert AuditReporter.generate_report_from_file(whole, str(tmp_path / "whole.txt"))
+
+    output = str(tmp_path / "report.txt")
+    assert wizard("report", "-i", str(tmp_path / "shards"), "-o", output, "--workers", "2") == 0
+    assert read(output) == read(tmp_path / "whole.txt")
+
+    # --distribution needs every audit of an account in one table
+    assert wizard("report", "-i", str(tmp_path / "shards"), "-o", output, "--distribution") == 1
+
+
+def test_expand_audit_paths(tmp_path):
+    for name in ("b/2.json", "b/1.yml", "b/notes.txt", "a.jsonl"):
+        (tmp_path / name).parent.mkdir(exist_ok=True)
+        (tmp_path / name).write_text("")
+    directory, pattern = str(tmp_path / "b"), str(tmp_path / "**" / "*.json*")
+
+    assert expand_audit_paths([directory, pattern]) == [
+        str(tmp_path / "b" / "1.yml"), str(tmp_path / "b" / "2.json"), str(tmp_path / "a.jsonl")]
+    with pytest.raises(FileNotFoundError, match="No audit files found"):
+        expand_audit_paths([str(tmp_path / "*.yaml")])
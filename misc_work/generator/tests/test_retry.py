@@ -0,0 +1,87 @@
+"""Tests of the retry policy and its use by the client."""
+
+import logging
+import time
+
+import pytest
+
+from conftest import EMAIL, PASSWORD
+from local_server import LocalPocketBase
+from pocketbase_client import PocketBaseClient
+from retry import RetryPolicy
+
+COLLECTION = "audits"
+
+
+def make_audits(count: int):
+    return [{'account': "acc", 'date': f"2024-01-{index + 1:02d} 00:00:00.000Z", 'visited_floors': "[1]"}
+            for index in range(count)]
+
+
+def stored(server: LocalPocketBase) -> int:
+    return server.store.list(COLLECTION, 1, 1, None, None, False)['totalItems']
+
+
+@pytest.mark.parametrize("method, status, expected", [
+    ("GET", 502, True),
+    ("PATCH", 504, True),
+    ("POST", 429, True),
+    ("POST", 503, True),
+    ("POST", 502, False),
+    ("post", 504, False),
+    ("GET", 500, False),
+])
+def test_status_retries_depend_on_method(method, status, expected):
+    assert RetryPolicy().should_retry_status(method, status, 0) is expected
+
+
+def test_retry_limits():
+    policy = RetryPolicy(max_retries=2, status_max_retries={429: 4}, jitter=False, backoff_factor=1,
+                         max_backoff=3)
+    assert policy.should_retry_status("GET", 503, 1) and not policy.should_retry_status("GET", 503, 2)
+    assert policy.should_retry_status("POST", 429, 3)
+    assert not policy.should_retry_error("POST", False, 0) and policy.should_retry_error("POST", True, 0)
+    assert [policy.backoff(retries) for retries in range(3)] == [1, 2, 3]
+    assert policy.backoff(0, retry_after=10) == 3
+
+
+def test_injected_errors_are_retried():
+    with LocalPocketBase(users={EMAIL: PASSWORD}, error_rate=0.3, retry_after=0.01, seed=7) as server:
+        with PocketBaseClient(server.url, retry_policy=RetryPolicy(max_retries=10)) as client:
+            assert client.authenticate(EMAIL, PASSWORD)
+            imported = client.batch_import_audits(COLLECTION, make_audits(30), concurrency=4)
+
+        assert all(audit.get('id') for audit in imported)
+        # Errors are injected before the request is handled, so retried creates are not duplicated
+        assert stored(server) == 30
+        assert server.request_count > 31
+
+
+def test_retries_honour_retry_after_and_give_up(server, caplog):
+    with PocketBaseClient(server.url, retry_policy=RetryPolicy(max_retries=2)) as client:
+        assert client.authenticate(EMAIL, PASSWORD)
+        server.retry_after = 0.1
+        server.error_rate = 1.0
+        requests_before = server.request_count
+
+        start = time.perf_counter()
+        with caplog.at_level(logging.WARNING, logger="pocketbase_client"):
+            assert client.create_record(COLLECTION, make_audits(1)[0]) is None
+
+    assert time.perf_counter() - start >= 0.2
+    assert server.request_count - requests_before == 3
+    assert caplog.messages == [
+        f"Received status 503 on POST {server.url}/api/collections/{COLLECTION}/records, retrying in 0.1s"] * 2
+
+
+def test_creates_are_not_retried_after_a_gateway_error(server):
+    with PocketBaseClient(server.url, retry_policy=RetryPolicy(backoff_factor=0.01)) as client:
+        assert client.authenticate(EMAIL, PASSWORD)
+        server.error_rate = 1.0
+        server.error_status = 502
+        requests_before = server.request_count
+
+        assert client.create_record(COLLECTION, make_audits(1)[0]) is None
+        assert server.request_count - requests_before == 1
+        assert client.get_record(COLLECTION, "missing") is None
+        assert server.request_count - requests_before == 7
@@ -0,0 +1,62 @@
+"""Tests of the report statistics backends."""
+
+import pytest
+
+import stats
+from converter import AuditConverter
+from renderers import ReportModel, render_text
+from report_cache import dump_partial
+from synthetic import SyntheticDataset
+from table import AuditTable
+
+
+def tables():
+    dataset = SyntheticDataset(12, 30, seed=6)
+    accounts = list(dataset.iter_accounts())
+    accounts[0]['audits'] = []
+    yield "yaml", AuditTable.from_yaml({'accounts': accounts})
+
+    audits = AuditConverter.yaml_to_json({'accounts': accounts})
+    audits[3]['date'] = "not a date"
+    audits[4]['visited_floors'] = "[1,2]"
+    audits[5]['score'] = 3.5
+    audits[6]['status'] = "archived"
+    audits[7] = {'account': audits[7]['account'], 'date': audits[7]['date'], 'visited_floors': "[-3, 100000]"}
+    audits[8]['visited_floors'] = "[-2000000000, 2000000000]"
+    yield "irregular json", AuditTable.from_json_audits(audits)
+
+    yield "empty", AuditTable.from_json_audits([])
+
+
+def summary(result: stats.TableStatistics):
+    distribution = result.distribution
+    return (dump_partial(result.aggregate), list(result.aggregate.floor_counts.items()),
+            vars(distribution),
+            render_text(ReportModel(result.aggregate, distribution=distribution)))
+
+
+@pytest.mark.parametrize("name, table", list(tables()), ids=lambda value: value if isinstance(value, str) else "")
+def test_numpy_backend_matches_python(name, table):
+    pytest.importorskip("numpy")
+    numpy_stats = stats.compute_table_stats(table, 'numpy')
+    python_stats = stats.compute_table_stats(table, 'python')
+
+    assert (numpy_stats.backend, python_stats.backend) == ("numpy", "python")
+    assert summary(numpy_stats) == summary(python_stats)
+
+
+def test_falls_back_without_numpy(monkeypatch):
+    monkeypatch.setattr(stats, "HAVE_NUMPY", False)
+    table = next(tables())[1]
+    assert stats.compute_table_stats(table, 'numpy').backend == "python"
+    assert stats.compute_table_stats(table).backend == "python"
+    with pytest.raises(ValueError, match="Unknown statistics backend"):
+        stats.compute_table_stats(table, 'fortran')
+
+
+def test_percentile_matches_numpy():
+    np = pytest.importorskip("numpy")
+    values = sorted([7, 1, 3, 3, 10, 42, 5])
+    for q in (0, 10, 25, 50, 75, 90, 99, 100):
+        assert stats.percentile(values, q) == pytest.approx(float(np.percentile(values, q)), abs=0, rel=1e-12)
+    assert stats.percentile([], 50) is None
@@ -0,0 +1,84 @@
+"""Tests of the diff-based sync."""
+
+import logging
+
+from conftest import EMAIL, PASSWORD
+from local_server import ApiError
+from pocketbase_client import PocketBaseClient
+from syncer import AuditSyncer
+
+COLLECTION = "audits"
+
+
+def audit(account: str, day: int, **fields):
+    return dict({'account': account, 'date': f"2024-01-{day:02d}T00:00:00.000Z", 'status': "completed",
+                 'note': "", 'visited_floors': "[1]", 'score': None}, **fields)
+
+
+def test_plan_matches_by_id_then_account_and_date():
+    server_state = {record_id: AuditSyncer.normalize_audit(record) for record_id, record in {
+        "r1": audit("a", 1, score=0),
+        "r2": audit("a", 2),
+        "r3": audit("b", 1),
+        "r4": audit("c", 1),
+    }.items()}
+    audits = [
+        audit("a", 2, id="r1"),             # moved to another day, matched by ID
+        audit("a", 2, visited_floors=[1]),  # same content in another representation
+        audit("b", 1, note="Changed"),
+        audit("b", 1),                      # second audit on the same day
+    ]
+
+    plan = AuditSyncer(None, COLLECTION).plan(audits, server_state, delete_missing=True)
+
+    assert plan.matched_ids == {0: "r1", 1: "r2", 2: "r3"}
+    assert plan.updates == [(0, "r1", {'date': "2024-01-02T00:00:00.000Z"}), (2, "r3", {'note': "Changed"})]
+    assert plan.creates == [3] and plan.deletes == ["r4"]
+    assert plan.summary() == "1 to create, 2 to update, 1 to delete, 1 unchanged"
+
+
+def test_failed_writes_are_counted(server, monkeypatch, caplog):
+    with PocketBaseClient(server.url) as client:
+        assert client.authenticate(EMAIL, PASSWORD)
+        syncer = AuditSyncer(client, COLLECTION)
+        audits = [audit("a", day) for day in range(1, 6)]
+        synced = syncer.apply(syncer.plan(audits, syncer.fetch_server_state()))
+        assert syncer.failed == 0 and all(audit.get('id') for audit in synced)
+
+        update = server.store.update
+
+        def reject_second(collection, record_id, data):
+            if record_id == synced[1]['id']:
+                raise ApiError(400, "Failed to update record.")
+            return update(collection, record_id, data)
+
+        monkeypatch.setattr(server.store, "update", reject_second)
+        for changed in synced:
+            changed['note'] = "Changed"
+        with caplog.at_level(logging.INFO, logger="syncer"):
+            syncer.apply(syncer.plan(synced, syncer.fetch_server_state()), batch_size=2)
+
+    assert syncer.failed == 1
+    assert [record.getMessage() for record in caplog.records if record.name == "syncer"] == \
+        ["Updated 4 of 5 changed records"]
+
+
+def test_server_state_is_paged_in_id_order(server, monkeypatch):
+    queries = []
+    handle = server.handle
+
+    def recording(method, path, query, body, authorization):
+        if method == "GET":
+            queries.append(query)
+        return handle(method, path, query, body, authorization)
+
+    monkeypatch.setattr(server, "handle", recording)
+    for day in range(1, 8):
+        server.store.create(COLLECTION, audit("a", 8 - day))
+
+    with PocketBaseClient(server.url) as client:
+        assert client.authenticate(EMAIL, PASSWORD)
+        state = AuditSyncer(client, COLLECTION).fetch_server_state(page_size=3)
+
+    assert list(state) == sorted(state) and len(state) == 7
+    assert [query['sort'] for query in queries] == [["id"]] * 3
@@ -0,0 +1,75 @@
+"""Tests of the columnar audit table."""
+
+import pytest
+
+from aggregator import AuditAggregator, iter_json_records, iter_yaml_records
+from converter import AuditConverter
+from report_cache import dump_partial
+from synthetic import SyntheticDataset
+from table import OTHER_STATUS, AuditTable
+
+REGULAR = {'account': "a", 'date': "2024-01-15T00:00:00.000Z", 'status': "completed", 'note': "",
+           'visited_floors': "[1, 2]", 'score': 80}
+
+
+@pytest.mark.parametrize("changes, overridden", [
+    ({'status': "archived"}, {'status': "archived"}),
+    ({'status': None}, {'status': None}),
+    ({'score': 3.5}, {'score': 3.5}),
+    ({'score': True}, {'score': True}),
+    ({'score': 2 ** 60}, {}),
+    ({'date': "2024-01-15"}, {'date': "2024-01-15"}),
+    ({'date': "not a date"}, {'date': "not a date"}),
+    ({'visited_floors': "[1,2]"}, {'visited_floors': "[1,2]"}),
+    ({'visited_floors': "[1.5]"}, {'visited_floors': "[1.5]"}),
+    ({'visited_floors': "[4294967296]"}, {'visited_floors': "[4294967296]"}),
+    ({'visited_floors': None}, {'visited_floors': None}),
+    ({'id': None}, {'id': None}),
+    ({'id': "r1"}, {}),
+])
+def test_values_outside_the_columns_are_overrides(changes, overridden):
+    audit = dict(REGULAR, **changes)
+    table = AuditTable.from_json_audits([REGULAR, audit])
+
+    assert table.to_json_audits() == [REGULAR, audit]
+    assert table.overrides(1) == overridden and not table.is_raw(1)
+    assert table.irregular_rows() == ([1] if overridden else [])
+    if 'status' in overridden:
+        assert table.statuses[1] == OTHER_STATUS and table.status(1) == overridden['status']
+
+
+@pytest.mark.parametrize("audit", [
+    {key: value for key, value in REGULAR.items() if key != 'note'},
+    dict(REGULAR, extra="kept"),
+    dict(reversed(list(REGULAR.items()))),
+])
+def test_records_with_other_keys_are_kept_raw(audit):
+    table = AuditTable.from_json_audits([REGULAR, audit, REGULAR])
+
+    assert table.is_raw(1) and not table.is_raw(2)
+    assert table.irregular_rows() == [1]
+    restored = table.to_json_audits()
+    assert restored == [REGULAR, audit, REGULAR]
+    assert list(restored[1]) == list(audit)
+    assert dump_partial(AuditAggregator().add_records(table.iter_records())) == \
+        dump_partial(AuditAggregator().add_records(iter_json_records([REGULAR, audit, REGULAR])))
+
+
+def test_tables_convert_and_aggregate_like_the_dicts():
+    dataset = SyntheticDataset(4, 6, seed=9)
+    accounts = list(dataset.iter_accounts())
+    accounts[1]['audits'] = []
+    accounts[2]['audits'][0]['score'] = 3.5
+    yaml_data = {'accounts': accounts}
+
+    table = AuditTable.from_yaml(yaml_data)
+    assert AuditConverter.table_to_json(table) == AuditConverter.yaml_to_json(yaml_data)
+    assert table.account_ids == [account['id'] for account in accounts]
+    assert dump_partial(AuditAggregator().add_records(table.iter_records())) == \
+        dump_partial(AuditAggregator().add_records(iter_yaml_records(yaml_data)))
+
+    audits = AuditConverter.yaml_to_json(yaml_data)
+    table = AuditTable.from_json_audits(audits)
+    assert AuditConverter.table_to_yaml(table) == AuditConverter.json_to_yaml(audits)
+    assert dump_partial(AuditAggregator().add_records(table.iter_records())) == \
+        dump_partial(AuditAggregator().add_records(iter_json_records(audits)))
@@ -0,0 +1,65 @@
+"""Tests of auth token caching and refresh."""
+
+import os
+import stat
+
+from conftest import EMAIL, PASSWORD
+from pocketbase_client import TOKEN_REFRESH_MARGIN, PocketBaseClient
+from token_cache import TokenCache, decode_token_expiry
+
+COLLECTION = "audits"
+AUDIT = {'account': "acc", 'date': "2024-01-01 00:00:00.000Z", 'visited_floors': "[1]"}
+
+
+def test_token_cache_round_trip(tmp_path, server):
+    cache = TokenCache(str(tmp_path / "cache" / "tokens.json"))
+    assert cache.load(server.url, EMAIL) is None
+
+    token = server.issue_token(EMAIL)
+    cache.save(server.url, EMAIL, token)
+    assert cache.load(server.url, EMAIL) == token
+    assert cache.load(server.url, "other@example.com") is None
+    assert stat.S_IMODE(os.stat(cache.path).st_mode) == 0o600
+    assert abs(decode_token_expiry(token) - server.token_ttl - os.path.getmtime(cache.path)) < 5
+    assert decode_token_expiry("not-a-token") is None
+
+
+def test_cached_token_is_reused(tmp_path, server):
+    path = str(tmp_path / "tokens.json")
+    with PocketBaseClient(server.url, token_cache_path=path) as client:
+        assert client.authenticate(EMAIL, PASSWORD)
+        token = client.token
+
+    issued = len(server.tokens)
+    with PocketBaseClient(server.url, token_cache_path=path) as client:
+        assert client.authenticate(EMAIL, PASSWORD)
+        assert client.token == token
+        assert client.create_record(COLLECTION, AUDIT) is not None
+    assert len(server.tokens) == issued
+
+
+def test_token_close_to_expiry_is_refreshed(server):
+    server.token_ttl = TOKEN_REFRESH_MARGIN - 60
+    with PocketBaseClient(server.url) as client:
+        assert client.authenticate(EMAIL, PASSWORD)
+        old_token = client.token
+        server.token_ttl = 3600
+
+        # The first token already expires within the refresh margin
+        assert client.create_record(COLLECTION, AUDIT) is not None
+        assert client.token_expires_at > decode_token_expiry(old_token) + 60
+        assert client.session.headers['Authorization'] == f"Bearer {client.token}"
+        requests_before = server.request_count
+        assert client.create_record(COLLECTION, AUDIT) is not None
+        assert server.request_count - requests_before == 1
+
+
+def test_revoked_token_is_renewed(server):
+    with PocketBaseClient(server.url) as client:
+        assert client.authenticate(EMAIL, PASSWORD)
+        old_token = client.token
+        server.tokens.clear()
+
+        assert client.create_record(COLLECTION, AUDIT) is not None
+        assert client.token != old_token
+    assert server.store.list(COLLECTION, 1, 1, None, None, False)['totalItems'] == 1
@@ -0,0 +1,56 @@
+"""Tests of the schema validator's error positions."""
+
+import io
+
+from validator import AuditValidator
+
+INVALID_YAML = """\
+accounts:
+- id: a1
+  audits:
+  - date: '2024-01-02'
+    visited_floors: [1, 2]
+    status: done
+  - date: '2024-13-40'
+    visited_floors:
+    - 1
+    - x
+  - date: '2024-03-04'
+    visited_floors: []
+- audits: []
+"""
+
+
+def test_yaml_errors_point_at_lines():
+    validator = AuditValidator.from_file()
+    pairs = list(validator.iter_yaml_pairs(io.StringIO(INVALID_YAML), "in.yml"))
+
+    assert pairs == [("a1", {'date': "2024-03-04", 'visited_floors': []})]
+    assert [str(error) for error in validator.errors] == [
+        "in.yml, line 6: accounts[0].audits[0].status: 'done' is not one of scheduled, pending, completed, canceled",
+        "in.yml, line 7: accounts[0].audits[1].date: '2024-13-40' is not a valid date (YYYY-MM-DD)",
+        "in.yml, line 10: accounts[0].audits[1].visited_floors[1]: expected integer, got string",
+        "in.yml, line 13: accounts[1]: missing required property 'id'",
+    ]
+
+
+def test_root_errors_point_at_their_key():
+    validator = AuditValidator.from_file()
+    assert list(validator.iter_yaml_pairs(io.StringIO("version: 1\naccounts: 3\n"), "in.yml")) == []
+    assert [str(error) for error in validator.errors] == ["in.yml, line 2: accounts: expected array, got integer"]
+
+
+def test_json_errors_point_at_records():
+    validator = AuditValidator.from_file()
+    audits = [
+        {'account': "a", 'date': "2024-01-02 00:00:00.000Z", 'visited_floors': "[1]"},
+        {'account': "a", 'date': "2024-01-02 00:00:00.000Z", 'visited_floors': "[1"},
+        {'date': "2024-01-02 00:00:00.000Z", 'visited_floors': "[]", 'score': "x"},
+    ]
+
+    assert list(validator.iter_valid_json(audits, "in.json")) == audits[:1]
+    assert [str(error) for error in validator.errors] == [
+        "in.json, record 2: visited_floors: is not a JSON-encoded array",
+        "in.json, record 3: (root): missing required property 'account'",
+        "in.json, record 3: score: expected integer or null, got string",
+    ]
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Token Cache Module for Audit Wizard
+Decodes PocketBase auth token expiry and caches tokens on disk between runs
+"""
+
+import base64
+import json
+import os
+from typing import Dict, Optional
+
+
+def decode_token_expiry(token: str) -> Optional[float]:
+    """Read the expiry time from a PocketBase (JWT) auth token.
+
+    The signature is not verified; the value is only used to decide when
+    to refresh the token.
+
+    Args:
+        token: JWT auth token
+
+    Returns:
+        Optional[float]: Expiry as a Unix timestamp, or None if it cannot be read
+    """
+    try:
+        payload = token.split('.')[1]
+        # Restore the base64 padding stripped by JWT encoding
+        payload += '=' * (-len(payload) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(payload.encode('ascii')))
+        return float(claims['exp'])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+class TokenCache:
+    """On-disk cache of auth tokens, keyed by server URL and identity."""
+
+    def __init__(self, path: str):
+        """Initialize the token cache.
+
+        Args:
+            path: Path to the cache file
+        """
+        self.path = os.path.expanduser(path)
+
+    @staticmethod
+    def _key(base_url: str, identity: str) -> str:
+        return f"{base_url}|{identity}"
+
+    def _read(self) -> Dict[str, str]:
+        try:
+            with open(self.path, 'r') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def load(self, base_url: str, identity: str) -> Optional[str]:
+        """Get the cached token for a server and identity.
+
+        Args:
+            base_url: PocketBase base URL
+            identity: Email or username the token was issued to
+
+        Returns:
+            Optional[str]: Cached token, or None if there is none
+        """
+        return self._read().get(self._key(base_url, identity))
+
+    def save(self, base_url: str, identity: str, token: str):
+        """Store a token for a server and identity, readable only by the current user.
+
+        Args:
+            base_url: PocketBase base URL
+            identity: Email or username the token was issued to
+            token: Auth token
+        """
+        tokens = self._read()
+        tokens[self._key(base_url, identity)] = token
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as file:
+            json.dump(tokens, file)
@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+Validation Module for Audit Wizard
+Checks audit files against the YAML input contract in audit-schema.json,
+compiled once into specialized check functions
+"""
+
+import json
+import os
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from dates import is_iso_date, json_date_to_yaml
+from readers import YamlAccountReader, YamlBlock
+
+DEFAULT_SCHEMA_PATH = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                    "..", "audit-schema.json"))
+
+# Keywords that do not constrain values
+_ANNOTATION_KEYWORDS = {"$schema", "$id", "title", "description", "$comment", "examples", "default"}
+
+# A schema violation: (path from the checked value, message)
+Violation = Tuple[Tuple[Any, ...], str]
+
+# A compiled check returns the violations of a value, or None if it is valid
+Check = Callable[[Any], Optional[List[Violation]]]
+
+_TYPE_NAMES = {dict: "object", list: "array", str: "string", int: "integer", float: "number",
+               bool: "boolean", type(None): "null", date: "unquoted date"}
+
+
+def _type_name(value: Any) -> str:
+    return _TYPE_NAMES.get(type(value), type(value).__name__)
+
+
+def _is_integer(value: Any) -> bool:
+    # JSON Schema counts 1.0 as an integer; booleans are not numbers
+    return type(value) is int or (type(value) is float and value.is_integer())
+
+
+_TYPE_TESTS: Dict[str, Callable[[Any], bool]] = {
+    "object": lambda value: type(value) is dict,
+    "array": lambda value: type(value) is list,
+    "string": lambda value: type(value) is str,
+    "integer": _is_integer,
+    "number": lambda value: type(value) in (int, float),
+    "boolean": lambda value: type(value) is bool,
+    "null": lambda value: value is None,
+}
+
+# Python types whose values always pass a type test (integers also accept whole floats)
+_EXACT_TYPES = {"object": (dict,), "array": (list,), "string": (str,), "integer": (int,),
+                "number": (int, float), "boolean": (bool,), "null": (type(None),)}
+
+_FORMAT_TESTS: Dict[str, Tuple[Callable[[str], bool], str]] = {
+    "date": (is_iso_date, "is not a valid date (YYYY-MM-DD)"),
+}
+
+
+def _type_test(types: Any) -> Callable[[Any], bool]:
+    """Build a single predicate for a schema 'type' (a name or a list of names)."""
+    names = [types] if isinstance(types, str) else list(types)
+    for name in names:
+        if name not in _TYPE_TESTS:
+            raise ValueError(f"Unsupported schema type: {name}")
+    if len(names) == 1:
+        return _TYPE_TESTS[names[0]]
+    tests = [_TYPE_TESTS[name] for name in names]
+    if len(tests) == 2:
+        first, second = tests
+        return lambda value: first(value) or second(value)
+    return lambda value: any(test(value) for test in tests)
+
+
+def _exact_types(types: Any) -> frozenset:
+    """Get the Python types whose values always have a schema 'type'."""
+    names = [types] if isinstance(types, str) else list(types)
+    return frozenset(python_type for name in names for python_type in _EXACT_TYPES.get(name, ()))
+
+
+def compile_schema(schema: Dict[str, Any]) -> Check:
+    """Compile a JSON Schema (the subset used by audit-schema.json) into a check function.
+
+    Each schema node becomes one closure with its keywords resolved up
+    front, so checking a value does not interpret the schema again. Valid
+    values allocate nothing; violations carry the path to the bad value.
+
+    Supported keywords: type, enum, format ('date'), properties, required
+    and items; annotations such as description are ignored.
+
+    Args:
+        schema: Schema node
+
+    Returns:
+        Check: Function returning the violations of a value, or None
+
+    Raises:
+        ValueError: If the schema uses a keyword or type that is not supported
+    """
+    unsupported = set(schema) - _ANNOTATION_KEYWORDS - {"type", "enum", "format", "properties", "required", "items"}
+    if unsupported:
+        raise ValueError(f"Unsupported schema keyword: {', '.join(sorted(unsupported))}")
+
+    checks: List[Check] = []
+
+    if "type" in schema:
+        test = _type_test(schema["type"])
+        expected = schema["type"] if isinstance(schema["type"], str) else " or ".join(schema["type"])
+
+        def check_type(value: Any) -> Optional[List[Violation]]:
+            if test(value):
+                return None
+            return [((), f"expected {expected}, got {_type_name(value)}")]
+        checks.append(check_type)
+
+    if "enum" in schema:
+        allowed = list(schema["enum"])
+        try:
+            members = frozenset(allowed)
+        except TypeError:
+            members = allowed
+        listing = ", ".join(str(item) for item in allowed)
+
+        def check_enum(value: Any) -> Optional[List[Violation]]:
+            try:
+                if value in members:
+                    return None
+            except TypeError:
+                pass
+            return [((), f"{value!r} is not one of {listing}")]
+        checks.append(check_enum)
+
+    if "format" in schema:
+        if schema["format"] not in _FORMAT_TESTS:
+            raise ValueError(f"Unsupported schema format: {schema['format']}")
+        format_test, message = _FORMAT_TESTS[schema["format"]]
+
+        def check_format(value: Any) -> Optional[List[Violation]]:
+            # Formats only apply to strings
+            if type(value) is not str or format_test(value):
+                return None
+            return [((), f"{value!r} {message}")]
+        checks.append(check_format)
+
+    if "required" in schema or "properties" in schema:
+        required = tuple(schema.get("required", ()))
+        properties = tuple((key, compile_schema(sub)) for key, sub in schema.get("properties", {}).items())
+
+        def check_object(value: Any) -> Optional[List[Violation]]:
+            # Object keywords only apply to objects
+            if type(value) is not dict:
+                return None
+            violations = None
+            for key in required:
+                if key not in value:
+                    violations = violations or []
+                    violations.append(((), f"missing required property '{key}'"))
+            for key, check in properties:
+                if key in value:
+                    nested = check(value[key])
+                    if nested:
+                        violations = violations or []
+                        violations.extend(((key,) + path, message) for path, message in nested)
+            return violations
+        checks.append(check_object)
+
+    if "items" in schema:
+        items = schema["items"]
+        if set(items) - _ANNOTATION_KEYWORDS == {"type"}:
+            # Items constrained by type only are checked by their set of Python
+            # types at C speed, falling back to a test per item (e.g. for 1.0)
+            item_test = _type_test(items["type"])
+            item_types = _exact_types(items["type"])
+            item_expected = items["type"] if isinstance(items["type"], str) else " or ".join(items["type"])
+
+            def check_items(value: Any) -> Optional[List[Violation]]:
+                if type(value) is not list or item_types.issuperset(map(type, value)):
+                    return None
+                violations = [((index,), f"expected {item_expected}, got {_type_name(item)}")
+                              for index, item in enumerate(value) if not item_test(item)]
+                return violations or None
+        else:
+            item_check = compile_schema(items)
+
+            def check_items(value: Any) -> Optional[List[Violation]]:
+                if type(value) is not list:
+                    return None
+                violations = None
+                for index, item in enumerate(value):
+                    nested = item_check(item)
+                    if nested:
+                        violations = violations or []
+                        violations.extend(((index,) + path, message) for path, message in nested)
+                return violations
+        checks.append(check_items)
+
+    if not checks:
+        return lambda value: None
+    if len(checks) == 1:
+        return checks[0]
+    if len(checks) == 2:
+        first, second = checks
+
+        def check_both(value: Any) -> Optional[List[Violation]]:
+            violations = first(value)
+            nested = second(value)
+            if nested:
+                return violations + nested if violations else nested
+            return violations
+        return check_both
+
+    def check_all(value: Any) -> Optional[List[Violation]]:
+        violations = None
+        for check in checks:
+            nested = check(value)
+            if nested:
+                violations = violations + nested if violations else nested
+        return violations
+    return check_all
+
+
+def format_path(path: Iterable[Any]) -> str:
+    """Format a value path as 'accounts[0].audits[3].date'."""
+    text = ""
+    for key in path:
+        text += f"[{key}]" if isinstance(key, int) else (f".{key}" if text else str(key))
+    return text or "(root)"
+
+
+class ValidationError:
+    """A schema violation at a position in an audit file."""
+
+    def __init__(self, file_path: str, position: str, path: Tuple[Any, ...], message: str):
+        """Initialize the error.
+
+        Args:
+            file_path: Audit file
+            position: Position in the file, e.g. 'line 12' or 'record 5'
+            path: Path of the value from the root of the file
+            message: What is wrong with the value
+        """
+        self.file_path = file_path
+        self.position = position
+        self.path = path
+        self.message = message
+
+    def __str__(self) -> str:
+        return f"{self.file_path}, {self.position}: {format_path(self.path)}: {self.message}"
+
+
+def _without_items(schema: Dict[str, Any], key: str) -> Dict[str, Any]:
+    """Copy a schema, dropping the 'items' of one of its array properties."""
+    properties = dict(schema.get("properties", {}))
+    properties[key] = {name: value for name, value in properties[key].items() if name != "items"}
+    return dict(schema, properties=properties)
+
+
+class AuditValidator:
+    """Checks audit files against the YAML audit schema.
+
+    The schema is split at its two arrays and each part compiled once: the
+    root (without the accounts), each account (without its audits) and
+    each audit. That lets a file be checked one account block at a time
+    while it is being read, instead of loading it first.
+
+    Every violation is collected in `errors`; checked audits that are valid
+    are passed on, so a run reports all errors of a file at once.
+    """
+
+    def __init__(self, schema: Dict[str, Any]):
+        """Compile a schema.
+
+        Args:
+            schema: Schema of the YAML input ({accounts: [{id, audits: [...]}]})
+
+        Raises:
+            ValueError: If the schema does not describe accounts[].audits[]
+                or uses unsupported keywords
+        """
+        try:
+            account_schema = schema["properties"]["accounts"]["items"]
+            audit_schema = account_schema["properties"]["audits"]["items"]
+            id_schema = account_schema["properties"].get("id", {})
+        except (KeyError, TypeError):
+            raise ValueError("Schema must describe accounts[].audits[]")
+
+        self._check_root = compile_schema(_without_items(schema, "accounts"))
+        self._check_account = compile_schema(_without_items(account_schema, "audits"))
+        self._check_audit = compile_schema(audit_schema)
+        self._check_account_id = compile_schema(id_schema)
+        self.errors: List[ValidationError] = []
+
+    @classmethod
+    def from_file(cls, schema_path: str = DEFAULT_SCHEMA_PATH) -> "AuditValidator":
+        """Load and compile a schema file.
+
+        Args:
+            schema_path: Path to the JSON Schema file
+
+        Returns:
+            AuditValidator: The validator
+        """
+        with open(schema_path, 'r') as file:
+            return cls(json.load(file))
+
+    def check_root(self, reader: YamlAccountReader, file_path: str):
+        """Check the root of a YAML file once its account blocks have been read.
+
+        Args:
+            reader: Exhausted reader of the file
+            file_path: File name used in errors
+        """
+        violations = self._check_root(reader.root)
+        for path, message in violations or ():
+            line = reader.root_lines.get(path[0], 1) if path else 1
+            self.errors.append(ValidationError(file_path, f"line {line}", path, message))
+
+    def check_block(self, block: YamlBlock, file_path: str) -> List[Tuple[Any, Optional[Dict]]]:
+        """Check one account block and get its valid audits.
+
+        Args:
+            block: Account block from a YamlAccountReader
+            file_path: File name used in errors
+
+        Returns:
+            List[Tuple[Any, Optional[Dict]]]: (account ID, audit) pairs of the
+            valid audits, as readers.iter_yaml_audits yields them; none if
+            the account itself is invalid
+        """
+        account = block.account
+        prefix = ("accounts", block.index)
+        violations = self._check_account(account)
+        account_valid = not violations
+        for path, message in violations or ():
+            self._error(file_path, block, path, prefix, message)
+
+        audits = account.get("audits") if type(account) is dict else None
+        if type(audits) is not list:
+            return []
+
+        pairs = []
+        check_audit = self._check_audit
+        account_id = account.get("id")
+        for index, audit in enumerate(audits):
+            violations = check_audit(audit)
+            if violations:
+                for path, message in violations:
+                    self._error(file_path, block, ("audits", index) + path, prefix, message)
+            elif account_valid:
+                pairs.append((account_id, audit))
+        if account_valid and not audits:
+            pairs.append((account_id, None))
+        return pairs
+
+    def _error(self, file_path: str, block: YamlBlock, path: Tuple[Any, ...], prefix: Tuple[Any, ...],
+               message: str):
+        self.errors.append(ValidationError(file_path, f"line {block.line_of(path)}", prefix + path, message))
+
+    def iter_yaml_pairs(self, stream: TextIO, file_path: str) -> Iterator[Tuple[Any, Optional[Dict]]]:
+        """Read a YAML audit file, checking it as it is read.
+
+        Args:
+            stream: Open YAML file
+            file_path: File name used in errors
+
+        Yields:
+            Tuple[Any, Optional[Dict]]: (account ID, audit) pairs of the
+            valid audits, as readers.iter_yaml_audits yields them
+        """
+        reader = YamlAccountReader(stream)
+        for block in reader:
+            yield from self.check_block(block, file_path)
+        self.check_root(reader, file_path)
+
+    def check_json_audit(self, audit: Any, index: int, file_path: str) -> bool:
+        """Check a JSON format audit record against the schema of a YAML audit.
+
+        The record is read back as the YAML audit it was converted from:
+        the date without its time part and visited_floors decoded.
+
+        Args:
+            audit: Audit record in JSON format
+            index: Position of the record in the file (0-based)
+            file_path: File name used in errors
+
+        Returns:
+            bool: True if the record is valid
+        """
+        position = f"record {index + 1}"
+        if type(audit) is not dict:
+            self.errors.append(ValidationError(file_path, position, (), f"expected object, got {_type_name(audit)}"))
+            return False
+
+        violations = []
+        if "account" not in audit:
+            violations.append(((), "missing required property 'account'"))
+        else:
+            violations.extend((("account",) + path, message)
+                              for path, message in self._check_account_id(audit["account"]) or ())
+
+        yaml_audit = dict(audit)
+        yaml_audit.pop("account", None)
+        yaml_audit.pop("id", None)
+        if type(yaml_audit.get("date")) is str:
+            try:
+                yaml_audit["date"] = json_date_to_yaml(yaml_audit["date"])
+            except ValueError:
+                pass  # Reported by the date format check
+        if type(yaml_audit.get("visited_floors")) is str:
+            try:
+                yaml_audit["visited_floors"] = json.loads(yaml_audit["visited_floors"])
+            except json.JSONDecodeError:
+                violations.append((("visited_floors",), "is not a JSON-encoded array"))
+                yaml_audit["visited_floors"] = []
+        violations.extend(self._check_audit(yaml_audit) or ())
+
+        for path, message in violations:
+            self.errors.append(ValidationError(file_path, position, path, message))
+        return not violations
+
+    def iter_valid_json(self, audits: Iterable[Any], file_path: str) -> Iterator[Dict]:
+        """Pass through the valid records of a stream of JSON format audits.
+
+        Args:
+            audits: Audit records in JSON format
+            file_path: File name used in errors
+
+        Yields:
+            Dict: Valid records, in order
+        """
+        for index, audit in enumerate(audits):
+            if self.check_json_audit(audit, index, file_path):
+                yield audit